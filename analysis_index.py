@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Shared per-wave analysis index for the validation checkers
+
+check_validation_phrases.py, check_validation_phrases_v2.py,
+check_validation_keywords.py and check_adjacent_confusion.py each used to
+reload {wave}_crosswalk.json, re-normalize every question (per question, in
+the phrase checkers) and rebuild their own word structures. WaveIndex holds
+what they share, built once per wave:
+
+- var_ids / texts / normalized: crosswalk questions in file order
+- words: lowercase [a-z]+ words (keyword extraction)
+- postings: word -> variable_ids containing it
+- phrases: PhraseIndex over the normalized texts, so the question frequency
+  of any n-gram is an O(len(ngram)) lookup
+
+Everything but the automaton is cached as JSON under ANALYSIS_INDEX_DIR
+(default .analysis_index/), keyed by the SHA-1 of the crosswalk file, and
+rebuilt when the crosswalk changes. The automaton is rebuilt from the
+cached normalized texts on load (linear in the wave's text).
+
+Running this module performs all four checks in a single pass over the
+waves, loading each index once:
+
+    python analysis_index.py
+    python analysis_index.py --waves W1 W2 --no-cache
+"""
+
+import os
+import re
+import json
+import hashlib
+import argparse
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from phrase_index import PhraseIndex
+
+DEFAULT_CACHE_DIR = os.environ.get("ANALYSIS_INDEX_DIR", ".analysis_index")
+INDEX_VERSION = 2
+WAVES = ["W1", "W2", "W3", "W4", "W5", "W6_Cambodia"]
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase and collapse whitespace (the checkers' normalization)"""
+    text = text.lower()
+    text = re.sub(r"\s+", " ", text)
+    return text.strip()
+
+
+def extract_words(text: str) -> List[str]:
+    """Lowercase alphabetic words, as used for validation keywords"""
+    return re.findall(r"\b[a-z]+\b", text.lower())
+
+
+def extract_question_number(var_id: str) -> int:
+    """Extract numeric part from question ID."""
+    match = re.search(r"(\d+)", var_id)
+    if match:
+        return int(match.group(1))
+    return -1
+
+
+def crosswalk_questions(data: Dict) -> List[Dict]:
+    """All variables of a crosswalk, in domain order"""
+    questions = []
+    if "domains" in data and isinstance(data["domains"], list):
+        for domain in data["domains"]:
+            if "variables" in domain:
+                questions.extend(domain["variables"])
+    return questions
+
+
+class WaveIndex:
+    """Normalized texts, words, postings and phrase counts of one wave"""
+
+    CACHED = ("normalized", "words", "postings", "first_text")
+
+    def __init__(self, wave: str, var_ids: List[str], texts: List[str], source_hash: str = ""):
+        self.wave = wave
+        self.var_ids = var_ids
+        self.texts = texts
+        self.source_hash = source_hash
+
+        self.normalized = [normalize_text(t) for t in texts]
+        self.words = [extract_words(t) for t in texts]
+
+        postings = defaultdict(set)
+        self.first_text: Dict[str, str] = {}
+        for var_id, text, position in self.entries():
+            for word in self.words[position]:
+                postings[word].add(var_id)
+            self.first_text.setdefault(var_id, text)
+        self.postings: Dict[str, List[str]] = {w: sorted(ids) for w, ids in postings.items()}
+
+        self.phrases = PhraseIndex(self.normalized)
+
+    @classmethod
+    def from_crosswalk(cls, wave: str, data: Dict, source_hash: str = "") -> "WaveIndex":
+        questions = crosswalk_questions(data)
+        return cls(
+            wave,
+            [q.get("variable_id", "") for q in questions],
+            [q.get("question_text", "") for q in questions],
+            source_hash,
+        )
+
+    def entries(self) -> Iterator[Tuple[str, str, int]]:
+        """(variable_id, question_text, position) of every question with both"""
+        for position, (var_id, text) in enumerate(zip(self.var_ids, self.texts)):
+            if text and var_id:
+                yield var_id, text, position
+
+    def doc_count(self, phrase: str) -> int:
+        """Number of questions whose normalized text contains phrase"""
+        return self.phrases.doc_count(phrase)
+
+    def word_frequency(self, word: str) -> int:
+        """Number of distinct variables whose text contains word"""
+        return len(self.postings.get(word, ()))
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": INDEX_VERSION,
+            "wave": self.wave,
+            "source_hash": self.source_hash,
+            "var_ids": self.var_ids,
+            "texts": self.texts,
+            **{name: getattr(self, name) for name in self.CACHED},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "WaveIndex":
+        index = cls.__new__(cls)
+        for name in ("wave", "source_hash", "var_ids", "texts") + cls.CACHED:
+            setattr(index, name, data[name])
+        index.phrases = PhraseIndex(index.normalized)
+        return index
+
+
+def file_hash(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def load_wave_index(
+    wave: str, cache_dir: Optional[str] = DEFAULT_CACHE_DIR, crosswalk_path: str = None
+) -> WaveIndex:
+    """
+    Index for {wave}_crosswalk.json, from the cache when the crosswalk is
+    unchanged. Pass cache_dir=None to skip the cache.
+    """
+    crosswalk_path = crosswalk_path or f"{wave}_crosswalk.json"
+    source_hash = file_hash(crosswalk_path)
+
+    cache_path = os.path.join(cache_dir, f"{wave}.json") if cache_dir else None
+    if cache_path and os.path.exists(cache_path):
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("version") == INDEX_VERSION and cached.get("source_hash") == source_hash:
+            return WaveIndex.from_dict(cached)
+
+    with open(crosswalk_path, "r") as f:
+        index = WaveIndex.from_crosswalk(wave, json.load(f), source_hash)
+
+    if cache_path:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(cache_path, "w", encoding="utf-8") as f:
+            json.dump(index.to_dict(), f, ensure_ascii=False)
+    return index
+
+
+def main():
+    import check_adjacent_confusion
+    import check_validation_keywords
+    import check_validation_phrases
+    import check_validation_phrases_v2
+
+    parser = argparse.ArgumentParser(description="Run all validation checks in one pass")
+    parser.add_argument("--waves", nargs="+", default=WAVES)
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--no-cache", action="store_true", help="Rebuild indexes without caching")
+    args = parser.parse_args()
+    cache_dir = None if args.no_cache else args.cache_dir
+
+    print("=" * 80)
+    print("VALIDATION CHECKS (shared analysis index)")
+    print("=" * 80)
+
+    phrases, improved, keywords = {}, {}, {}
+    adjacent_issues = []
+    for wave in args.waves:
+        try:
+            index = load_wave_index(wave, cache_dir)
+        except Exception as e:
+            error = {"wave": wave, "error": str(e)}
+            phrases[wave] = improved[wave] = keywords[wave] = error
+            print(f"\n❌ {wave}: {e}")
+            continue
+
+        phrases[wave] = check_validation_phrases.analyze_wave(wave, index)
+        improved[wave] = check_validation_phrases_v2.analyze_wave(wave, index)
+        keywords[wave] = check_validation_keywords.analyze_wave(wave, index)
+        pairs = check_adjacent_confusion.check_adjacent_confusion(improved[wave])
+        adjacent_issues.extend(pairs[:10])  # same export as check_adjacent_confusion
+
+        print(f"\n📊 {wave}: {len(index.var_ids)} questions")
+        print(
+            f"  Phrases (v1):   {phrases[wave]['unique_phrases']} unique, "
+            f"{phrases[wave]['problematic']} problematic"
+        )
+        print(
+            f"  Phrases (v2):   {improved[wave]['unique_phrases']} unique, "
+            f"{improved[wave]['problematic']} problematic"
+        )
+        print(
+            f"  Keywords:       {keywords[wave]['with_keywords']} covered, "
+            f"{keywords[wave]['without_keywords']} without"
+        )
+        print(f"  Adjacent pairs: {len(pairs)} confusable")
+
+    outputs = {
+        "validation_phrases_all_waves.json": phrases,
+        "validation_phrases_improved.json": improved,
+    }
+    if adjacent_issues:
+        outputs["adjacent_confusion_issues.json"] = adjacent_issues
+    for path, result in outputs.items():
+        with open(path, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"\n💾 {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Stage-level benchmark suite with regression tracking
+
+Times each pipeline stage on the checked-in W1-W6 data and on synthetic
+scaled codebooks (see synthetic_codebook.py):
+
+    LabelsParser.parse, detect_stem_groups, classify_scale,
+    add_validation_phrases, generate_crosswalk, json_to_csv,
+    RRecoderGenerator.generate_all_waves_script, QuestionClusterer.build_clusters
+
+Results are written to benchmark_results/<timestamp>.json (and latest.json)
+and compared against benchmark_results/baseline.json.
+
+Usage:
+    python benchmark_stages.py                       # real waves + 1x, 10x synthetic
+    python benchmark_stages.py --scales 1 10 100     # include 100x
+    python benchmark_stages.py --save-baseline       # store this run as the baseline
+    python benchmark_stages.py --fail-on-regression  # exit 1 if a stage regressed
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import platform
+import statistics
+import tempfile
+import contextlib
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from parse_labels import LabelsParser, AtomicJSONGenerator
+from intelligent_guesser import IntelligentGuesser
+from extract_concepts import add_validation_phrases, generate_crosswalk
+from generate_csv import json_to_csv
+from generate_r_recoders import RRecoderGenerator
+from synthetic_codebook import SyntheticCodebookGenerator
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+from cluster_questions import QuestionClusterer  # noqa: E402
+
+
+WAVES = ["W1", "W2", "W3", "W4", "W5", "W6_Cambodia"]
+RESULTS_DIR = "benchmark_results"
+BASELINE_FILE = os.path.join(RESULTS_DIR, "baseline.json")
+
+# add_validation_phrases is quadratic in the number of questions; skip it
+# above this size so 100x runs finish in reasonable time
+QUADRATIC_STAGE_LIMIT = 5000
+
+# A stage regresses if its median time grows by more than the tolerance
+# AND by more than the noise floor (tiny stages are too noisy to compare)
+DEFAULT_TOLERANCE = 0.25
+NOISE_FLOOR_S = 0.005
+
+
+def time_stage(func: Callable, repeat: int) -> Dict:
+    """Run func `repeat` times with stdout suppressed and return timings"""
+    timings = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+    return {
+        "min_s": min(timings),
+        "median_s": statistics.median(timings),
+        "max_s": max(timings),
+        "repeat": repeat,
+    }
+
+
+def build_atomic(parser: LabelsParser, variables: List[Dict]) -> List[Dict]:
+    """Reproduce parse_labels.main's stem reconstruction without file I/O"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        generator = AtomicJSONGenerator(client=object())
+    groups = parser.detect_stem_groups()
+    grouped = set()
+    atomic = []
+    for group in groups:
+        grouped.update(group)
+        atomic.extend(generator.generate_for_group([variables[i] for i in group]))
+    atomic.extend(v for i, v in enumerate(variables) if i not in grouped)
+    return atomic
+
+
+def build_analyzed(atomic: List[Dict]) -> List[Dict]:
+    """Attach scale_analysis the way IntelligentGuesser.analyze_questionnaire does"""
+    guesser = IntelligentGuesser()
+    analyzed = []
+    for var in atomic:
+        a = guesser.classify_scale(var["value_labels"])
+        v = dict(var)
+        v["scale_analysis"] = {
+            "scale_type": a.scale_type,
+            "scale_points": a.scale_points,
+            "first_na_value": a.first_na_value,
+            "max_substantive_value": a.max_substantive_value,
+            "needs_reversal": a.needs_reversal,
+            "value_1_polarity": a.value_1_polarity,
+            "max_value_polarity": a.max_value_polarity,
+            "confidence": a.confidence,
+            "reasoning": a.reasoning,
+        }
+        # Synthetic inputs have no LLM annotations; use the scale as a domain
+        v.setdefault("domain", a.scale_type)
+        v.setdefault("concepts", [a.scale_type])
+        analyzed.append(v)
+    return analyzed
+
+
+def synthetic_matches(enriched: List[Dict], seed: int = 0) -> Dict:
+    """
+    Build an all_matches.json-shaped match set: consecutive runs of six
+    questions act as the same item asked in W1..W6 and are fully connected.
+    """
+    rng = random.Random(seed)
+    matches = []
+    for start in range(0, len(enriched) - 5, 6):
+        group = enriched[start : start + 6]
+        for i in range(len(group)):
+            for j in range(i + 1, len(group)):
+                a, b = group[i], group[j]
+                matches.append(
+                    {
+                        "wave1": WAVES[i], "var1": a["variable_id"],
+                        "question1": a["question_text"], "concepts1": a.get("concepts", []),
+                        "domain1": a.get("domain", "Unknown"),
+                        "wave2": WAVES[j], "var2": b["variable_id"],
+                        "question2": b["question_text"], "concepts2": b.get("concepts", []),
+                        "domain2": b.get("domain", "Unknown"),
+                        "similarity": rng.uniform(0.75, 1.0),
+                    }
+                )
+    return {"matches": matches, "count": len(matches)}
+
+
+def benchmark_dataset(
+    name: str,
+    labels_files: List[str],
+    workdir: str,
+    repeat: int,
+    enriched_files: Optional[List[str]] = None,
+    matches_file: Optional[str] = None,
+) -> Dict:
+    """Benchmark every stage on one dataset (one or more labels files)"""
+    print(f"\n📊 {name}")
+    stages = {}
+
+    def record(stage: str, items: int, func: Callable):
+        result = time_stage(func, repeat)
+        result["items"] = items
+        result["items_per_s"] = items / result["median_s"] if result["median_s"] > 0 else None
+        stages[stage] = result
+        print(f"  {stage:34s} {result['median_s'] * 1000:10.1f} ms  ({items:,} items)")
+
+    # Stage 1: parsing and stem detection
+    parsers = []
+    for path in labels_files:
+        parser = LabelsParser(path)
+        parser.parse()
+        parsers.append(parser)
+    n_vars = sum(len(p.variables) for p in parsers)
+
+    record("LabelsParser.parse", n_vars, lambda: [LabelsParser(p).parse() for p in labels_files])
+    record("detect_stem_groups", n_vars, lambda: [p.detect_stem_groups() for p in parsers])
+
+    # Stage 2: scale classification
+    atomic_waves = [build_atomic(p, p.variables) for p in parsers]
+    all_atomic = [v for wave in atomic_waves for v in wave]
+    guesser = IntelligentGuesser()
+    record(
+        "classify_scale",
+        len(all_atomic),
+        lambda: [guesser.classify_scale(v["value_labels"]) for v in all_atomic],
+    )
+
+    # Enriched / analyzed inputs: real files where available, else synthetic
+    if enriched_files:
+        enriched_waves = []
+        for path in enriched_files:
+            with open(path, "r", encoding="utf-8") as f:
+                enriched_waves.append(json.load(f))
+    else:
+        enriched_waves = [build_analyzed(wave) for wave in atomic_waves]
+    all_enriched = [v for wave in enriched_waves for v in wave]
+
+    # Stage 3: validation phrases (per wave, quadratic)
+    largest_wave = max(len(w) for w in enriched_waves)
+    if largest_wave <= QUADRATIC_STAGE_LIMIT:
+        record(
+            "add_validation_phrases",
+            len(all_enriched),
+            lambda: [add_validation_phrases([dict(v) for v in wave]) for wave in enriched_waves],
+        )
+    else:
+        stages["add_validation_phrases"] = {"skipped": f"wave size {largest_wave} > {QUADRATIC_STAGE_LIMIT}"}
+        print(f"  {'add_validation_phrases':34s} skipped ({largest_wave:,} questions per wave)")
+
+    # Stage 4: crosswalk + CSV export
+    crosswalk_out = os.path.join(workdir, f"{name}_crosswalk.json")
+    record(
+        "generate_crosswalk",
+        len(all_enriched),
+        lambda: [generate_crosswalk(wave, crosswalk_out) for wave in enriched_waves],
+    )
+
+    enriched_paths = []
+    for i, wave in enumerate(enriched_waves):
+        path = os.path.join(workdir, f"{name}_{i}_enriched.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(wave, f, ensure_ascii=False)
+        enriched_paths.append(path)
+
+    record(
+        "json_to_csv",
+        len(all_enriched),
+        lambda: [
+            json_to_csv(p, p.replace(".json", ".csv"), p.replace(".json", "_detailed.csv"))
+            for p in enriched_paths
+        ],
+    )
+
+    # Stage 5: R recoder generation (needs scale_analysis on every variable)
+    analyzed_paths = []
+    for i, wave in enumerate(enriched_waves):
+        if any("scale_analysis" not in v for v in wave):
+            wave = build_analyzed(wave)
+        path = os.path.join(workdir, f"{name}_{i}_analyzed.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(wave, f, ensure_ascii=False)
+        analyzed_paths.append((path, f"W{i + 1}"))
+
+    generator = RRecoderGenerator()
+    r_out = os.path.join(workdir, f"{name}_reverse_scales.R")
+    record(
+        "generate_all_waves_script",
+        len(all_enriched),
+        lambda: generator.generate_all_waves_script(analyzed_paths, r_out),
+    )
+
+    # Stage 6: clustering
+    if matches_file is None:
+        matches_file = os.path.join(workdir, f"{name}_matches.json")
+        with open(matches_file, "w", encoding="utf-8") as f:
+            json.dump(synthetic_matches(all_enriched), f)
+    with open(matches_file, "r", encoding="utf-8") as f:
+        n_matches = json.load(f)["count"]
+
+    def cluster():
+        clusterer = QuestionClusterer()
+        clusterer.load_matches_from_json(matches_file)
+        clusterer.build_clusters()
+
+    record("QuestionClusterer.build_clusters", n_matches, cluster)
+
+    return {"variables": n_vars, "stages": stages}
+
+
+def compare_to_baseline(results: Dict, baseline: Dict, tolerance: float) -> List[Dict]:
+    """Return stages whose median time regressed beyond tolerance"""
+    regressions = []
+    for dataset, data in results["datasets"].items():
+        base_data = baseline.get("datasets", {}).get(dataset)
+        if not base_data:
+            continue
+        for stage, timing in data["stages"].items():
+            base = base_data["stages"].get(stage, {})
+            if "median_s" not in timing or "median_s" not in base:
+                continue
+            ratio = timing["median_s"] / base["median_s"] if base["median_s"] > 0 else 1.0
+            delta = timing["median_s"] - base["median_s"]
+            if ratio > 1 + tolerance and delta > NOISE_FLOOR_S:
+                regressions.append(
+                    {
+                        "dataset": dataset,
+                        "stage": stage,
+                        "baseline_s": base["median_s"],
+                        "current_s": timing["median_s"],
+                        "ratio": ratio,
+                    }
+                )
+    return regressions
+
+
+def run_benchmarks(
+    scales: List[float], repeat: int = 3, include_real: bool = True, seed: int = 0
+) -> Dict:
+    """Run all datasets and return the results document"""
+    results = {
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "datasets": {},
+    }
+
+    with tempfile.TemporaryDirectory() as workdir:
+        if include_real:
+            labels = [f"{w}_labels.txt" for w in WAVES if os.path.exists(f"{w}_labels.txt")]
+            enriched = [f"{w}_enriched.json" for w in WAVES if os.path.exists(f"{w}_enriched.json")]
+            matches = "matching_results/all_matches.json"
+            results["datasets"]["real_W1-W6"] = benchmark_dataset(
+                "real_W1-W6",
+                labels,
+                workdir,
+                repeat,
+                enriched_files=enriched if len(enriched) == len(labels) else None,
+                matches_file=matches if os.path.exists(matches) else None,
+            )
+
+        for scale in scales:
+            name = f"synthetic_x{scale:g}"
+            path = os.path.join(workdir, f"{name}_labels.txt")
+            SyntheticCodebookGenerator(scale=scale, seed=seed, wave_name=name).write(path)
+            # Large synthetic runs are slow; time them once
+            results["datasets"][name] = benchmark_dataset(
+                name, [path], workdir, repeat if scale <= 10 else 1
+            )
+
+    return results
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark pipeline stages")
+    parser.add_argument("--scales", type=float, nargs="*", default=[1, 10])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-real", action="store_true", help="Skip the checked-in W1-W6 data")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("PIPELINE STAGE BENCHMARKS")
+    print("=" * 60)
+
+    results = run_benchmarks(args.scales, args.repeat, include_real=not args.no_real)
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    for path in (os.path.join(RESULTS_DIR, f"{stamp}.json"), os.path.join(RESULTS_DIR, "latest.json")):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    print(f"\n💾 Results saved to {RESULTS_DIR}/{stamp}.json")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Baseline updated: {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"\n⚠️  No baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+    print(f"\n{'=' * 60}")
+    print(f"REGRESSION CHECK (tolerance {args.tolerance:.0%})")
+    print(f"{'=' * 60}")
+    if not regressions:
+        print("✅ No regressions against baseline")
+        return
+
+    for r in regressions:
+        print(
+            f"  ⚠️  {r['dataset']} / {r['stage']}: "
+            f"{r['baseline_s'] * 1000:.1f} ms → {r['current_s'] * 1000:.1f} ms ({r['ratio']:.2f}x)"
+        )
+    if args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
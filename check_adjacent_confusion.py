@@ -5,16 +5,9 @@ adjacent question confusion (q83 vs q84, etc.)
 """
 
 import json
-import re
 from typing import Dict, List
 
-
-def extract_question_number(var_id: str) -> int:
-    """Extract numeric part from question ID."""
-    match = re.search(r"(\d+)", var_id)
-    if match:
-        return int(match.group(1))
-    return -1
+from analysis_index import extract_question_number
 
 
 def check_adjacent_confusion(wave_data: Dict) -> List[Dict]:
@@ -4,17 +4,18 @@ Analyze question texts across all waves to identify suitable validation keywords
 for the R double-checking function.
 """
 
-import json
-from collections import defaultdict
 from typing import Dict, List, Set
-import re
+
+from analysis_index import WaveIndex, extract_words, load_wave_index
 
 
 def extract_content_words(text: str, min_length: int = 5) -> Set[str]:
     """Extract meaningful content words from question text."""
-    # Convert to lowercase and extract words
-    words = re.findall(r"\b[a-z]+\b", text.lower())
+    return filter_content_words(extract_words(text), min_length)
+
 
+def filter_content_words(words: List[str], min_length: int = 5) -> Set[str]:
+    """Keep the meaningful content words of an already tokenized question."""
     # Common words to exclude (expand as needed)
     stopwords = {
         "about",
@@ -60,40 +61,26 @@ def extract_content_words(text: str, min_length: int = 5) -> Set[str]:
     return content_words
 
 
-def find_unique_keywords(questions: List[Dict], wave: str) -> Dict[str, Dict]:
+def find_unique_keywords(index: WaveIndex) -> Dict[str, Dict]:
     """Find unique validation keywords for each question in a wave."""
 
-    # Build word frequency across all questions
-    word_to_questions = defaultdict(set)
+    # Word frequencies come from the index postings
     question_to_words = {}
-
-    for q in questions:
-        var_id = q.get("variable_id", "")
-        text = q.get("question_text", "")
-
-        if not text or not var_id:
-            continue
-
-        words = extract_content_words(text)
-        question_to_words[var_id] = words
-
-        for word in words:
-            word_to_questions[word].add(var_id)
+    for var_id, _, position in index.entries():
+        question_to_words[var_id] = filter_content_words(index.words[position])
 
     # For each question, find its unique or distinctive words
     results = {}
 
     for var_id, words in question_to_words.items():
         # Find words that appear in this question only
-        unique_words = [w for w in words if len(word_to_questions[w]) == 1]
+        unique_words = [w for w in words if index.word_frequency(w) == 1]
 
         # Find words that appear in few questions (distinctive but not necessarily unique)
-        distinctive_words = [w for w in words if len(word_to_questions[w]) <= 3]
+        distinctive_words = [w for w in words if index.word_frequency(w) <= 3]
 
         # Get the question text
-        q_text = next(
-            q["question_text"] for q in questions if q.get("variable_id") == var_id
-        )
+        q_text = index.first_text[var_id]
 
         results[var_id] = {
             "question_text": q_text[:80] + ("..." if len(q_text) > 80 else ""),
@@ -107,21 +94,14 @@ def find_unique_keywords(questions: List[Dict], wave: str) -> Dict[str, Dict]:
     return results
 
 
-def analyze_wave(wave_name: str) -> Dict:
+def analyze_wave(wave_name: str, index: WaveIndex = None) -> Dict:
     """Analyze a single wave's crosswalk file."""
 
     try:
-        with open(f"{wave_name}_crosswalk.json", "r") as f:
-            data = json.load(f)
-
-        # Extract all questions from domains
-        questions = []
-        if "domains" in data and isinstance(data["domains"], list):
-            for domain in data["domains"]:
-                if "variables" in domain:
-                    questions.extend(domain["variables"])
+        if index is None:
+            index = load_wave_index(wave_name)
 
-        results = find_unique_keywords(questions, wave_name)
+        results = find_unique_keywords(index)
 
         # Calculate statistics
         total_questions = len(results)
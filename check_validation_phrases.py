@@ -8,6 +8,9 @@ import json
 import re
 from typing import Dict, List, Tuple
 
+from analysis_index import WaveIndex, load_wave_index
+from phrase_index import PhraseIndex
+
 
 def normalize_text(text: str) -> str:
     """Normalize text for comparison."""
@@ -29,14 +32,20 @@ def extract_ngrams(text: str, n: int) -> List[str]:
 
 
 def find_distinctive_phrase(
-    question_text: str, all_questions: List[str], min_words: int = 2, max_words: int = 4
+    question_text: str,
+    all_questions: List[str],
+    min_words: int = 2,
+    max_words: int = 4,
+    phrase_index: PhraseIndex = None,
 ) -> Tuple[str, int]:
     """
     Find the shortest distinctive phrase from the question that uniquely identifies it.
     Returns (phrase, occurrences) where occurrences is how many questions contain this phrase.
+    Pass the wave's PhraseIndex to avoid re-normalizing and rescanning the wave.
     """
     question_text = normalize_text(question_text)
-    normalized_questions = [normalize_text(q) for q in all_questions]
+    if phrase_index is None:
+        phrase_index = PhraseIndex([normalize_text(q) for q in all_questions])
 
     # Try different n-gram sizes, starting with shorter phrases
     for n in range(min_words, max_words + 1):
@@ -79,7 +88,7 @@ def find_distinctive_phrase(
                 continue
 
             # Count how many questions contain this exact phrase
-            occurrences = sum(1 for q in normalized_questions if ngram in q)
+            occurrences = phrase_index.doc_count(ngram)
 
             # If unique or very distinctive, return it
             if occurrences == 1:
@@ -91,46 +100,32 @@ def find_distinctive_phrase(
     words = question_text.split()
     for word in words:
         if len(word) >= 6:  # Longer words are more distinctive
-            occurrences = sum(1 for q in normalized_questions if word in q)
+            occurrences = phrase_index.doc_count(word)
             if occurrences == 1:
                 return (word, occurrences)
 
     # Last resort: return the longest phrase even if not unique
     if words:
         best_ngram = " ".join(words[: min(3, len(words))])
-        occurrences = sum(1 for q in normalized_questions if best_ngram in q)
+        occurrences = phrase_index.doc_count(best_ngram)
         return (best_ngram, occurrences)
 
     return ("", 0)
 
 
-def analyze_wave(wave_name: str) -> Dict:
+def analyze_wave(wave_name: str, index: WaveIndex = None) -> Dict:
     """Analyze a wave to find validation phrases for all questions."""
 
     try:
-        with open(f"{wave_name}_crosswalk.json", "r") as f:
-            data = json.load(f)
-
-        # Extract all questions
-        questions = []
-        if "domains" in data and isinstance(data["domains"], list):
-            for domain in data["domains"]:
-                if "variables" in domain:
-                    questions.extend(domain["variables"])
-
-        # Get all question texts for comparison
-        all_question_texts = [q.get("question_text", "") for q in questions]
+        if index is None:
+            index = load_wave_index(wave_name)
 
         # Find validation phrase for each question
         results = {}
-        for q in questions:
-            var_id = q.get("variable_id", "")
-            q_text = q.get("question_text", "")
-
-            if not q_text or not var_id:
-                continue
-
-            phrase, occurrences = find_distinctive_phrase(q_text, all_question_texts)
+        for var_id, q_text, _ in index.entries():
+            phrase, occurrences = find_distinctive_phrase(
+                q_text, index.texts, phrase_index=index.phrases
+            )
 
             results[var_id] = {
                 "question_text": q_text,
@@ -8,6 +8,9 @@ import json
 import re
 from typing import Dict, List, Tuple
 
+from analysis_index import WaveIndex, load_wave_index
+from phrase_index import PhraseIndex
+
 
 def normalize_text(text: str) -> str:
     """Normalize text for comparison."""
@@ -130,14 +133,17 @@ def score_phrase(phrase: str, occurrences: int, phrase_length: int) -> float:
 
 
 def find_best_validation_phrase(
-    question_text: str, all_questions: List[str]
+    question_text: str, all_questions: List[str], phrase_index: PhraseIndex = None
 ) -> Tuple[str, int, float]:
     """
     Find the best validation phrase for a question.
     Returns (phrase, occurrences, score).
+    Pass a PhraseIndex over the normalized questions to count occurrences
+    without rescanning the wave for every n-gram.
     """
     question_text = normalize_text(question_text)
-    normalized_questions = [normalize_text(q) for q in all_questions]
+    if phrase_index is None:
+        phrase_index = PhraseIndex([normalize_text(q) for q in all_questions])
 
     # Extract all possible n-grams
     ngrams = extract_ngrams(question_text, min_n=2, max_n=6)
@@ -150,7 +156,7 @@ def find_best_validation_phrase(
             continue
 
         # Count occurrences
-        occurrences = sum(1 for q in normalized_questions if ngram in q)
+        occurrences = phrase_index.doc_count(ngram)
 
         # Score the phrase
         score = score_phrase(ngram, occurrences, length)
@@ -175,47 +181,31 @@ def find_best_validation_phrase(
     words = question_text.split()
     for word in words:
         if len(word) >= 6 and not is_too_generic(word):
-            occurrences = sum(1 for q in normalized_questions if word in q)
+            occurrences = phrase_index.doc_count(word)
             if occurrences <= 2:
                 return (word, occurrences, 50.0)
 
     # Last resort
     if words:
         fallback = " ".join(words[:3])
-        occurrences = sum(1 for q in normalized_questions if fallback in q)
+        occurrences = phrase_index.doc_count(fallback)
         return (fallback, occurrences, 10.0)
 
     return ("", 0, 0.0)
 
 
-def analyze_wave(wave_name: str) -> Dict:
+def analyze_wave(wave_name: str, index: WaveIndex = None) -> Dict:
     """Analyze a wave to find best validation phrases for all questions."""
 
     try:
-        with open(f"{wave_name}_crosswalk.json", "r") as f:
-            data = json.load(f)
-
-        # Extract all questions
-        questions = []
-        if "domains" in data and isinstance(data["domains"], list):
-            for domain in data["domains"]:
-                if "variables" in domain:
-                    questions.extend(domain["variables"])
-
-        # Get all question texts
-        all_question_texts = [q.get("question_text", "") for q in questions]
+        if index is None:
+            index = load_wave_index(wave_name)
 
         # Find best validation phrase for each question
         results = {}
-        for q in questions:
-            var_id = q.get("variable_id", "")
-            q_text = q.get("question_text", "")
-
-            if not q_text or not var_id:
-                continue
-
+        for var_id, q_text, _ in index.entries():
             phrase, occurrences, score = find_best_validation_phrase(
-                q_text, all_question_texts
+                q_text, index.texts, index.phrases
             )
 
             results[var_id] = {
@@ -0,0 +1,146 @@
+"""
+abs-llm-nlp: single entry point for every pipeline stage
+
+    abs-llm-nlp parse W5_labels.txt W5_atomic.json
+    abs-llm-nlp guess W5_atomic.json W5_analyzed.json
+    abs-llm-nlp concepts W5_analyzed.json W5_enriched.json W5_crosswalk.json
+    abs-llm-nlp match
+    abs-llm-nlp startup-bench
+
+Stage modules are imported only when their subcommand runs, and the stage
+modules themselves defer groq / huggingface_hub / sentence_transformers /
+faiss until a client or model is actually built, so `--help` and the
+non-LLM stages start without loading any of them.
+"""
+
+import os
+import sys
+import argparse
+import importlib
+from typing import List, Optional
+
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts")
+
+# Subcommand -> (module, help). Modules listed in SCRIPT_MODULES live in scripts/
+COMMANDS = {
+    "parse": ("parse_labels", "Parse a labels file or .sav metadata into atomic JSON"),
+    "guess": ("intelligent_guesser", "Classify scales and flag reversals"),
+    "concepts": ("extract_concepts", "Extract concepts/domains and build the crosswalk"),
+    "reprocess": ("reprocess_unknown", "Re-run concept extraction for Unknown domains"),
+    "csv": ("generate_csv", "Convert enriched JSON to concept CSVs"),
+    "recoders": ("generate_r_recoders", "Generate the multi-wave R reversal script"),
+    "reversal-guide": ("export_reversal_guide", "Export per-wave reversal guides"),
+    "match": ("semantic_matcher_full", "Cross-wave semantic question matching"),
+    "cluster": ("cluster_questions", "Cluster pairwise matches into question groups"),
+    "compare-encoders": ("compare_encoders", "Recall of a matcher encoder vs stored matches"),
+    "add-wave": ("add_wave", "Match a new wave against saved matcher state and update clusters"),
+    "countries": ("country_ingest", "Ingest all country releases of a wave, deduplicating shared items"),
+    "to-parquet": ("sav_to_parquet", "Convert .sav respondent data to a partitioned Parquet cache"),
+    "recode-plan": ("recode_plan", "Build recode plans and emit the per-wave R scripts"),
+    "reverse": ("reversal_engine", "Reverse scales over the Parquet respondent data"),
+    "regenerate": ("regenerate_all_waves", "Rebuild atomic, enriched and CSV files for all waves"),
+    "synthetic": ("synthetic_codebook", "Generate scaled synthetic labels files"),
+    "benchmark": ("benchmark_stages", "Benchmark pipeline stages against the baseline"),
+    "usage": ("llm_accounting", "Report LLM token usage and cost from a ledger"),
+    "cassette": ("llm_cassette", "Offline throughput benchmark of a recorded cassette"),
+    "startup-bench": ("startup_benchmark", "Measure import/startup time of each subcommand"),
+}
+
+SCRIPT_MODULES = {"semantic_matcher_full", "cluster_questions", "compare_encoders", "add_wave"}
+
+# Subcommands whose module main() parses sys.argv itself
+PASSTHROUGH = {
+    "guess",
+    "csv",
+    "recoders",
+    "reversal-guide",
+    "match",
+    "cluster",
+    "compare-encoders",
+    "add-wave",
+    "countries",
+    "to-parquet",
+    "recode-plan",
+    "reverse",
+    "regenerate",
+    "synthetic",
+    "benchmark",
+    "usage",
+    "cassette",
+    "startup-bench",
+}
+
+
+def load_module(name: str):
+    """Import a stage module on demand"""
+    if name in SCRIPT_MODULES and SCRIPTS_DIR not in sys.path:
+        sys.path.insert(0, SCRIPTS_DIR)
+    return importlib.import_module(name)
+
+
+def run_passthrough(command: str, argv: List[str]):
+    """Run a module's own main() with the remaining arguments"""
+    module = load_module(COMMANDS[command][0])
+    sys.argv = [f"abs-llm-nlp {command}"] + argv
+    return module.main()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="abs-llm-nlp", description="Asian Barometer survey NLP pipeline"
+    )
+    subparsers = parser.add_subparsers(dest="command", metavar="<command>")
+
+    stage = {}
+    for command, (_, help_text) in COMMANDS.items():
+        if command in PASSTHROUGH:
+            sub = subparsers.add_parser(command, help=help_text, add_help=False)
+            sub.add_argument("args", nargs=argparse.REMAINDER)
+        else:
+            stage[command] = subparsers.add_parser(command, help=help_text)
+
+    stage["parse"].add_argument("labels_file", help="W*_labels.txt or a .sav release")
+    stage["parse"].add_argument("output_file")
+
+    stage["concepts"].add_argument("input_file", help="Atomic or analyzed JSON")
+    stage["concepts"].add_argument("enriched_output")
+    stage["concepts"].add_argument("crosswalk_output")
+
+    stage["reprocess"].add_argument(
+        "base_name", help="Wave prefix, e.g. W5 (reads W5_enriched.json)"
+    )
+    stage["reprocess"].add_argument("--model", default="llama-3.1-8b-instant")
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None):
+    argv = sys.argv[1:] if argv is None else argv
+
+    # Dispatched before argparse so options such as --help reach the module
+    if argv and argv[0] in PASSTHROUGH:
+        return run_passthrough(argv[0], argv[1:])
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.command is None:
+        parser.print_help()
+        return 1
+
+    if args.command == "parse":
+        load_module("parse_labels").main(args.labels_file, args.output_file)
+    elif args.command == "concepts":
+        load_module("extract_concepts").main(
+            args.input_file, args.enriched_output, args.crosswalk_output
+        )
+    elif args.command == "reprocess":
+        load_module("reprocess_unknown").main(
+            f"{args.base_name}_enriched.json", args.base_name, args.model
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
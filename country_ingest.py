@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Multi-country ingestion of a wave's .sav releases (W6 by default)
+
+data/raw/wave6/ holds one release per country, but the pipeline was run
+for W6_Cambodia only; nine serial runs would repeat the same work for the
+items every country shares. This mode:
+
+1. reads every country codebook in parallel (metadata only, see
+   sav_ingest.SavMetadataParser), one worker process per file
+2. fingerprints each variable by its canonical question text plus its scale
+   signature (sorted value codes and labels)
+3. builds atomic JSON once per distinct stem group and classifies each
+   distinct scale once (IntelligentGuesser), fanning the results out to
+   every country's variable IDs
+4. optionally runs concept extraction per country with one shared
+   CONCEPT_CACHE, so each distinct text is sent to the LLM once
+5. records country-specific deviations: per variable ID (case-insensitive),
+   the countries whose text or scale differs from the most common version,
+   countries where the variable is missing, and country-only variables
+
+Writes W{n}_{Country}_atomic.json / _analyzed.json (and _enriched.json /
+_crosswalk.json with --concepts) per country, plus
+W{n}_fingerprints.json and W{n}_country_deviations.json.
+
+Usage:
+    python country_ingest.py
+    python country_ingest.py --workers 4 --output-dir w6_countries --concepts
+"""
+
+import os
+import re
+import glob
+import json
+import time
+import hashlib
+import argparse
+import multiprocessing
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from instrumentation import metrics
+from text_dedup import canonicalize, record_savings
+
+RAW_DIR = os.path.join("data", "raw")
+
+_RELEASE_NAME = re.compile(r"^W(\d+)_(?:\d+_)?([A-Za-z]+)")
+
+
+def find_country_releases(wave: int = 6, raw_dir: str = RAW_DIR) -> Dict[str, str]:
+    """Country -> .sav path, e.g. W6_11_Vietnam_Release_20250117.sav -> Vietnam"""
+    releases = {}
+    for path in sorted(glob.glob(os.path.join(raw_dir, f"wave{wave}", "*.sav"))):
+        match = _RELEASE_NAME.match(os.path.basename(path))
+        if match and int(match.group(1)) == wave:
+            releases[match.group(2)] = path
+    return releases
+
+
+def scale_signature(value_labels: List[Dict]) -> Tuple:
+    """Value codes and lowercased labels, order-independent"""
+    return tuple(sorted((vl["value"], vl["label"].strip().lower()) for vl in value_labels))
+
+
+def variable_fingerprint(variable: Dict) -> str:
+    """Hash of canonical question text + scale signature"""
+    key = json.dumps([canonicalize(variable["question_text"]), scale_signature(variable["value_labels"])])
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def _read_codebook(path: str) -> List[Dict]:
+    from sav_ingest import SavMetadataParser
+
+    return SavMetadataParser(path).parse()
+
+
+def read_codebooks(releases: Dict[str, str], workers: int = 0) -> Dict[str, List[Dict]]:
+    """Parse every release; workers=0 uses one process per file up to the core count"""
+    workers = workers or min(len(releases), os.cpu_count() or 1)
+    paths = list(releases.values())
+    if workers <= 1:
+        codebooks = [_read_codebook(p) for p in paths]
+    else:
+        with multiprocessing.get_context("spawn").Pool(workers) as pool:
+            codebooks = pool.map(_read_codebook, paths)
+    return dict(zip(releases, codebooks))
+
+
+class CountryIngester:
+    """Atomic + analyzed variables for many countries, deduplicated by fingerprint"""
+
+    def __init__(self, generator=None, guesser=None):
+        from parse_labels import AtomicJSONGenerator
+        from intelligent_guesser import IntelligentGuesser
+
+        self.generator = generator or AtomicJSONGenerator()
+        self.guesser = guesser or IntelligentGuesser()
+        self.group_cache: Dict[Tuple[str, ...], List[Dict]] = {}
+        self.scale_cache: Dict[Tuple, Dict] = {}
+        self.stats = Counter()
+
+    def atomic_variables(self, variables: List[Dict]) -> List[Dict]:
+        """parse_labels.main() for one country, reusing groups already generated"""
+        from parse_labels import LabelsParser
+
+        parser = LabelsParser("")
+        parser.variables = variables
+        stem_groups = parser.detect_stem_groups()
+
+        grouped = set()
+        atomic = []
+        for group in stem_groups:
+            grouped.update(group)
+            group_vars = [variables[i] for i in group]
+            # Keyed on the raw variables, not the fingerprint, so each country keeps its exact text
+            key = tuple(
+                json.dumps({k: val for k, val in v.items() if k != "variable_id"}, sort_keys=True)
+                for v in group_vars
+            )
+            self.stats["groups"] += 1
+            if key not in self.group_cache:
+                self.group_cache[key] = self.generator.generate_for_group(group_vars)
+                self.stats["groups_generated"] += 1
+            # Same texts in the same order: reuse the result under this country's IDs
+            for var, generated in zip(group_vars, self.group_cache[key]):
+                atomic.append({**generated, "variable_id": var["variable_id"]})
+
+        atomic.extend(v for i, v in enumerate(variables) if i not in grouped)
+        atomic.sort(key=lambda x: x["variable_id"])
+        return atomic
+
+    def analyze(self, atomic: List[Dict]) -> List[Dict]:
+        """IntelligentGuesser.analyze_questionnaire() with one classification per scale"""
+        analyzed = []
+        for var in atomic:
+            signature = tuple((vl["value"], vl["label"]) for vl in var["value_labels"])
+            self.stats["scales"] += 1
+            if signature not in self.scale_cache:
+                analysis = self.guesser.classify_scale(var["value_labels"])
+                self.scale_cache[signature] = analysis.to_dict()
+                self.stats["scales_classified"] += 1
+            analyzed.append({**var, "scale_analysis": dict(self.scale_cache[signature])})
+        return analyzed
+
+
+def build_fingerprints(codebooks: Dict[str, List[Dict]]) -> Dict[str, Dict]:
+    """Fingerprint -> text, value labels and the variable ID in each country"""
+    fingerprints = {}
+    for country, variables in codebooks.items():
+        for var in variables:
+            entry = fingerprints.setdefault(
+                variable_fingerprint(var),
+                {"question_text": var["question_text"], "value_labels": var["value_labels"], "countries": {}},
+            )
+            entry["countries"][country] = var["variable_id"]
+    return fingerprints
+
+
+def find_deviations(codebooks: Dict[str, List[Dict]]) -> Dict:
+    """Countries whose version of a variable differs from the most common one"""
+    countries = list(codebooks)
+    versions = defaultdict(dict)  # lowercase variable ID -> country -> variable
+    for country, variables in codebooks.items():
+        for var in variables:
+            versions[var["variable_id"].lower()][country] = var
+
+    deviations = []
+    country_only = defaultdict(list)
+    for var_key, by_country in versions.items():
+        if len(by_country) == 1:
+            (country, var), = by_country.items()
+            country_only[country].append(var["variable_id"])
+            continue
+
+        counts = Counter(variable_fingerprint(v) for v in by_country.values())
+        reference = next(v for v in by_country.values() if variable_fingerprint(v) == counts.most_common(1)[0][0])
+        differing = []
+        for country, var in by_country.items():
+            text_differs = canonicalize(var["question_text"]) != canonicalize(reference["question_text"])
+            scale_differs = scale_signature(var["value_labels"]) != scale_signature(reference["value_labels"])
+            if text_differs or scale_differs:
+                differing.append(
+                    {
+                        "country": country,
+                        "variable_id": var["variable_id"],
+                        "kind": "text+scale" if text_differs and scale_differs else ("text" if text_differs else "scale"),
+                        "question_text": var["question_text"],
+                        "value_labels": var["value_labels"],
+                    }
+                )
+
+        missing = [c for c in countries if c not in by_country]
+        if differing or missing:
+            deviations.append(
+                {
+                    "variable": var_key,
+                    "countries": len(by_country),
+                    "reference": {
+                        "question_text": reference["question_text"],
+                        "value_labels": reference["value_labels"],
+                        "countries": counts.most_common(1)[0][1],
+                    },
+                    "deviations": differing,
+                    "missing_in": missing,
+                }
+            )
+
+    return {
+        "countries": countries,
+        "variables": len(versions),
+        "deviating_variables": sum(1 for d in deviations if d["deviations"]),
+        "partially_missing_variables": sum(1 for d in deviations if d["missing_in"]),
+        "deviations": deviations,
+        "country_only": dict(country_only),
+    }
+
+
+def run_concepts(wave_names: List[str], output_dir: str, cache_path: str):
+    """extract_concepts per country with one concept cache shared by all of them"""
+    from extract_concepts import main as extract_concepts_main
+
+    os.environ.setdefault("CONCEPT_CACHE", cache_path)
+    for name in wave_names:
+        print(f"\n🧠 Extracting concepts for {name} (cache: {os.environ['CONCEPT_CACHE']})")
+        extract_concepts_main(
+            os.path.join(output_dir, f"{name}_analyzed.json"),
+            os.path.join(output_dir, f"{name}_enriched.json"),
+            os.path.join(output_dir, f"{name}_crosswalk.json"),
+        )
+
+
+def write_json(path: str, payload):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, ensure_ascii=False)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Ingest every country release of a wave in one run")
+    parser.add_argument("--wave", type=int, default=6)
+    parser.add_argument("--raw-dir", default=RAW_DIR)
+    parser.add_argument("--countries", nargs="+", help="Subset of countries (default: all releases)")
+    parser.add_argument("--workers", type=int, default=0, help="Codebook reader processes (default: one per file, up to the core count)")
+    parser.add_argument("--output-dir", default="w6_countries")
+    parser.add_argument("--concepts", action="store_true", help="Also run concept extraction per country")
+    args = parser.parse_args(argv)
+
+    releases = find_country_releases(args.wave, args.raw_dir)
+    if args.countries:
+        releases = {c: p for c, p in releases.items() if c in args.countries}
+    if not releases:
+        print(f"❌ No wave {args.wave} releases found under {args.raw_dir}")
+        return 1
+
+    print("=" * 60)
+    print(f"W{args.wave} multi-country ingestion: {len(releases)} releases")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    with metrics.timer("stage.read_codebooks", items=len(releases)):
+        codebooks = read_codebooks(releases, args.workers)
+    for country, variables in codebooks.items():
+        print(f"  {country:12s} {len(variables):4d} variables  ({os.path.basename(releases[country])})")
+    print(f"Read in {time.perf_counter() - start:.2f}s")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    ingester = CountryIngester()
+    wave_names = []
+    with metrics.timer("stage.country_atomic"):
+        for country, variables in codebooks.items():
+            name = f"W{args.wave}_{country}"
+            atomic = ingester.atomic_variables(variables)
+            write_json(os.path.join(args.output_dir, f"{name}_atomic.json"), atomic)
+            write_json(os.path.join(args.output_dir, f"{name}_analyzed.json"), ingester.analyze(atomic))
+            wave_names.append(name)
+
+    fingerprints = build_fingerprints(codebooks)
+    total = sum(len(v) for v in codebooks.values())
+    print(f"\n🔑 {total} variables → {len(fingerprints)} distinct fingerprints")
+    record_savings("country_groups", ingester.stats["groups"], ingester.stats["groups_generated"])
+    record_savings("country_scales", ingester.stats["scales"], ingester.stats["scales_classified"])
+    write_json(os.path.join(args.output_dir, f"W{args.wave}_fingerprints.json"), fingerprints)
+
+    deviations = find_deviations(codebooks)
+    deviations_file = os.path.join(args.output_dir, f"W{args.wave}_country_deviations.json")
+    write_json(deviations_file, deviations)
+    print(f"\n⚠️  {deviations['deviating_variables']} variables differ between countries, "
+          f"{deviations['partially_missing_variables']} are missing in some countries")
+    for country, var_ids in deviations["country_only"].items():
+        print(f"  {country:12s} {len(var_ids):3d} country-only variables")
+
+    if args.concepts:
+        run_concepts(wave_names, args.output_dir, os.path.join(args.output_dir, f"W{args.wave}_concept_cache.json"))
+
+    print(f"\n✅ Wrote {len(wave_names)} countries to {args.output_dir}/ (deviations: {deviations_file})")
+    metrics.emit("country_ingest")
+    return 0
+
+
+if __name__ == "__main__":
+    main()
@@ -6,102 +6,87 @@ Creates a CSV that shows:
 - Their scale type
 - Distinctive keyword for validation
 - Question text
+
+main() loads each W*_analyzed.json once, computes its keywords once and
+streams the rows into the per-wave CSV and ALL_WAVES_reversal_guide.csv
+together; with --r-script the same loaded data and keywords also produce
+the multi-wave R script (as generate_r_recoders.py would):
+
+    python export_reversal_guide.py
+    python export_reversal_guide.py --r-script reverse_scales.R --batched
 """
 
 import json
 import csv
-import re
-from collections import Counter
-
-
-def build_word_frequency(all_questions, min_length=5):
-    """Build word frequency across all questions in wave"""
-    stop_words = {
-        "the",
-        "a",
-        "an",
-        "and",
-        "or",
-        "but",
-        "in",
-        "on",
-        "at",
-        "to",
-        "for",
-        "of",
-        "with",
-        "by",
-        "from",
-        "is",
-        "are",
-        "was",
-        "were",
-        "be",
-        "been",
-        "have",
-        "has",
-        "had",
-        "do",
-        "does",
-        "did",
-        "will",
-        "would",
-        "should",
-        "could",
-        "may",
-        "might",
-        "must",
-        "can",
-        "your",
-        "you",
-        "how",
-        "what",
-        "which",
-        "when",
-        "where",
-        "who",
-        "why",
-        "that",
-        "this",
-        "these",
-        "those",
-        "question",
-        "please",
-        "following",
-    }
-
-    word_freq = Counter()
-
-    for question in all_questions:
-        text = question.lower()
-        text = re.sub(r"[^\w\s]", " ", text)
-        words = [
-            w for w in text.split() if len(w) >= min_length and w not in stop_words
-        ]
-        word_freq.update(words)
-
-    return word_freq, stop_words
-
-
-def extract_distinctive_keyword(question_text, word_freq, stop_words, min_length=5):
-    """Extract most distinctive word from question using wave-wide frequency"""
-
-    # Clean and split
-    text = question_text.lower()
-    text = re.sub(r"[^\w\s]", " ", text)
-    words = [w for w in text.split() if len(w) >= min_length and w not in stop_words]
-
-    if not words:
-        return question_text[:15]
-
-    # Find word with lowest frequency (most distinctive)
-    word_scores = {word: word_freq[word] for word in words}
-    if word_scores:
-        distinctive_word = min(word_scores.items(), key=lambda x: x[1])[0]
-        return distinctive_word
+import argparse
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from generate_r_recoders import ALL_WAVES_HEADER, RRecoderGenerator
+from instrumentation import metrics
+
+GUIDE_COLUMNS = [
+    "wave",
+    "variable_id",
+    "question_type",
+    "scale_type",
+    "scale_points",
+    "max_value",
+    "missing_codes",
+    "distinctive_keyword",
+    "question_text",
+]
+
+
+def reversal_guide_rows(variables: List[Dict], wave_name: str, keywords: Dict[str, str]) -> Iterator[List]:
+    """Guide rows (GUIDE_COLUMNS) of the variables needing reversal"""
+    for var in variables:
+        sa = var["scale_analysis"]
+        if not sa["needs_reversal"]:
+            continue
+        var_id = var["variable_id"]
+
+        # Determine question type
+        if var_id.lower().startswith("q"):
+            q_type = "core_questionnaire"
+        elif var_id.lower().startswith("ir"):
+            q_type = "interviewer"
+        elif var_id.lower().startswith("se"):
+            q_type = "socioeconomic"
+        else:
+            q_type = "other"
+
+        # Get missing codes
+        if sa["first_na_value"] is not None:
+            missing_codes = sorted(
+                set(
+                    [
+                        vl["value"]
+                        for vl in var["value_labels"]
+                        if vl["value"] < 0 or vl["value"] >= sa["first_na_value"]
+                    ]
+                )
+            )
+        else:
+            missing_codes = sorted(
+                set([vl["value"] for vl in var["value_labels"] if vl["value"] < 0])
+            )
 
-    # Fallback
-    return words[0] if words else question_text[:15]
+        if not missing_codes:
+            missing_codes = [-1, 7, 8, 9]  # Default
+
+        yield [
+            wave_name,
+            var_id,
+            q_type,
+            sa["scale_type"],
+            sa["scale_points"],
+            sa["max_substantive_value"],
+            "; ".join(map(str, missing_codes)),
+            keywords[var_id],
+            var["question_text"][:100] + "..."
+            if len(var["question_text"]) > 100
+            else var["question_text"],
+        ]
 
 
 def generate_reversal_guide(wave_file, wave_name, output_csv):
@@ -110,86 +95,74 @@ def generate_reversal_guide(wave_file, wave_name, output_csv):
     with open(wave_file, "r", encoding="utf-8") as f:
         variables = json.load(f)
 
-    # Build word frequency across entire wave
-    all_questions = [v["question_text"] for v in variables]
-    word_freq, stop_words = build_word_frequency(all_questions)
-
-    # Filter to variables needing reversal
-    reversal_vars = [v for v in variables if v["scale_analysis"]["needs_reversal"]]
+    # Same keywords as the R validation guards
+    keywords = RRecoderGenerator().distinctive_keywords(variables)
 
     with open(output_csv, "w", encoding="utf-8", newline="") as f:
         writer = csv.writer(f)
-        writer.writerow(
-            [
-                "wave",
-                "variable_id",
-                "question_type",
-                "scale_type",
-                "scale_points",
-                "max_value",
-                "missing_codes",
-                "distinctive_keyword",
-                "question_text",
-            ]
-        )
-
-        for var in reversal_vars:
-            sa = var["scale_analysis"]
-            var_id = var["variable_id"]
-
-            # Determine question type
-            if var_id.lower().startswith("q"):
-                q_type = "core_questionnaire"
-            elif var_id.lower().startswith("ir"):
-                q_type = "interviewer"
-            elif var_id.lower().startswith("se"):
-                q_type = "socioeconomic"
-            else:
-                q_type = "other"
-
-            # Get missing codes
-            if sa["first_na_value"] is not None:
-                missing_codes = sorted(
-                    set(
-                        [
-                            vl["value"]
-                            for vl in var["value_labels"]
-                            if vl["value"] < 0 or vl["value"] >= sa["first_na_value"]
-                        ]
-                    )
-                )
-            else:
-                missing_codes = sorted(
-                    set([vl["value"] for vl in var["value_labels"] if vl["value"] < 0])
-                )
-
-            if not missing_codes:
-                missing_codes = [-1, 7, 8, 9]  # Default
-
-            keyword = extract_distinctive_keyword(
-                var["question_text"], word_freq, stop_words
-            )
-
-            writer.writerow(
-                [
-                    wave_name,
-                    var_id,
-                    q_type,
-                    sa["scale_type"],
-                    sa["scale_points"],
-                    sa["max_substantive_value"],
-                    "; ".join(map(str, missing_codes)),
-                    keyword,
-                    var["question_text"][:100] + "..."
-                    if len(var["question_text"]) > 100
-                    else var["question_text"],
-                ]
-            )
-
-    print(f"✅ {wave_name}: {len(reversal_vars)} variables exported to {output_csv}")
-
-
-def main():
+        writer.writerow(GUIDE_COLUMNS)
+        count = 0
+        for row in reversal_guide_rows(variables, wave_name, keywords):
+            writer.writerow(row)
+            count += 1
+
+    print(f"✅ {wave_name}: {count} variables exported to {output_csv}")
+
+
+def generate_reversal_artifacts(
+    waves: List[Tuple[str, str, str]],
+    combined_csv: str = "ALL_WAVES_reversal_guide.csv",
+    r_output: Optional[str] = None,
+    batched: bool = False,
+) -> int:
+    """
+    One pass per wave: load the analyzed JSON, compute keywords once, write
+    the per-wave and combined guide rows and (optionally) the wave's R
+    recodings. Returns the number of variables in the combined guide.
+    """
+    generator = RRecoderGenerator()
+    total = 0
+    r_file = open(r_output, "w", encoding="utf-8") if r_output else None
+    try:
+        if r_file:
+            r_file.write("\n".join(ALL_WAVES_HEADER))
+
+        with open(combined_csv, "w", encoding="utf-8", newline="") as combined_f:
+            combined = csv.writer(combined_f)
+            combined.writerow(GUIDE_COLUMNS)
+
+            for wave_file, wave_name, output_csv in waves:
+                with metrics.timer("stage.reversal_guide_wave"):
+                    with metrics.timer("io.read_json"):
+                        with open(wave_file, "r", encoding="utf-8") as f:
+                            variables = json.load(f)
+                    keywords = generator.distinctive_keywords(variables)
+
+                    count = 0
+                    with open(output_csv, "w", encoding="utf-8", newline="") as f:
+                        writer = csv.writer(f)
+                        writer.writerow(GUIDE_COLUMNS)
+                        for row in reversal_guide_rows(variables, wave_name, keywords):
+                            writer.writerow(row)
+                            combined.writerow(row)
+                            count += 1
+                    total += count
+                    print(f"✅ {wave_name}: {count} variables exported to {output_csv}")
+
+                if r_file:
+                    with metrics.timer("stage.r_recoder_wave"):
+                        script = generator.build_wave_script(variables, wave_name, batched, keywords)
+                    r_file.write("\n" + script + "\n\n")
+    finally:
+        if r_file:
+            r_file.close()
+
+    if r_output:
+        print(f"✅ R script saved to {r_output}")
+    return total
+
+
+def main(argv: Optional[List[str]] = None):
     waves = [
         ("W1_analyzed.json", "W1", "W1_reversal_guide.csv"),
         ("W2_analyzed.json", "W2", "W2_reversal_guide.csv"),
@@ -199,26 +172,16 @@ def main():
         ("W6_Cambodia_analyzed.json", "W6_Cambodia", "W6_Cambodia_reversal_guide.csv"),
     ]
 
-    # Also create combined guide
-    all_reversals = []
-
-    for wave_file, wave_name, output_csv in waves:
-        generate_reversal_guide(wave_file, wave_name, output_csv)
-
-        # Add to combined
-        with open(output_csv, "r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            all_reversals.extend(list(reader))
+    parser = argparse.ArgumentParser(description="Export per-wave and combined reversal guides")
+    parser.add_argument("--combined", default="ALL_WAVES_reversal_guide.csv")
+    parser.add_argument("--r-script", help="Also write the multi-wave R script from the same pass")
+    parser.add_argument("--batched", action="store_true", help="Batched across() R recodings")
+    args = parser.parse_args(argv)
 
-    # Write combined guide
-    combined_csv = "ALL_WAVES_reversal_guide.csv"
-    with open(combined_csv, "w", encoding="utf-8", newline="") as f:
-        if all_reversals:
-            writer = csv.DictWriter(f, fieldnames=all_reversals[0].keys())
-            writer.writeheader()
-            writer.writerows(all_reversals)
+    total = generate_reversal_artifacts(waves, args.combined, args.r_script, args.batched)
 
-    print(f"\n✅ Combined guide: {combined_csv} ({len(all_reversals)} total variables)")
+    print(f"\n✅ Combined guide: {args.combined} ({total} total variables)")
+    metrics.emit("export_reversal_guide")
 
 
 if __name__ == "__main__":
@@ -12,7 +12,11 @@ import os
 import json
 import re
 from typing import List, Dict, Tuple
-from groq import Groq
+from llm_cassette import client_from_env
+from instrumentation import metrics
+from llm_accounting import ledger, wave_from_path
+from text_dedup import HashCache, TextDeduplicator, record_savings
+from phrase_index import PhraseIndex
 
 
 # ============================================================================
@@ -123,14 +127,26 @@ def score_phrase(phrase: str, occurrences: int, phrase_length: int) -> float:
 
 
 def find_best_validation_phrase(
-    question_text: str, all_questions: List[str]
+    question_text: str,
+    all_questions: List[str],
+    normalized_questions: List[str] = None,
+    phrase_index: PhraseIndex = None,
 ) -> Tuple[str, int, float]:
     """
     Find the best validation phrase for a question.
     Returns (phrase, occurrences, quality_score).
+    Pass normalized_questions to avoid re-normalizing the corpus per call, or
+    a PhraseIndex over them for O(phrase) occurrence counts; the index also
+    adds the question's shortest unique phrase as a candidate.
     """
     question_text = normalize_text(question_text)
-    normalized_questions = [normalize_text(q) for q in all_questions]
+    if phrase_index is None and normalized_questions is None:
+        normalized_questions = [normalize_text(q) for q in all_questions]
+
+    def count_occurrences(phrase: str) -> int:
+        if phrase_index is not None:
+            return phrase_index.doc_count(phrase)
+        return sum(1 for q in normalized_questions if phrase in q)
 
     # Extract all possible n-grams (3-6 words for better specificity)
     ngrams = extract_ngrams(question_text, min_n=3, max_n=6)
@@ -139,6 +155,13 @@ def find_best_validation_phrase(
     if len(question_text.split()) < 3:
         ngrams = extract_ngrams(question_text, min_n=2, max_n=6)
 
+    # Shortest multi-word run found in no other question, scored like the
+    # n-grams (single words are left to the fallback below)
+    if phrase_index is not None:
+        shortest = phrase_index.shortest_unique_phrase(question_text)
+        if shortest and len(shortest.split()) >= 2 and shortest not in {n for n, _ in ngrams}:
+            ngrams.append((shortest, len(shortest.split())))
+
     # Score each n-gram
     candidates = []
     for ngram, length in ngrams:
@@ -146,7 +169,7 @@ def find_best_validation_phrase(
             continue
 
         # Count occurrences
-        occurrences = sum(1 for q in normalized_questions if ngram in q)
+        occurrences = count_occurrences(ngram)
 
         # Score the phrase
         score = score_phrase(ngram, occurrences, length)
@@ -169,14 +192,14 @@ def find_best_validation_phrase(
     words = question_text.split()
     for word in words:
         if len(word) >= 6 and not is_too_generic(word):
-            occurrences = sum(1 for q in normalized_questions if word in q)
+            occurrences = count_occurrences(word)
             if occurrences <= 2:
                 return (word, occurrences, 50.0)
 
     # Last resort
     if words:
         fallback = " ".join(words[:3])
-        occurrences = sum(1 for q in normalized_questions if fallback in q)
+        occurrences = count_occurrences(fallback)
         return (fallback, occurrences, 10.0)
 
     return ("", 0, 0.0)
@@ -188,14 +211,25 @@ def add_validation_phrases(variables: List[Dict]) -> List[Dict]:
 
     # Get all question texts
     all_question_texts = [v.get("question_text", "") for v in variables]
-
-    # Find best validation phrase for each variable
-    for var in variables:
-        q_text = var.get("question_text", "")
-        if q_text:
-            phrase, occurrences, score = find_best_validation_phrase(
-                q_text, all_question_texts
+    normalized_questions = [normalize_text(q) for q in all_question_texts]
+
+    # Search once per unique text; occurrences still count every question
+    dedup = TextDeduplicator(all_question_texts)
+    with metrics.timer("stage.validation_phrases", items=dedup.unique):
+        phrase_index = PhraseIndex(normalized_questions)
+        unique_phrases = [
+            find_best_validation_phrase(
+                q_text, all_question_texts, normalized_questions, phrase_index
             )
+            if q_text
+            else None
+            for q_text in dedup.unique_texts
+        ]
+    record_savings("validation_phrases", dedup.total, dedup.unique)
+
+    for var, result in zip(variables, dedup.fan_out(unique_phrases)):
+        if result:
+            phrase, occurrences, score = result
             var["validation_phrase"] = phrase
             var["validation_phrase_occurrences"] = occurrences
             var["validation_phrase_score"] = score
@@ -219,10 +253,22 @@ def add_validation_phrases(variables: List[Dict]) -> List[Dict]:
 # ============================================================================
 
 
+# Name recorded in the LLM usage ledger for the batch concept prompt below;
+# bump it whenever the prompt wording changes
+CONCEPT_PROMPT_TEMPLATE = "concept_batch_v1"
+
+
 class ConceptExtractor:
     """Extract concepts and domains from atomic questions"""
 
-    def __init__(self, model="llama-3.1-8b-instant"):
+    def __init__(
+        self,
+        model="llama-3.1-8b-instant",
+        client=None,
+        wave=None,
+        max_retries=0,
+        cache_path=None,
+    ):
         """
         Initialize with Groq API.
 
@@ -230,15 +276,36 @@ class ConceptExtractor:
         - llama-3.1-8b-instant (faster, lower token usage, default)
         - llama-3.3-70b-versatile (best quality, higher token usage)
         - mixtral-8x7b-32768 (alternative)
+
+        A pre-built client (e.g. llm_cassette.ReplayClient) can be passed in;
+        otherwise LLM_CASSETTE_MODE decides between live, record and replay.
+
+        `wave` labels calls in the usage ledger; failed calls are retried up
+        to `max_retries` times before the batch falls back to Unknown.
+
+        Each unique question text is sent once. `cache_path` (default: env
+        CONCEPT_CACHE) keeps concepts by text hash across runs, so items an
+        earlier wave already annotated skip the LLM.
         """
+        if client is None:
+            client = client_from_env(self._make_groq_client)
+
+        self.client = client
+        self.model = model
+        self.wave = wave
+        self.max_retries = max_retries
+        self.cache = HashCache(cache_path or os.getenv("CONCEPT_CACHE"))
+
+    @staticmethod
+    def _make_groq_client():
+        from groq import Groq
+
         api_key = os.getenv("GROQ_API_KEY")
         if not api_key:
             raise ValueError(
                 "GROQ_API_KEY environment variable not set. Get your free key at: https://console.groq.com"
             )
-
-        self.client = Groq(api_key=api_key)
-        self.model = model
+        return Groq(api_key=api_key)
 
     def extract_concepts_batch(
         self, variables: List[Dict], batch_size: int = 10
@@ -247,6 +314,35 @@ class ConceptExtractor:
         Extract concepts from a batch of variables.
         Returns enriched variables with concept/domain annotations.
         """
+        dedup = TextDeduplicator([v.get("question_text", "") for v in variables])
+        annotations = []
+        for text in dedup.unique_texts:
+            cached = self.cache.get(text)
+            annotations.append(cached if cached and cached["model"] == self.model else None)
+        pending = [u for u, annotation in enumerate(annotations) if annotation is None]
+
+        # One LLM annotation per unique uncached text, fanned out to duplicates
+        representatives = [variables[dedup.first_index[u]] for u in pending]
+        for u, var in zip(pending, self._extract_in_batches(representatives, batch_size)):
+            annotations[u] = {
+                "domain": var["domain"],
+                "concepts": var["concepts"],
+                "model": self.model,
+            }
+            if var["domain"] != "Unknown":
+                self.cache.put(var["question_text"], annotations[u])
+        self.cache.save()
+        record_savings("llm_concepts", dedup.total, len(pending))
+
+        enriched = []
+        for var, annotation in zip(variables, dedup.fan_out(annotations)):
+            var_copy = var.copy()
+            var_copy["domain"] = annotation["domain"]
+            var_copy["concepts"] = annotation["concepts"]
+            enriched.append(var_copy)
+        return enriched
+
+    def _extract_in_batches(self, variables: List[Dict], batch_size: int) -> List[Dict]:
         enriched = []
 
         for i in range(0, len(variables), batch_size):
@@ -260,6 +356,7 @@ class ConceptExtractor:
                 enriched.extend(concepts)
             except Exception as e:
                 print(f"    Error processing batch: {e}")
+                metrics.incr("llm.concepts.errors")
                 # Fallback: add empty concepts
                 for var in batch:
                     var_copy = var.copy()
@@ -306,12 +403,20 @@ Return ONLY valid JSON, no markdown."""
             {"role": "user", "content": prompt},
         ]
 
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            max_tokens=2048,
-            temperature=0.3,
-        )
+        metrics.incr("llm.concepts.calls")
+        with metrics.timer("llm.concepts", items=len(variables)):
+            response = ledger.complete(
+                self.client,
+                model=self.model,
+                messages=messages,
+                stage="extract_concepts",
+                wave=self.wave,
+                template=CONCEPT_PROMPT_TEMPLATE,
+                items=len(variables),
+                max_retries=self.max_retries,
+                max_tokens=2048,
+                temperature=0.3,
+            )
 
         content = response.choices[0].message.content
         # Remove markdown if present
@@ -382,8 +487,9 @@ def generate_crosswalk(enriched_variables: List[Dict], output_file: str):
         }
         crosswalk["domains"].append(domain_entry)
 
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(crosswalk, f, indent=2, ensure_ascii=False)
+    with metrics.timer("io.write_json"):
+        with open(output_file, "w", encoding="utf-8") as f:
+            json.dump(crosswalk, f, indent=2, ensure_ascii=False)
 
     print(f"\nCrosswalk saved to {output_file}")
     print(f"  Total domains: {len(domain_groups)}")
@@ -395,29 +501,37 @@ def main(atomic_json_file: str, enriched_output: str, crosswalk_output: str):
     """Main pipeline: Atomic JSON → Concepts → Crosswalk"""
 
     print(f"Loading atomic JSON from {atomic_json_file}...")
-    with open(atomic_json_file, "r", encoding="utf-8") as f:
-        variables = json.load(f)
+    with metrics.timer("io.read_json"):
+        with open(atomic_json_file, "r", encoding="utf-8") as f:
+            variables = json.load(f)
     print(f"Loaded {len(variables)} variables")
 
     print("\nExtracting concepts and domains...")
-    extractor = ConceptExtractor()
-    enriched = extractor.extract_concepts_batch(variables, batch_size=10)
+    extractor = ConceptExtractor(wave=wave_from_path(atomic_json_file))
+    with metrics.timer("stage.extract_concepts", items=len(variables)):
+        enriched = extractor.extract_concepts_batch(variables, batch_size=10)
 
     # Add validation phrases for R pattern matching
     enriched = add_validation_phrases(enriched)
 
     print(f"\nSaving enriched variables to {enriched_output}...")
-    with open(enriched_output, "w", encoding="utf-8") as f:
-        json.dump(enriched, f, indent=2, ensure_ascii=False)
+    with metrics.timer("io.write_json"):
+        with open(enriched_output, "w", encoding="utf-8") as f:
+            json.dump(enriched, f, indent=2, ensure_ascii=False)
 
     print("\nGenerating crosswalk...")
-    generate_crosswalk(enriched, crosswalk_output)
+    with metrics.timer("stage.crosswalk", items=len(enriched)):
+        generate_crosswalk(enriched, crosswalk_output)
 
     print("\n✅ Pipeline complete!")
     print(f"  Atomic JSON: {atomic_json_file}")
     print(f"  Enriched: {enriched_output}")
     print(f"  Crosswalk: {crosswalk_output}")
 
+    ledger.print_report()
+    metrics.print_summary()
+    metrics.emit("extract_concepts")
+
 
 if __name__ == "__main__":
     atomic_json = "W6_Cambodia_analyzed.json"
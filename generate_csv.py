@@ -4,7 +4,10 @@ Convert enriched JSON to CSV formats for concepts export
 
 import json
 import csv
-import sys
+import argparse
+from typing import List, Optional
+
+from instrumentation import metrics
 
 
 def json_to_csv(enriched_json_file: str, output_csv: str, output_detailed_csv: str):
@@ -15,8 +18,9 @@ def json_to_csv(enriched_json_file: str, output_csv: str, output_detailed_csv: s
     """
 
     print(f"Loading {enriched_json_file}...")
-    with open(enriched_json_file, "r", encoding="utf-8") as f:
-        variables = json.load(f)
+    with metrics.timer("io.read_json"):
+        with open(enriched_json_file, "r", encoding="utf-8") as f:
+            variables = json.load(f)
 
     print(f"Converting {len(variables)} variables to CSV...")
 
@@ -112,18 +116,24 @@ def json_to_csv(enriched_json_file: str, output_csv: str, output_detailed_csv: s
     print(f"✅ Detailed CSV saved to {output_detailed_csv}")
 
 
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Convert enriched JSON to concept CSVs",
+        epilog="Example: python generate_csv.py W5_enriched.json W5_concepts.csv W5_concepts_detailed.csv",
+    )
+    parser.add_argument("enriched_json")
+    parser.add_argument("output_csv")
+    parser.add_argument("output_detailed_csv")
+    args = parser.parse_args(argv)
+
+    enriched_json = args.enriched_json
+    output_csv = args.output_csv
+    output_detailed_csv = args.output_detailed_csv
+
+    with metrics.timer("stage.json_to_csv"):
+        json_to_csv(enriched_json, output_csv, output_detailed_csv)
+    metrics.emit("generate_csv")
+
+
 if __name__ == "__main__":
-    if len(sys.argv) != 4:
-        print(
-            "Usage: python generate_csv.py <enriched_json> <output_csv> <output_detailed_csv>"
-        )
-        print(
-            "Example: python generate_csv.py W5_enriched.json W5_concepts.csv W5_concepts_detailed.csv"
-        )
-        sys.exit(1)
-
-    enriched_json = sys.argv[1]
-    output_csv = sys.argv[2]
-    output_detailed_csv = sys.argv[3]
-
-    json_to_csv(enriched_json, output_csv, output_detailed_csv)
+    main()
@@ -6,12 +6,44 @@ Creates wave-specific reversal functions that:
 2. Handle scale-specific reversal (4pt, 5pt, 6pt, etc.)
 3. Properly code missing values
 4. Detect outliers
+
+By default every variable gets its own mutate() call. With batched=True
+(--batched) each wave is emitted from its recode plan instead
+(recode_plan.emit_r(plan, batched=True)): one across() per reversal
+function and missing-code group, with the keyword guards evaluated once up
+front. See scripts/benchmark_reverse_scales.R for a run-time comparison.
 """
 
 import json
 import re
+import argparse
 from collections import defaultdict, Counter
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
+
+from instrumentation import metrics
+
+# Header of the multi-wave script (generate_all_waves_script)
+ALL_WAVES_HEADER = [
+    "# ============================================================",
+    "# Asian Barometer Multi-Wave Reversal Script",
+    "# Auto-generated with keyword validation",
+    "# ============================================================\n",
+    "# This script reverses scales where higher values indicate",
+    "# LESS of the attribute (e.g., 1=Satisfied, 4=Dissatisfied)",
+    "#",
+    "# Each recoding includes:",
+    "# 1. Scale-specific reversal function (4pt, 5pt, 6pt, etc.)",
+    "# 2. Keyword validation to ensure correct question",
+    "# 3. Missing value handling",
+    "# 4. Outlier detection",
+    "# ============================================================\n",
+]
+
+
+def r_comment(text: str, width: int = 60) -> str:
+    """Text for a one-line R comment: whitespace (newlines too) collapsed, truncated"""
+    text = " ".join(text.split())
+    return text[:width] + "..." if len(text) > width else text
 
 
 class RRecoderGenerator:
@@ -114,18 +146,44 @@ class RRecoderGenerator:
         # Fallback
         return words[0] if words else question_text[:15]
 
+    def distinctive_keywords(self, variables: List[Dict]) -> Dict[str, str]:
+        """variable_id -> validation keyword for every variable needing reversal"""
+        word_freq = self.build_word_frequency([v["question_text"] for v in variables])
+        return {
+            var["variable_id"]: self.extract_distinctive_keyword(var["question_text"], word_freq)
+            for var in variables
+            if var["scale_analysis"]["needs_reversal"]
+        }
+
+    def missing_codes(self, var: Dict) -> List[int]:
+        """Value codes treated as missing: negative, 7 and above, or NA labels"""
+        missing_codes = [
+            vl["value"]
+            for vl in var["value_labels"]
+            if vl["value"] < 0
+            or vl["value"] >= 7
+            or any(
+                na_word in vl["label"].lower()
+                for na_word in [
+                    "missing",
+                    "don't know",
+                    "can't choose",
+                    "decline",
+                    "not applicable",
+                ]
+            )
+        ]
+        return sorted(set(missing_codes))
+
     def generate_reversal_function(
         self,
-        scale_type: str,
-        scale_points: int,
+        func_name: str,
         max_value: int,
         missing_codes: List[int],
     ) -> str:
         """
-        Generate R reversal function for a specific scale type
+        Generate R reversal function func_name for scales coded 1..max_value
         """
-        func_name = f"safe_reverse_{scale_points}pt"
-
         # Calculate reversal formula: new = (max + 1) - old
         reverse_formula = f"{max_value + 1} - x"
 
@@ -144,18 +202,38 @@ class RRecoderGenerator:
         return r_code
 
     def generate_wave_recoding_script(
-        self, wave_analyzed_file: str, wave_name: str
+        self, wave_analyzed_file: str, wave_name: str, batched: bool = False
     ) -> str:
         """
         Generate complete R script for wave-specific recoding with keyword validation
         """
         print(f"Processing {wave_name}...")
-        with open(wave_analyzed_file, "r", encoding="utf-8") as f:
-            variables = json.load(f)
+        with metrics.timer("io.read_json"):
+            with open(wave_analyzed_file, "r", encoding="utf-8") as f:
+                variables = json.load(f)
+
+        return self.build_wave_script(variables, wave_name, batched)
+
+    def build_wave_script(
+        self,
+        variables: List[Dict],
+        wave_name: str,
+        batched: bool = False,
+        keywords: Optional[Dict[str, str]] = None,
+    ) -> str:
+        """
+        R script for already loaded variables. keywords (from
+        distinctive_keywords) are computed here when not passed in.
+        batched=True emits the wave's recode plan, which derives its own
+        keywords the same way
+        """
+        if batched:
+            from recode_plan import emit_r, plan_from_variables
+
+            return emit_r(plan_from_variables(variables, wave_name), batched=True)
 
-        # Extract all question texts and build word frequency
-        all_questions = [v["question_text"] for v in variables]
-        word_freq = self.build_word_frequency(all_questions)
+        if keywords is None:
+            keywords = self.distinctive_keywords(variables)
 
         # Group variables by scale type that need reversal
         reversal_groups = defaultdict(list)
@@ -181,36 +259,19 @@ class RRecoderGenerator:
             "library(dplyr)\n",
         ]
 
-        # Generate reversal functions (one per scale type)
+        # Generate reversal functions (one per max value)
         generated_functions = set()
         for scale_key in sorted(reversal_groups.keys()):
-            scale_type, scale_points, max_value = scale_key
+            max_value = scale_key[2]
 
-            func_name = f"safe_reverse_{scale_points}pt"
+            # Named by max value: a 4-point scale coded 1..20 needs its own
+            func_name = f"safe_reverse_{max_value}pt"
             if func_name not in generated_functions:
                 # Get typical missing codes for this scale
                 sample_var = reversal_groups[scale_key][0]
-                missing_codes = [
-                    vl["value"]
-                    for vl in sample_var["value_labels"]
-                    if vl["value"] < 0
-                    or vl["value"] >= 7
-                    or any(
-                        na_word in vl["label"].lower()
-                        for na_word in [
-                            "missing",
-                            "don't know",
-                            "can't choose",
-                            "decline",
-                            "not applicable",
-                        ]
-                    )
-                ]
-                missing_codes = sorted(set(missing_codes))
+                missing_codes = self.missing_codes(sample_var)
 
-                r_code = self.generate_reversal_function(
-                    scale_type, scale_points, max_value, missing_codes
-                )
+                r_code = self.generate_reversal_function(func_name, max_value, missing_codes)
                 r_script.append(r_code)
                 generated_functions.add(func_name)
 
@@ -228,34 +289,34 @@ class RRecoderGenerator:
         recoding_lines = []
         for scale_key in sorted(reversal_groups.keys()):
             scale_type, scale_points, max_value = scale_key
-            func_name = f"safe_reverse_{scale_points}pt"
+            func_name = f"safe_reverse_{max_value}pt"
 
             for var in reversal_groups[scale_key]:
                 var_id = var["variable_id"]
                 question = var["question_text"]
 
-                # Find distinctive keyword using frequency analysis
-                keyword = self.extract_distinctive_keyword(question, word_freq)
+                # Distinctive keyword from wave-wide frequency analysis
+                keyword = keywords[var_id]
 
                 # Truncate question for comment
-                q_short = question[:60] + "..." if len(question) > 60 else question
+                q_short = r_comment(question)
 
                 # Generate validation check
                 validation = (
-                    f'grepl("{keyword}", question_text["{var_id}"], ignore.case = TRUE)'
+                    f'grepl({json.dumps(keyword, ensure_ascii=False)}, question_text["{var_id}"], ignore.case = TRUE)'
                 )
 
                 recoding_lines.append(f"  # {var_id}: {q_short}")
-                recoding_lines.append(f"  # Keyword validation: '{keyword}'")
+                recoding_lines.append(f"  # Keyword validation: '{r_comment(keyword)}'")
                 recoding_lines.append(f"  mutate({var_id}_reversed = if_else(")
                 recoding_lines.append(f"    {validation},")
                 recoding_lines.append(f"    {func_name}({var_id}),")
                 recoding_lines.append("    NA_real_  # Validation failed!")
-                recoding_lines.append("  )),\n")
+                recoding_lines.append("  )) %>%\n")
 
-        # Remove trailing comma from last line
+        # Remove trailing pipe from last line
         if recoding_lines:
-            recoding_lines[-1] = recoding_lines[-1].rstrip(",\n")
+            recoding_lines[-1] = recoding_lines[-1].replace(" %>%\n", "")
 
         r_script.extend(recoding_lines)
 
@@ -273,31 +334,20 @@ class RRecoderGenerator:
         return "\n".join(r_script)
 
     def generate_all_waves_script(
-        self, wave_files: List[Tuple[str, str]], output_file: str
+        self, wave_files: List[Tuple[str, str]], output_file: str, batched: bool = False
     ):
         """
         Generate master R script for all waves
         """
         print("Generating R recoding script for all waves...")
 
-        all_scripts = [
-            "# ============================================================",
-            "# Asian Barometer Multi-Wave Reversal Script",
-            "# Auto-generated with keyword validation",
-            "# ============================================================\n",
-            "# This script reverses scales where higher values indicate",
-            "# LESS of the attribute (e.g., 1=Satisfied, 4=Dissatisfied)",
-            "#",
-            "# Each recoding includes:",
-            "# 1. Scale-specific reversal function (4pt, 5pt, 6pt, etc.)",
-            "# 2. Keyword validation to ensure correct question",
-            "# 3. Missing value handling",
-            "# 4. Outlier detection",
-            "# ============================================================\n",
-        ]
+        all_scripts = list(ALL_WAVES_HEADER)
 
         for wave_file, wave_name in wave_files:
-            wave_script = self.generate_wave_recoding_script(wave_file, wave_name)
+            with metrics.timer("stage.r_recoder_wave"):
+                wave_script = self.generate_wave_recoding_script(
+                    wave_file, wave_name, batched
+                )
             all_scripts.append(wave_script)
             all_scripts.append("\n")
 
@@ -308,9 +358,7 @@ class RRecoderGenerator:
         print(f"✅ R script saved to {output_file}")
 
 
-def main():
-    import sys
-
+def main(argv: Optional[List[str]] = None):
     generator = RRecoderGenerator()
 
     # Define waves to process
@@ -323,11 +371,19 @@ def main():
         ("W6_Cambodia_analyzed.json", "W6_Cambodia"),
     ]
 
-    output_file = "reverse_scales.R"
-    if len(sys.argv) > 1:
-        output_file = sys.argv[1]
+    parser = argparse.ArgumentParser(description="Generate the multi-wave R reversal script")
+    parser.add_argument("output_file", nargs="?", default="reverse_scales.R")
+    parser.add_argument(
+        "--batched", action="store_true", help="Emit each wave from its recode plan, one across() per group"
+    )
+    parser.add_argument("--waves", nargs="+", help="Only these waves, e.g. W6_Cambodia")
+    args = parser.parse_args(argv)
+
+    if args.waves:
+        waves = [(f, name) for f, name in waves if name in args.waves]
 
-    generator.generate_all_waves_script(waves, output_file)
+    generator.generate_all_waves_script(waves, args.output_file, args.batched)
+    metrics.emit("generate_r_recoders")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,249 @@
+"""
+Lightweight pipeline instrumentation: timers, counters and histograms
+
+All stages share the process-wide `metrics` registry:
+
+    from instrumentation import metrics
+
+    with metrics.timer("stage.parse", items=len(variables)):
+        ...
+    metrics.incr("llm.concepts.errors")
+    metrics.cache_hit("llm_cassette")
+
+Naming convention:
+- stage.*  Python-side pipeline stages (items/sec reported when items given)
+- io.*     JSON/CSV reads and writes
+- llm.*    LLM calls (latency percentiles)
+- cache.*  cache hits/misses (hit rate reported)
+
+Reports are written when the script calls metrics.emit(run_name) and
+ABS_METRICS_DIR is set. Set ABS_METRICS_PROMETHEUS=1 to also write a
+Prometheus text-format file next to the JSON.
+"""
+
+import os
+import re
+import json
+import math
+import time
+import threading
+from contextlib import contextmanager
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+METRICS_DIR_ENV = "ABS_METRICS_DIR"
+METRICS_PROMETHEUS_ENV = "ABS_METRICS_PROMETHEUS"
+
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(values: List[float]) -> Dict:
+    """Count, total, mean, min/max and percentiles of a list of values"""
+    ordered = sorted(values)
+    summary = {
+        "count": len(ordered),
+        "sum": sum(ordered),
+        "mean": sum(ordered) / len(ordered) if ordered else 0.0,
+        "min": ordered[0] if ordered else 0.0,
+        "max": ordered[-1] if ordered else 0.0,
+    }
+    for pct in PERCENTILES:
+        summary[f"p{pct}"] = percentile(ordered, pct)
+    return summary
+
+
+class Metrics:
+    """Thread-safe registry of timers, counters and histograms"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Clear all recorded metrics"""
+        with self._lock:
+            self.started_at = datetime.now()
+            self.counters: Dict[str, float] = defaultdict(float)
+            self.timers: Dict[str, List[float]] = defaultdict(list)
+            self.timer_items: Dict[str, int] = defaultdict(int)
+            self.histograms: Dict[str, List[float]] = defaultdict(list)
+
+    @contextmanager
+    def timer(self, name: str, items: Optional[int] = None):
+        """Time a block; `items` feeds the items/sec figure for the timer"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.timers[name].append(elapsed)
+                if items is not None:
+                    self.timer_items[name] += items
+
+    def incr(self, name: str, value: float = 1):
+        """Increment a counter"""
+        with self._lock:
+            self.counters[name] += value
+
+    def observe(self, name: str, value: float):
+        """Add a value to a histogram"""
+        with self._lock:
+            self.histograms[name].append(value)
+
+    def cache_hit(self, cache: str, count: int = 1):
+        self.incr(f"cache.{cache}.hits", count)
+
+    def cache_miss(self, cache: str, count: int = 1):
+        self.incr(f"cache.{cache}.misses", count)
+
+    def snapshot(self) -> Dict:
+        """Return all metrics as a JSON-serialisable dict"""
+        with self._lock:
+            timers = {name: list(values) for name, values in self.timers.items()}
+            timer_items = dict(self.timer_items)
+            counters = dict(self.counters)
+            histograms = {name: list(values) for name, values in self.histograms.items()}
+
+        timer_report = {}
+        for name, values in sorted(timers.items()):
+            summary = summarize(values)
+            if name in timer_items:
+                summary["items"] = timer_items[name]
+                summary["items_per_s"] = (
+                    timer_items[name] / summary["sum"] if summary["sum"] > 0 else None
+                )
+            timer_report[name] = summary
+
+        caches = {}
+        for name, value in counters.items():
+            match = re.match(r"cache\.(.+)\.(hits|misses)$", name)
+            if match:
+                caches.setdefault(match.group(1), {"hits": 0, "misses": 0})[match.group(2)] = value
+        for stats in caches.values():
+            total = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = stats["hits"] / total if total else None
+
+        return {
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "finished_at": datetime.now().isoformat(timespec="seconds"),
+            "timers": timer_report,
+            "counters": dict(sorted(counters.items())),
+            "histograms": {name: summarize(v) for name, v in sorted(histograms.items())},
+            "caches": caches,
+        }
+
+    def write_json(self, path: str) -> Dict:
+        """Write the metrics snapshot as JSON"""
+        snapshot = self.snapshot()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, indent=2)
+        return snapshot
+
+    def write_prometheus(self, path: str, run_name: str = "pipeline"):
+        """Write metrics in Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        run = _label_value(run_name)
+        lines = []
+
+        def summary_block(metric: str, help_text: str, label: str, entries: Dict):
+            if not entries:
+                return
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} summary")
+            for name, s in entries.items():
+                labels = f'run="{run}",{label}="{_label_value(name)}"'
+                for pct in PERCENTILES:
+                    lines.append(f'{metric}{{{labels},quantile="{pct / 100}"}} {s[f"p{pct}"]}')
+                lines.append(f"{metric}_sum{{{labels}}} {s['sum']}")
+                lines.append(f"{metric}_count{{{labels}}} {s['count']}")
+
+        summary_block(
+            "abs_duration_seconds",
+            "Duration of timed pipeline blocks (stage.*, io.*, llm.*)",
+            "timer",
+            snapshot["timers"],
+        )
+        summary_block("abs_observation", "Histogram observations", "name", snapshot["histograms"])
+
+        throughput = {n: s for n, s in snapshot["timers"].items() if s.get("items_per_s")}
+        if throughput:
+            lines.append("# HELP abs_items_per_second Items processed per second of timer time")
+            lines.append("# TYPE abs_items_per_second gauge")
+            for name, s in throughput.items():
+                lines.append(
+                    f'abs_items_per_second{{run="{run}",timer="{_label_value(name)}"}} {s["items_per_s"]}'
+                )
+
+        if snapshot["counters"]:
+            lines.append("# HELP abs_events_total Pipeline event counters")
+            lines.append("# TYPE abs_events_total counter")
+            for name, value in snapshot["counters"].items():
+                lines.append(f'abs_events_total{{run="{run}",name="{_label_value(name)}"}} {value}')
+
+        rates = {n: s for n, s in snapshot["caches"].items() if s["hit_rate"] is not None}
+        if rates:
+            lines.append("# HELP abs_cache_hit_ratio Cache hit ratio")
+            lines.append("# TYPE abs_cache_hit_ratio gauge")
+            for name, s in rates.items():
+                lines.append(f'abs_cache_hit_ratio{{run="{run}",cache="{_label_value(name)}"}} {s["hit_rate"]}')
+
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def emit(self, run_name: str) -> Optional[str]:
+        """
+        Write the per-run report if ABS_METRICS_DIR is set.
+        Returns the JSON path (or None when metrics output is disabled).
+        """
+        directory = os.getenv(METRICS_DIR_ENV)
+        if not directory:
+            return None
+
+        os.makedirs(directory, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        base = os.path.join(directory, f"{_file_safe(run_name)}_{stamp}")
+
+        self.write_json(base + ".json")
+        print(f"📈 Metrics written to {base}.json")
+        if os.getenv(METRICS_PROMETHEUS_ENV, "").lower() in ("1", "true", "yes"):
+            self.write_prometheus(base + ".prom", run_name)
+            print(f"📈 Prometheus metrics written to {base}.prom")
+        return base + ".json"
+
+    def print_summary(self):
+        """Print stage durations and LLM latency percentiles"""
+        snapshot = self.snapshot()
+        if not snapshot["timers"]:
+            return
+        print(f"\n{'=' * 60}")
+        print("TIMING SUMMARY")
+        print(f"{'=' * 60}")
+        for name, s in snapshot["timers"].items():
+            rate = f"  {s['items_per_s']:,.0f} items/s" if s.get("items_per_s") else ""
+            print(f"  {name:32s} {s['sum']:8.2f}s  (n={s['count']}, p90={s['p90']:.3f}s){rate}")
+        for name, s in snapshot["caches"].items():
+            if s["hit_rate"] is not None:
+                print(f"  cache {name:26s} hit rate {s['hit_rate']:.1%}")
+
+
+def _label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _file_safe(value: str) -> str:
+    return re.sub(r"[^\w.-]+", "_", value)
+
+
+# Process-wide registry used by every stage
+metrics = Metrics()
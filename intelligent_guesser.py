@@ -9,8 +9,11 @@ Analyzes value labels to automatically classify survey questions:
 
 import json
 import re
+import argparse
 from typing import Dict, List, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
+
+from instrumentation import metrics
 
 
 @dataclass
@@ -27,6 +30,10 @@ class ScaleAnalysis:
     confidence: float  # 0.0 to 1.0
     reasoning: str  # Explanation of classification
 
+    def to_dict(self) -> Dict:
+        """The "scale_analysis" entry of an analyzed variable"""
+        return asdict(self)
+
 
 class IntelligentGuesser:
     """Intelligent classification of survey question types"""
@@ -410,8 +417,9 @@ class IntelligentGuesser:
         Analyze all questions in atomic JSON and add scale analysis
         """
         print(f"Loading {atomic_json_file}...")
-        with open(atomic_json_file, "r", encoding="utf-8") as f:
-            variables = json.load(f)
+        with metrics.timer("io.read_json"):
+            with open(atomic_json_file, "r", encoding="utf-8") as f:
+                variables = json.load(f)
 
         print(f"Analyzing {len(variables)} variables...\n")
 
@@ -430,35 +438,27 @@ class IntelligentGuesser:
             "needs_reversal": 0,
         }
 
-        for var in variables:
-            analysis = self.classify_scale(var["value_labels"])
-
-            # Add analysis to variable
-            var_with_analysis = var.copy()
-            var_with_analysis["scale_analysis"] = {
-                "scale_type": analysis.scale_type,
-                "scale_points": analysis.scale_points,
-                "first_na_value": analysis.first_na_value,
-                "max_substantive_value": analysis.max_substantive_value,
-                "needs_reversal": analysis.needs_reversal,
-                "value_1_polarity": analysis.value_1_polarity,
-                "max_value_polarity": analysis.max_value_polarity,
-                "confidence": analysis.confidence,
-                "reasoning": analysis.reasoning,
-            }
-
-            analyzed.append(var_with_analysis)
-
-            # Update stats
-            if analysis.scale_type in stats:
-                stats[analysis.scale_type] += 1
-            if analysis.needs_reversal:
-                stats["needs_reversal"] += 1
+        with metrics.timer("stage.classify_scale", items=len(variables)):
+            for var in variables:
+                analysis = self.classify_scale(var["value_labels"])
+
+                # Add analysis to variable
+                var_with_analysis = var.copy()
+                var_with_analysis["scale_analysis"] = analysis.to_dict()
+
+                analyzed.append(var_with_analysis)
+
+                # Update stats
+                if analysis.scale_type in stats:
+                    stats[analysis.scale_type] += 1
+                if analysis.needs_reversal:
+                    stats["needs_reversal"] += 1
 
         # Save analyzed results
         print(f"Saving to {output_file}...")
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(analyzed, f, indent=2, ensure_ascii=False)
+        with metrics.timer("io.write_json"):
+            with open(output_file, "w", encoding="utf-8") as f:
+                json.dump(analyzed, f, indent=2, ensure_ascii=False)
 
         # Print statistics
         print(f"\n{'=' * 60}")
@@ -498,23 +498,24 @@ class IntelligentGuesser:
         print(f"\n✅ Analysis complete! Results saved to {output_file}")
 
 
-def main():
-    import sys
-
-    if len(sys.argv) < 2:
-        print("Usage: python intelligent_guesser.py <atomic_json_file> [output_file]")
-        print("Example: python intelligent_guesser.py W5_atomic.json W5_analyzed.json")
-        sys.exit(1)
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Classify scales and flag reversals",
+        epilog="Example: python intelligent_guesser.py W5_atomic.json W5_analyzed.json",
+    )
+    parser.add_argument("atomic_file", help="Atomic JSON from parse_labels.py")
+    parser.add_argument(
+        "output_file", nargs="?", help="Default: <atomic_file>_analyzed.json"
+    )
+    args = parser.parse_args(argv)
 
-    atomic_file = sys.argv[1]
-    output_file = (
-        sys.argv[2]
-        if len(sys.argv) > 2
-        else atomic_file.replace(".json", "_analyzed.json")
+    output_file = args.output_file or args.atomic_file.replace(
+        ".json", "_analyzed.json"
     )
 
     guesser = IntelligentGuesser()
-    guesser.analyze_questionnaire(atomic_file, output_file)
+    guesser.analyze_questionnaire(args.atomic_file, output_file)
+    metrics.emit("intelligent_guesser")
 
 
 if __name__ == "__main__":
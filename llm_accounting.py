@@ -0,0 +1,312 @@
+"""
+LLM token usage, latency and cost accounting
+
+Every chat completion made by ConceptExtractor / ConceptReprocessor goes
+through UsageLedger.complete(), which records one entry per call:
+
+    wave, stage, model, prompt template, questions in the batch,
+    prompt/completion tokens, wall latency, retries, success/error
+
+Entries are aggregated per wave/stage/model into a cost and throughput
+report, which is what we need to tune batch size and choose between
+llama-3.1-8b-instant and llama-3.3-70b-versatile.
+
+Usage:
+    # Append every call of a run to a JSONL ledger
+    LLM_USAGE_LEDGER=llm_usage.jsonl python extract_concepts.py
+
+    # Report over one or more runs
+    python llm_accounting.py llm_usage.jsonl
+    python llm_accounting.py llm_usage.jsonl --by model --json report.json
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from instrumentation import metrics, summarize
+
+
+LEDGER_PATH_ENV = "LLM_USAGE_LEDGER"
+
+# USD per 1M tokens (input, output) - Groq on-demand pricing
+MODEL_PRICES = {
+    "llama-3.1-8b-instant": (0.05, 0.08),
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+    "mixtral-8x7b-32768": (0.24, 0.24),
+    "google/gemma-2-2b-it": (0.0, 0.0),
+}
+
+GROUP_FIELDS = ("wave", "stage", "model", "template")
+
+# Transient failures worth retrying: rate limits (429), timeouts and 5xx
+RETRY_BACKOFF_S = 1.0  # first delay; doubles per retry, with full jitter
+RETRY_BACKOFF_MAX_S = 30.0
+_TIMEOUT_ERRORS = {"TimeoutError", "APITimeoutError", "TimeoutException", "ReadTimeout", "ConnectTimeout"}
+
+_WAVE_FILE_SUFFIX = re.compile(r"_(atomic|analyzed|enriched|crosswalk)(_test)?\.json$")
+
+
+def wave_from_path(path: str) -> str:
+    """W6_Cambodia_analyzed.json -> W6_Cambodia"""
+    return _WAVE_FILE_SUFFIX.sub("", os.path.basename(path))
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    """Cost in USD, or None for models missing from MODEL_PRICES"""
+    if model not in MODEL_PRICES:
+        return None
+    input_price, output_price = MODEL_PRICES[model]
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+def error_status(error: Exception) -> Optional[int]:
+    """HTTP status of a provider error (openai/groq status_code, or error.response)"""
+    for source in (error, getattr(error, "response", None)):
+        status = getattr(source, "status_code", None) or getattr(source, "status", None)
+        if isinstance(status, int):
+            return status
+    return None
+
+
+def is_retryable(error: Exception) -> bool:
+    """True for rate limits (429), timeouts and server errors (5xx)"""
+    if any(cls.__name__ in _TIMEOUT_ERRORS for cls in type(error).__mro__):
+        return True
+    status = error_status(error)
+    return status is not None and (status == 429 or 500 <= status < 600)
+
+
+def backoff_delay(retry: int) -> float:
+    """Seconds to wait before retry n (1-based): exponential, full jitter"""
+    return random.uniform(0, min(RETRY_BACKOFF_MAX_S, RETRY_BACKOFF_S * 2 ** (retry - 1)))
+
+
+class UsageLedger:
+    """Per-call record of LLM usage with per wave/stage/model aggregation"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path if path is not None else os.getenv(LEDGER_PATH_ENV)
+        self.entries: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def complete(
+        self,
+        client,
+        model: str,
+        messages: List[Dict],
+        stage: str,
+        wave: Optional[str] = None,
+        template: Optional[str] = None,
+        items: Optional[int] = None,
+        max_retries: int = 0,
+        **params,
+    ):
+        """
+        Call client.chat.completions.create() and record the call.
+
+        Rate-limit, timeout and 5xx errors are retried up to max_retries
+        times (default 0, i.e. the single attempt the pipeline always made)
+        with exponential backoff; any other error is not retried. The last
+        error is re-raised after the entry is recorded.
+        """
+        retries = 0
+        error = None
+        response = None
+        start = time.perf_counter()
+        while True:
+            try:
+                response = client.chat.completions.create(
+                    model=model, messages=messages, **params
+                )
+                error = None
+                break
+            except Exception as e:
+                error = e
+                if retries >= max_retries or not is_retryable(e):
+                    break
+                retries += 1
+                time.sleep(backoff_delay(retries))
+        latency = time.perf_counter() - start
+
+        usage = getattr(response, "usage", None)
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+
+        self.record(
+            {
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "wave": wave or "",
+                "stage": stage,
+                "model": model,
+                "template": template or stage,
+                "items": items,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "latency_s": latency,
+                "retries": retries,
+                "ok": error is None,
+                "error": type(error).__name__ if error is not None else None,
+            }
+        )
+
+        if error is not None:
+            raise error
+        return response
+
+    def record(self, entry: Dict):
+        """Add one call entry (and append it to the JSONL ledger if enabled)"""
+        with self._lock:
+            self.entries.append(entry)
+            if self.path:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+        metrics.observe("llm.prompt_tokens", entry["prompt_tokens"])
+        metrics.observe("llm.completion_tokens", entry["completion_tokens"])
+        metrics.incr("llm.retries", entry["retries"])
+
+    def report(self, by=GROUP_FIELDS) -> List[Dict]:
+        """Aggregate entries by the given fields"""
+        return aggregate(self.entries, by)
+
+    def print_report(self, by=GROUP_FIELDS):
+        print_report(self.report(by), by)
+
+
+def aggregate(entries: List[Dict], by=GROUP_FIELDS) -> List[Dict]:
+    """Group ledger entries and compute token, latency and cost totals"""
+    groups: Dict[tuple, List[Dict]] = {}
+    for entry in entries:
+        key = tuple(entry.get(field) or "" for field in by)
+        groups.setdefault(key, []).append(entry)
+
+    rows = []
+    for key, group in sorted(groups.items()):
+        prompt_tokens = sum(e["prompt_tokens"] for e in group)
+        completion_tokens = sum(e["completion_tokens"] for e in group)
+        items = sum(e.get("items") or 0 for e in group)
+        latency = summarize([e["latency_s"] for e in group])
+
+        cost = 0.0
+        for e in group:
+            call_cost = estimate_cost(e["model"], e["prompt_tokens"], e["completion_tokens"])
+            if call_cost is None:
+                cost = None
+                break
+            cost += call_cost
+
+        rows.append(
+            {
+                **dict(zip(by, key)),
+                "calls": len(group),
+                "errors": sum(1 for e in group if not e["ok"]),
+                "retries": sum(e["retries"] for e in group),
+                "items": items,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "tokens_per_item": (prompt_tokens + completion_tokens) / items if items else None,
+                "latency_total_s": latency["sum"],
+                "latency_p50_s": latency["p50"],
+                "latency_p90_s": latency["p90"],
+                "latency_p99_s": latency["p99"],
+                "completion_tokens_per_s": (
+                    completion_tokens / latency["sum"] if latency["sum"] > 0 else None
+                ),
+                "cost_usd": cost,
+            }
+        )
+    return rows
+
+
+def print_report(rows: List[Dict], by=GROUP_FIELDS):
+    """Print the aggregated usage table"""
+    print(f"\n{'=' * 60}")
+    print("LLM USAGE REPORT")
+    print(f"{'=' * 60}")
+    if not rows:
+        print("  No LLM calls recorded")
+        return
+
+    for row in rows:
+        label = " / ".join(str(row[field]) or "-" for field in by)
+        cost = f"${row['cost_usd']:.4f}" if row["cost_usd"] is not None else "n/a"
+        per_item = f"{row['tokens_per_item']:.0f}" if row["tokens_per_item"] else "-"
+        print(f"\n  {label}")
+        print(
+            f"    calls: {row['calls']}  errors: {row['errors']}  retries: {row['retries']}"
+            f"  questions: {row['items']}"
+        )
+        print(
+            f"    tokens: {row['prompt_tokens']:,} prompt + {row['completion_tokens']:,} completion"
+            f"  ({per_item} per question)"
+        )
+        print(
+            f"    latency: {row['latency_total_s']:.1f}s total,"
+            f" p50 {row['latency_p50_s']:.2f}s, p90 {row['latency_p90_s']:.2f}s"
+        )
+        print(f"    cost: {cost}")
+
+    costs = [r["cost_usd"] for r in rows if r["cost_usd"] is not None]
+    print(f"\n  Total calls: {sum(r['calls'] for r in rows)}")
+    print(
+        f"  Total tokens: {sum(r['prompt_tokens'] + r['completion_tokens'] for r in rows):,}"
+    )
+    if costs:
+        print(f"  Total cost: ${sum(costs):.4f}")
+
+
+def load_ledger(paths: List[str]) -> List[Dict]:
+    """Read entries from one or more JSONL ledgers"""
+    entries = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entries.append(json.loads(line))
+    return entries
+
+
+# Process-wide ledger used by the LLM stages
+ledger = UsageLedger()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize LLM usage ledgers")
+    parser.add_argument("ledgers", nargs="+", help="JSONL ledger file(s)")
+    parser.add_argument(
+        "--by",
+        default=",".join(GROUP_FIELDS),
+        help=f"Comma-separated grouping fields (default: {','.join(GROUP_FIELDS)})",
+    )
+    parser.add_argument("--json", help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    by = tuple(field.strip() for field in args.by.split(",") if field.strip())
+    unknown = [field for field in by if field not in GROUP_FIELDS]
+    if unknown:
+        print(f"❌ Unknown grouping field(s): {', '.join(unknown)}")
+        sys.exit(1)
+
+    entries = load_ledger(args.ledgers)
+    rows = aggregate(entries, by)
+    print_report(rows, by)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+        print(f"\n✅ Report saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
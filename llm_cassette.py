@@ -0,0 +1,448 @@
+"""
+Record/replay harness for LLM calls
+
+Captures real request/response pairs (plus observed latency) from the Groq
+client used by extract_concepts.py / reprocess_unknown.py and the Hugging Face
+InferenceClient used by parse_labels.py into a local JSON cassette, and replays
+them offline with configurable simulated latency, error rate and rate limits.
+
+Usage:
+    # Record while running the real pipeline
+    LLM_CASSETTE=cassettes/W3.json LLM_CASSETTE_MODE=record \\
+        GROQ_API_KEY=... python extract_concepts.py
+
+    # Replay with no network (no API key needed)
+    LLM_CASSETTE=cassettes/W3.json LLM_CASSETTE_MODE=replay python extract_concepts.py
+
+    # Offline throughput benchmark of a recorded wave
+    python llm_cassette.py cassettes/W3.json W3_atomic.json --latency-scale 0.5
+"""
+
+import os
+import json
+import time
+import random
+import hashlib
+import threading
+from collections import deque
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+
+from instrumentation import metrics
+
+
+CASSETTE_VERSION = 1
+
+# Environment switches read by client_from_env()
+CASSETTE_PATH_ENV = "LLM_CASSETTE"
+CASSETTE_MODE_ENV = "LLM_CASSETTE_MODE"  # off | record | replay
+
+
+class CassetteMissError(KeyError):
+    """Raised when a replayed request was never recorded"""
+
+
+class SimulatedAPIError(RuntimeError):
+    """Injected transient API failure during replay (mirrors HTTP 503)"""
+
+    status_code = 503
+
+
+class SimulatedRateLimitError(RuntimeError):
+    """Injected rate-limit failure during replay (mirrors HTTP 429)"""
+
+    status_code = 429
+
+
+def request_key(model: str, messages: List[Dict], params: Dict) -> str:
+    """Stable hash of a chat request, used to look up recorded responses"""
+    payload = json.dumps(
+        {"model": model, "messages": messages, "params": params},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _usage_to_dict(usage) -> Dict:
+    """Convert a provider usage object (or None) to a plain dict"""
+    if usage is None:
+        return {}
+    if isinstance(usage, dict):
+        return dict(usage)
+    return {
+        field: getattr(usage, field, None)
+        for field in ("prompt_tokens", "completion_tokens", "total_tokens")
+        if getattr(usage, field, None) is not None
+    }
+
+
+def make_response(content: str, model: str, usage: Optional[Dict] = None):
+    """
+    Build a response object shaped like Groq / HF chat completion output.
+    Only the attributes the pipeline reads are provided.
+    """
+    usage = usage or {}
+    return SimpleNamespace(
+        model=model,
+        choices=[
+            SimpleNamespace(
+                index=0,
+                message=SimpleNamespace(role="assistant", content=content),
+                finish_reason="stop",
+            )
+        ],
+        usage=SimpleNamespace(
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            completion_tokens=usage.get("completion_tokens", 0),
+            total_tokens=usage.get("total_tokens", 0),
+        ),
+    )
+
+
+class Cassette:
+    """On-disk store of recorded LLM interactions"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.interactions: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            self.load()
+
+    def load(self):
+        """Load interactions from the cassette file"""
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.interactions = {i["key"]: i for i in data.get("interactions", [])}
+
+    def save(self):
+        """Write interactions back to the cassette file"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            data = {
+                "version": CASSETTE_VERSION,
+                "saved_at": datetime.now().isoformat(timespec="seconds"),
+                "interactions": list(self.interactions.values()),
+            }
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+    def record(
+        self,
+        endpoint: str,
+        model: str,
+        messages: List[Dict],
+        params: Dict,
+        content: str,
+        usage: Dict,
+        latency_s: float,
+    ):
+        """Store one successful interaction"""
+        key = request_key(model, messages, params)
+        with self._lock:
+            self.interactions[key] = {
+                "key": key,
+                "endpoint": endpoint,
+                "request": {"model": model, "messages": messages, "params": params},
+                "response": {"content": content, "model": model, "usage": usage},
+                "latency_s": latency_s,
+                "recorded_at": datetime.now().isoformat(timespec="seconds"),
+            }
+
+    def lookup(self, model: str, messages: List[Dict], params: Dict) -> Dict:
+        """Return the recorded interaction for a request"""
+        key = request_key(model, messages, params)
+        try:
+            return self.interactions[key]
+        except KeyError:
+            raise CassetteMissError(
+                f"No recorded response for model={model} in {self.path}"
+            ) from None
+
+    def __len__(self):
+        return len(self.interactions)
+
+
+class _Completions:
+    """`client.chat.completions` namespace routed to a handler"""
+
+    def __init__(self, handler: Callable):
+        self._handler = handler
+
+    def create(self, model: str, messages: List[Dict], **params):
+        return self._handler("chat.completions.create", model, messages, params)
+
+
+class _CassetteClientBase:
+    """Exposes both the Groq (`chat.completions.create`) and HF
+    (`chat_completion`) call shapes"""
+
+    def __init__(self, default_model: Optional[str] = None):
+        self.model = default_model
+        self.chat = SimpleNamespace(completions=_Completions(self._handle))
+
+    def chat_completion(self, messages: List[Dict], model: Optional[str] = None, **params):
+        return self._handle(
+            "chat_completion", model or self.model or "", messages, params
+        )
+
+    def _handle(self, endpoint: str, model: str, messages: List[Dict], params: Dict):
+        raise NotImplementedError
+
+
+class RecordingClient(_CassetteClientBase):
+    """Wraps a live client and records every successful call to a cassette"""
+
+    def __init__(self, client, cassette: Cassette, autosave: bool = True):
+        super().__init__(default_model=getattr(client, "model", None))
+        self.client = client
+        self.cassette = cassette
+        self.autosave = autosave
+
+    def _handle(self, endpoint: str, model: str, messages: List[Dict], params: Dict):
+        start = time.perf_counter()
+        if endpoint == "chat_completion":
+            response = self.client.chat_completion(messages=messages, **params)
+        else:
+            response = self.client.chat.completions.create(
+                model=model, messages=messages, **params
+            )
+        latency = time.perf_counter() - start
+
+        self.cassette.record(
+            endpoint,
+            model,
+            messages,
+            params,
+            response.choices[0].message.content,
+            _usage_to_dict(getattr(response, "usage", None)),
+            latency,
+        )
+        if self.autosave:
+            self.cassette.save()
+        return response
+
+
+class ReplayClient(_CassetteClientBase):
+    """
+    Serves recorded responses with simulated network behaviour.
+
+    latency: "recorded" replays the observed latency, a number uses a fixed
+        latency in seconds, None disables latency.
+    latency_scale: multiplier applied to the chosen latency.
+    error_rate: probability of raising SimulatedAPIError per call.
+    requests_per_minute / tokens_per_minute: sliding-window limits; calls
+        over the limit raise SimulatedRateLimitError.
+    realtime: if False, latency is accumulated in `virtual_time_s` instead
+        of sleeping, so benchmarks run instantly and deterministically. A
+        rate-limited call then moves virtual time on to when the oldest
+        window entry expires, as a client waiting out the 429 would.
+    """
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        latency="recorded",
+        latency_scale: float = 1.0,
+        error_rate: float = 0.0,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        realtime: bool = True,
+        seed: int = 0,
+    ):
+        super().__init__()
+        self.cassette = cassette
+        self.latency = latency
+        self.latency_scale = latency_scale
+        self.error_rate = error_rate
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.realtime = realtime
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window = deque()  # (timestamp, tokens)
+        self.virtual_time_s = 0.0
+        self.stats = {"calls": 0, "errors": 0, "rate_limited": 0, "misses": 0}
+
+    def _now(self) -> float:
+        return time.monotonic() if self.realtime else self.virtual_time_s
+
+    def _check_rate_limit(self, tokens: int):
+        """Raise if this call would exceed the configured limits"""
+        if self.requests_per_minute is None and self.tokens_per_minute is None:
+            return
+        now = self._now()
+        while self._window and now - self._window[0][0] >= 60.0:
+            self._window.popleft()
+
+        over_requests = (
+            self.requests_per_minute is not None
+            and len(self._window) + 1 > self.requests_per_minute
+        )
+        over_tokens = (
+            self.tokens_per_minute is not None
+            and sum(t for _, t in self._window) + tokens > self.tokens_per_minute
+        )
+        if over_requests or over_tokens:
+            self.stats["rate_limited"] += 1
+            if not self.realtime and self._window:
+                self.virtual_time_s = max(self.virtual_time_s, self._window[0][0] + 60.0)
+            raise SimulatedRateLimitError("Rate limit exceeded (simulated 429)")
+        self._window.append((now, tokens))
+
+    def _delay_for(self, interaction: Dict) -> float:
+        if self.latency is None:
+            return 0.0
+        if self.latency == "recorded":
+            base = interaction.get("latency_s", 0.0)
+        else:
+            base = float(self.latency)
+        return base * self.latency_scale
+
+    def _handle(self, endpoint: str, model: str, messages: List[Dict], params: Dict):
+        try:
+            interaction = self.cassette.lookup(model, messages, params)
+        except CassetteMissError:
+            with self._lock:
+                self.stats["misses"] += 1
+            metrics.cache_miss("llm_cassette")
+            raise
+        metrics.cache_hit("llm_cassette")
+
+        response = interaction["response"]
+        tokens = response.get("usage", {}).get("total_tokens", 0) or 0
+
+        with self._lock:
+            self.stats["calls"] += 1
+            self._check_rate_limit(tokens)
+            fail = self._rng.random() < self.error_rate
+            delay = self._delay_for(interaction)
+            if not self.realtime:
+                self.virtual_time_s += delay
+
+        if self.realtime and delay > 0:
+            time.sleep(delay)
+
+        if fail:
+            with self._lock:
+                self.stats["errors"] += 1
+            raise SimulatedAPIError("Simulated API failure")
+
+        return make_response(response["content"], response.get("model", model), response.get("usage"))
+
+
+def client_from_env(make_live_client: Callable, **replay_options):
+    """
+    Return the client the pipeline should use, based on LLM_CASSETTE_MODE:
+    - off (default): the live client
+    - record: live client wrapped in a RecordingClient
+    - replay: a ReplayClient (make_live_client is never called)
+    """
+    mode = os.getenv(CASSETTE_MODE_ENV, "off").lower()
+    if mode in ("", "off"):
+        return make_live_client()
+
+    path = os.getenv(CASSETTE_PATH_ENV)
+    if not path:
+        raise ValueError(
+            f"{CASSETTE_MODE_ENV}={mode} requires {CASSETTE_PATH_ENV} to point to a cassette file"
+        )
+
+    cassette = Cassette(path)
+    if mode == "record":
+        return RecordingClient(make_live_client(), cassette)
+    if mode == "replay":
+        print(f"Replaying LLM responses from {path} ({len(cassette)} recorded)")
+        return ReplayClient(cassette, **replay_options)
+    raise ValueError(f"Unknown {CASSETTE_MODE_ENV}: {mode} (use off, record or replay)")
+
+
+def benchmark_replay(
+    cassette_file: str,
+    atomic_json_file: str,
+    batch_size: int = 10,
+    model: str = "llama-3.1-8b-instant",
+    **replay_options,
+) -> Dict:
+    """
+    Replay ConceptExtractor over a wave with no network access and report
+    throughput. Uses virtual time by default so runs are deterministic.
+    """
+    from extract_concepts import ConceptExtractor
+
+    replay_options.setdefault("realtime", False)
+    client = ReplayClient(Cassette(cassette_file), **replay_options)
+
+    with open(atomic_json_file, "r", encoding="utf-8") as f:
+        variables = json.load(f)
+
+    extractor = ConceptExtractor(model=model, client=client)
+    start = time.perf_counter()
+    enriched = extractor.extract_concepts_batch(variables, batch_size=batch_size)
+    wall = time.perf_counter() - start
+
+    simulated = client.virtual_time_s if not client.realtime else wall
+    unknown = sum(1 for v in enriched if v.get("domain") == "Unknown")
+    return {
+        "cassette": cassette_file,
+        "input": atomic_json_file,
+        "variables": len(variables),
+        "batch_size": batch_size,
+        "wall_time_s": wall,
+        "simulated_time_s": simulated,
+        "questions_per_s": len(variables) / simulated if simulated > 0 else None,
+        "unknown": unknown,
+        **client.stats,
+    }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Offline LLM replay benchmark")
+    parser.add_argument("cassette", help="Cassette JSON recorded with LLM_CASSETTE_MODE=record")
+    parser.add_argument("atomic_json", help="Atomic JSON to run concept extraction on")
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--model", default="llama-3.1-8b-instant")
+    parser.add_argument("--latency", default="recorded", help='"recorded", seconds, or "none"')
+    parser.add_argument("--latency-scale", type=float, default=1.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rpm", type=int, default=None, help="Requests per minute limit")
+    parser.add_argument("--tpm", type=int, default=None, help="Tokens per minute limit")
+    parser.add_argument("--realtime", action="store_true", help="Actually sleep for latency")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    latency = args.latency
+    if latency == "none":
+        latency = None
+    elif latency != "recorded":
+        latency = float(latency)
+
+    result = benchmark_replay(
+        args.cassette,
+        args.atomic_json,
+        batch_size=args.batch_size,
+        model=args.model,
+        latency=latency,
+        latency_scale=args.latency_scale,
+        error_rate=args.error_rate,
+        requests_per_minute=args.rpm,
+        tokens_per_minute=args.tpm,
+        realtime=args.realtime,
+        seed=args.seed,
+    )
+
+    print(f"\n{'=' * 60}")
+    print("REPLAY BENCHMARK")
+    print(f"{'=' * 60}")
+    for key, value in result.items():
+        print(f"  {key:18s}: {value}")
+
+
+if __name__ == "__main__":
+    main()
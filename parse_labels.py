@@ -2,7 +2,8 @@
 Stage 1: Parse Asian Barometer labels.txt → Atomic JSON
 
 This script:
-1. Parses labels.txt files to extract variables and questions
+1. Parses labels.txt files (or .sav metadata, see sav_ingest.py) to extract
+   variables and questions
 2. Detects stem-and-items patterns
 3. Uses LLM to generate stateless JSON for each variable
 """
@@ -11,7 +12,8 @@ import os
 import re
 import json
 from typing import List, Dict
-from huggingface_hub import InferenceClient
+from llm_cassette import client_from_env
+from instrumentation import metrics
 
 
 class LabelsParser:
@@ -115,9 +117,17 @@ class LabelsParser:
 class AtomicJSONGenerator:
     """Generate atomic JSON using LLM"""
 
-    def __init__(self):
-        token = os.getenv("HF_TOKEN")
-        self.client = InferenceClient(model="google/gemma-2-2b-it", token=token)
+    def __init__(self, client=None):
+        if client is None:
+            client = client_from_env(self._make_inference_client)
+        self.client = client
+
+    @staticmethod
+    def _make_inference_client():
+        # Imported here so parsing without an LLM never pays for huggingface_hub
+        from huggingface_hub import InferenceClient
+
+        return InferenceClient(model="google/gemma-2-2b-it", token=os.getenv("HF_TOKEN"))
 
     def generate_for_group(self, variables: List[Dict]) -> List[Dict]:
         """
@@ -283,16 +293,29 @@ No markdown formatting."""
         return prompt
 
 
+def make_parser(input_file: str) -> LabelsParser:
+    """LabelsParser for labels.txt dumps, SavMetadataParser for .sav releases"""
+    if input_file.lower().endswith(".sav"):
+        from sav_ingest import SavMetadataParser
+
+        return SavMetadataParser(input_file)
+    return LabelsParser(input_file)
+
+
 def main(input_file: str, output_file: str):
-    """Main pipeline: Parse labels → Generate atomic JSON"""
+    """Main pipeline: Parse labels (or .sav metadata) → Generate atomic JSON"""
 
     print(f"Parsing {input_file}...")
-    parser = LabelsParser(input_file)
-    variables = parser.parse()
+    parser = make_parser(input_file)
+    with metrics.timer("stage.parse"):
+        variables = parser.parse()
+    metrics.incr("stage.parse.variables", len(variables))
     print(f"Found {len(variables)} variables")
 
     print("Detecting stem-and-items patterns...")
-    stem_groups = parser.detect_stem_groups()
+    with metrics.timer("stage.detect_stem_groups", items=len(variables)):
+        stem_groups = parser.detect_stem_groups()
+    metrics.incr("stage.detect_stem_groups.groups", len(stem_groups))
     print(f"Found {len(stem_groups)} stem groups")
 
     # Track which variables are in groups
@@ -304,26 +327,29 @@ def main(input_file: str, output_file: str):
     generator = AtomicJSONGenerator()
     atomic_variables = []
 
-    # Process stem groups
-    for group in stem_groups:
-        group_vars = [variables[i] for i in group]
-        print(f"  Processing group: {[v['variable_id'] for v in group_vars]}")
-        atomic_group = generator.generate_for_group(group_vars)
-        atomic_variables.extend(atomic_group)
+    with metrics.timer("stage.atomic_json", items=len(variables)):
+        # Process stem groups
+        for group in stem_groups:
+            group_vars = [variables[i] for i in group]
+            print(f"  Processing group: {[v['variable_id'] for v in group_vars]}")
+            atomic_group = generator.generate_for_group(group_vars)
+            atomic_variables.extend(atomic_group)
 
-    # Add standalone variables (not in any group)
-    for i, var in enumerate(variables):
-        if i not in grouped_indices:
-            atomic_variables.append(var)
+        # Add standalone variables (not in any group)
+        for i, var in enumerate(variables):
+            if i not in grouped_indices:
+                atomic_variables.append(var)
 
-    # Sort by variable_id to maintain order
-    atomic_variables.sort(key=lambda x: x["variable_id"])
+        # Sort by variable_id to maintain order
+        atomic_variables.sort(key=lambda x: x["variable_id"])
 
     # Save output
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(atomic_variables, f, indent=2, ensure_ascii=False)
+    with metrics.timer("io.write_json"):
+        with open(output_file, "w", encoding="utf-8") as f:
+            json.dump(atomic_variables, f, indent=2, ensure_ascii=False)
 
     print(f"Saved {len(atomic_variables)} atomic variables to {output_file}")
+    metrics.emit("parse_labels")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,124 @@
+"""
+Exact phrase uniqueness via a generalized suffix automaton
+
+find_best_validation_phrase() needs, for every candidate n-gram, the number
+of questions in the wave that contain it. Counting by scanning every
+question makes each lookup O(corpus). PhraseIndex builds one generalized
+suffix automaton over all normalized questions of a wave (linear in the
+total text length) and annotates each state with the number of distinct
+questions containing its substrings, so:
+
+- doc_count(phrase) is O(len(phrase)) and equals
+  sum(1 for q in questions if phrase in q) - substring semantics, the same
+  as the grepl() guard the phrase ends up in
+- shortest_unique_phrase(text) returns the shortest word-bounded substring
+  of a question that occurs in no other question (None if every substring
+  is shared, e.g. an exact duplicate question)
+"""
+
+from typing import Dict, List, Optional
+
+
+class PhraseIndex:
+    """Generalized suffix automaton over the characters of many texts"""
+
+    def __init__(self, texts: List[str]):
+        self.next: List[Dict[str, int]] = [{}]
+        self.link: List[int] = [-1]
+        self.length: List[int] = [0]
+        self.doc_counts: List[int] = [0]
+        self.num_texts = len(texts)
+
+        for text in texts:
+            last = 0
+            for ch in text:
+                last = self._extend(last, ch)
+
+        self._count_documents(texts)
+
+    def _new_state(self, length: int, transitions: Dict[str, int], link: int) -> int:
+        self.next.append(transitions)
+        self.link.append(link)
+        self.length.append(length)
+        self.doc_counts.append(0)
+        return len(self.next) - 1
+
+    def _clone(self, p: int, q: int, ch: str) -> int:
+        clone = self._new_state(self.length[p] + 1, dict(self.next[q]), self.link[q])
+        while p != -1 and self.next[p].get(ch) == q:
+            self.next[p][ch] = clone
+            p = self.link[p]
+        self.link[q] = clone
+        return clone
+
+    def _extend(self, last: int, ch: str) -> int:
+        # Transition already exists: the text repeats a substring of an earlier text
+        if ch in self.next[last]:
+            q = self.next[last][ch]
+            if self.length[last] + 1 == self.length[q]:
+                return q
+            return self._clone(last, q, ch)
+
+        cur = self._new_state(self.length[last] + 1, {}, 0)
+        p = last
+        while p != -1 and ch not in self.next[p]:
+            self.next[p][ch] = cur
+            p = self.link[p]
+        if p != -1:
+            q = self.next[p][ch]
+            if self.length[p] + 1 == self.length[q]:
+                self.link[cur] = q
+            else:
+                self.link[cur] = self._clone(p, q, ch)
+        return cur
+
+    def _count_documents(self, texts: List[str]):
+        """Count distinct texts per state by marking suffix-link paths once per text"""
+        marked = [-1] * len(self.next)
+        for doc, text in enumerate(texts):
+            state = 0
+            for ch in text:
+                state = self.next[state][ch]
+                s = state
+                while s > 0 and marked[s] != doc:
+                    marked[s] = doc
+                    self.doc_counts[s] += 1
+                    s = self.link[s]
+
+    def doc_count(self, phrase: str) -> int:
+        """Number of indexed texts containing phrase as a substring"""
+        state = 0
+        for ch in phrase:
+            state = self.next[state].get(ch)
+            if state is None:
+                return 0
+        return self.doc_counts[state] if phrase else self.num_texts
+
+    def shortest_unique_phrase(self, text: str) -> Optional[str]:
+        """
+        Shortest run of whole words of an indexed text that no other text
+        contains (fewest words, then fewest characters, then earliest).
+        """
+        starts = [0] + [i + 1 for i, ch in enumerate(text) if ch == " "]
+        best = None
+        best_key = None
+
+        for start in starts:
+            state = 0
+            words = 1
+            for pos in range(start, len(text)):
+                ch = text[pos]
+                if ch == " ":
+                    words += 1
+                    if best_key and words > best_key[0]:
+                        break
+                state = self.next[state].get(ch)
+                if state is None:
+                    break
+                at_word_end = pos + 1 == len(text) or text[pos + 1] == " "
+                if at_word_end and self.doc_counts[state] == 1:
+                    key = (words, pos + 1 - start)
+                    if best_key is None or key < best_key:
+                        best, best_key = text[start : pos + 1], key
+                    break
+        return best
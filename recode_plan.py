@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Recode plan: one structured description of every recode of a wave
+
+generate_r_recoders.py used to emit R text that four scripts then re-read
+and regex-rewrote (scripts/correct_reverse_scales_FINAL.py,
+fix_10point_scales.py, remove_q92_95.py, re_split_complete_waves.py):
+standardizing missing codes, keeping 7/8/9 valid on 10-point scales,
+dropping q92-q95 from the reversals and splitting the output per wave.
+Those decisions now live in the plan, and both executors are generated
+from it:
+
+- emit_r(plan): the per-wave R script (scripts/reverse_scales_{wave}.R),
+  one guarded recode per variable; emit_r(plan, batched=True) evaluates
+  the keyword guards once and recodes each (function, missing codes) group
+  with a single across() over a lookup vector (see
+  scripts/benchmark_reverse_scales.R)
+- ReversalPlan.from_recode_plan(plan) in reversal_engine.py: the NumPy
+  lookup tables applied to the Parquet respondent data
+
+Per variable the plan records the action ("reverse", or "clean" for the
+exclusions: keep 1..max, everything else NA), scale type, the value map,
+the standardized missing codes and the validation keyword of the grepl
+guard. Reversal functions are keyed by max value (safe_reverse_10pt), so
+two scales with the same number of points but a different range no longer
+share one function.
+
+Usage:
+    python recode_plan.py                          # plan + R scripts for all waves
+    python recode_plan.py --waves W5 --output-dir /tmp/r --plan-file /tmp/plan.json
+    python recode_plan.py --waves W6_Cambodia --output-dir /tmp/batched --batched
+"""
+
+import os
+import json
+import argparse
+from dataclasses import dataclass, asdict, field
+from typing import Dict, List, Optional, Tuple
+
+from generate_r_recoders import RRecoderGenerator, r_comment
+
+WAVES = ["W1", "W2", "W3", "W4", "W5", "W6_Cambodia"]
+
+# Standardized missing codes (0 is never a missing code)
+LIKERT_MISSING = [-1, 7, 8, 9, 98, 99]  # scales up to 6 points
+TENPOINT_MISSING = [-1, 97, 98, 99]  # 7, 8, 9 are valid responses
+
+# Variables that are cleaned (valid range kept, rest NA) instead of reversed:
+# q92-q95 are 10-point scales already in the right direction
+EXCLUSIONS = {
+    "W5": {"q92": 10, "q93": 10, "q94": 10, "q95": 10},
+    "W6_Cambodia": {"q92": 10, "q93": 10, "q94": 10, "q95": 10},
+}
+
+
+def standard_missing_codes(max_value: int) -> List[int]:
+    return LIKERT_MISSING if max_value < 7 else TENPOINT_MISSING
+
+
+@dataclass
+class VariableRecode:
+    """How one variable is recoded"""
+
+    variable_id: str
+    action: str  # reverse, clean
+    scale_type: str
+    scale_points: int
+    max_value: int
+    missing_codes: List[int]
+    validation_phrase: str
+    question_text: str
+
+    @property
+    def function_name(self) -> str:
+        prefix = "safe_reverse" if self.action == "reverse" else "clean"
+        return f"{prefix}_{self.max_value}pt"
+
+    @property
+    def output(self) -> str:
+        return f"{self.variable_id}_{'reversed' if self.action == 'reverse' else 'clean'}"
+
+    def value_map(self) -> Dict[int, int]:
+        """Code -> recoded value for 1..max; every other value becomes NA"""
+        codes = range(1, self.max_value + 1)
+        if self.action == "reverse":
+            return {code: self.max_value + 1 - code for code in codes}
+        return {code: code for code in codes}
+
+
+@dataclass
+class RecodePlan:
+    """All recodes of one wave"""
+
+    wave: str
+    variables: List[VariableRecode] = field(default_factory=list)
+
+    def functions(self) -> Dict[str, VariableRecode]:
+        """One example variable per R function, in first-use order"""
+        functions = {}
+        for var in self.variables:
+            functions.setdefault(var.function_name, var)
+        return functions
+
+    def groups(self) -> Dict[Tuple[str, Tuple[int, ...]], List[VariableRecode]]:
+        """Variables by (function, missing codes): one across() each in batched R"""
+        groups = {}
+        for var in self.variables:
+            groups.setdefault((var.function_name, tuple(var.missing_codes)), []).append(var)
+        return groups
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "RecodePlan":
+        return cls(data["wave"], [VariableRecode(**v) for v in data["variables"]])
+
+
+def build_plan(wave_file: str, wave_name: str, exclusions: Optional[Dict] = None) -> RecodePlan:
+    """Plan for one W*_analyzed.json, in the order of the R recodings"""
+    with open(wave_file, "r", encoding="utf-8") as f:
+        variables = json.load(f)
+    return plan_from_variables(variables, wave_name, exclusions)
+
+
+def plan_from_variables(
+    variables: List[Dict], wave_name: str, exclusions: Optional[Dict] = None
+) -> RecodePlan:
+    """Plan for already loaded analyzed variables"""
+    exclusions = EXCLUSIONS if exclusions is None else exclusions
+    excluded = exclusions.get(wave_name, {})
+
+    generator = RRecoderGenerator()
+    word_freq = generator.build_word_frequency([v["question_text"] for v in variables])
+
+    reversed_vars, cleaned_vars = [], []
+    for var in variables:
+        sa = var["scale_analysis"]
+        var_id = var["variable_id"]
+        if var_id in excluded:
+            action, max_value = "clean", excluded[var_id]
+        elif sa["needs_reversal"]:
+            action, max_value = "reverse", sa["max_substantive_value"]
+        else:
+            continue
+
+        recode = VariableRecode(
+            variable_id=var_id,
+            action=action,
+            scale_type=sa["scale_type"],
+            scale_points=sa["scale_points"],
+            max_value=max_value,
+            missing_codes=standard_missing_codes(max_value),
+            validation_phrase=generator.extract_distinctive_keyword(var["question_text"], word_freq),
+            question_text=var["question_text"],
+        )
+        (reversed_vars if action == "reverse" else cleaned_vars).append(recode)
+
+    # Grouped by function like generate_wave_recoding_script, cleaning last
+    reversed_vars.sort(key=lambda v: (v.scale_type, v.scale_points, v.max_value))
+    return RecodePlan(wave_name, reversed_vars + cleaned_vars)
+
+
+def _r_function(name: str, var: VariableRecode, lookup: bool = False) -> str:
+    missing = ", ".join(map(str, var.missing_codes))
+    if lookup:
+        values = ", ".join(str(value) for _, value in sorted(var.value_map().items()))
+        return f"""{name} <- function(x, missing_codes = c({missing})) {{
+  # Position k holds the recoded value of k; anything else is NA
+  c({values})[match(x, 1:{var.max_value})]
+}}
+"""
+    value = f"{var.max_value + 1} - x" if var.action == "reverse" else "x"
+    return f"""{name} <- function(x, missing_codes = c({missing})) {{
+  dplyr::case_when(
+    x %in% 1:{var.max_value} ~ {value},
+    x %in% missing_codes ~ NA_real_,
+    TRUE ~ NA_real_  # Outliers
+  )
+}}
+"""
+
+
+def _per_variable_recodings(plan: RecodePlan) -> List[str]:
+    """One guarded if_else() per variable in a single mutate()"""
+    wave_var = plan.wave.lower()
+    lines = [
+        "# ============================================================",
+        f"# {plan.wave} Variable Recodings with Validation",
+        "# ============================================================",
+        "",
+        f"{wave_var} <- {wave_var} %>%",
+        "  mutate(",
+    ]
+    for position, var in enumerate(plan.variables):
+        last = position == len(plan.variables) - 1
+        keyword = json.dumps(var.validation_phrase, ensure_ascii=False)
+        lines += [
+            f"    # {var.variable_id}: {r_comment(var.question_text)}",
+            f"    # Keyword validation: '{r_comment(var.validation_phrase)}'",
+            f"    {var.output} = if_else(",
+            f'      grepl({keyword}, question_text["{var.variable_id}"], ignore.case = TRUE),',
+            f"      {var.function_name}({var.variable_id}),",
+            "      NA_real_  # Validation failed!",
+            "    )" + ("" if last else ",") + ("" if last else "\n"),
+        ]
+    lines.append("  )")
+    return lines
+
+
+def _batched_recodings(plan: RecodePlan) -> List[str]:
+    """Keyword guards evaluated once, then one across() per (function, missing codes) group"""
+    wave_var = plan.wave.lower()
+    groups = plan.groups()
+
+    lines = [
+        "# ============================================================",
+        f"# {plan.wave} Variable Recodings with Validation (batched)",
+        "# ============================================================",
+        "",
+        "# Keyword validation per variable, evaluated once",
+        f"{wave_var}_keywords <- c(",
+    ]
+    for position, var in enumerate(plan.variables):
+        comma = "," if position < len(plan.variables) - 1 else ""
+        keyword = json.dumps(var.validation_phrase, ensure_ascii=False)
+        lines.append(f'  "{var.variable_id}" = {keyword}{comma}  # {r_comment(var.question_text)}')
+    lines += [
+        ")",
+        f"{wave_var}_valid <- mapply(",
+        "  function(keyword, var_id) isTRUE(grepl(keyword, question_text[var_id], ignore.case = TRUE)),",
+        f"  {wave_var}_keywords, names({wave_var}_keywords)",
+        ")",
+        "",
+        f"{wave_var} <- {wave_var} %>%",
+        "  mutate(",
+    ]
+    for position, ((function_name, missing_codes), variables) in enumerate(groups.items()):
+        missing = ", ".join(map(str, missing_codes))
+        var_ids = ", ".join(f'"{v.variable_id}"' for v in variables)
+        suffix = variables[0].output[len(variables[0].variable_id) :]
+        lines += [
+            f"    # {function_name}, missing c({missing}): {len(variables)} variables",
+            "    across(",
+            f"      all_of(c({var_ids})),",
+            f"      ~ if ({wave_var}_valid[[cur_column()]]) {function_name}(.x, missing_codes = c({missing})) "
+            "else rep(NA_real_, length(.x)),",
+            f'      .names = "{{.col}}{suffix}"',
+            "    )" + ("," if position < len(groups) - 1 else ""),
+        ]
+    lines.append("  )")
+    return lines
+
+
+def emit_r(plan: RecodePlan, batched: bool = False) -> str:
+    """Complete per-wave R script for a plan"""
+    functions = plan.functions()
+    tenpoint = any(v.missing_codes == TENPOINT_MISSING for v in plan.variables)
+
+    lines = [
+        "# ============================================================",
+        f"# Asian Barometer {plan.wave} - Scale Reversal Script",
+        "# Generated from the recode plan (recode_plan.py)",
+        "# ============================================================",
+        "#",
+        "# STANDARDIZED MISSING CODES:",
+        f"#   Scales up to 6 points: c({', '.join(map(str, LIKERT_MISSING))})",
+    ]
+    if tenpoint:
+        lines.append(f"#   10-point scales:       c({', '.join(map(str, TENPOINT_MISSING))})  (7, 8, 9 are valid)")
+    lines += [
+        "#",
+        "# NOTE: 0 is NOT included - requires manual evaluation for binary variables",
+        "# ============================================================",
+        "",
+        "library(dplyr)",
+        "",
+    ]
+    lines += [_r_function(name, var, lookup=batched) for name, var in functions.items()]
+
+    if not plan.variables:
+        lines.append(f"# {plan.wave}: No variables need recoding")
+        return "\n".join(lines) + "\n"
+
+    lines += _batched_recodings(plan) if batched else _per_variable_recodings(plan)
+
+    reversed_count = sum(v.action == "reverse" for v in plan.variables)
+    lines += [
+        "",
+        "# ============================================================",
+        f"# {plan.wave} Summary",
+        f"# Variables reversed: {reversed_count}",
+        f"# Variables cleaned (not reversed): {len(plan.variables) - reversed_count}",
+    ]
+    if batched:
+        lines.append(f"# across() groups: {len(plan.groups())}")
+    lines.append("# ============================================================")
+    return "\n".join(lines) + "\n"
+
+
+def save_plans(plans: List[RecodePlan], path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({plan.wave: plan.to_dict() for plan in plans}, f, indent=2, ensure_ascii=False)
+
+
+def load_plans(path: str) -> Dict[str, RecodePlan]:
+    with open(path, "r", encoding="utf-8") as f:
+        return {wave: RecodePlan.from_dict(data) for wave, data in json.load(f).items()}
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Build recode plans and generate the per-wave R scripts")
+    parser.add_argument("--waves", nargs="+", default=WAVES)
+    parser.add_argument("--output-dir", default="scripts", help="Directory for reverse_scales_{wave}.R")
+    parser.add_argument("--plan-file", default="recode_plan.json")
+    parser.add_argument(
+        "--batched", action="store_true", help="One across() per function/missing-code group"
+    )
+    args = parser.parse_args(argv)
+
+    print("=" * 60)
+    print("RECODE PLAN → R scripts")
+    print("=" * 60)
+
+    plans = []
+    os.makedirs(args.output_dir, exist_ok=True)
+    for wave_name in args.waves:
+        plan = build_plan(f"{wave_name}_analyzed.json", wave_name)
+        plans.append(plan)
+
+        output = os.path.join(args.output_dir, f"reverse_scales_{wave_name}.R")
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(emit_r(plan, args.batched))
+
+        cleaned = [v.variable_id for v in plan.variables if v.action == "clean"]
+        print(f"\n✓ {wave_name}: {len(plan.variables) - len(cleaned)} reversed, {len(plan.functions())} functions")
+        if cleaned:
+            print(f"  • cleaned, not reversed: {', '.join(cleaned)}")
+        print(f"  💾 {output}")
+
+    save_plans(plans, args.plan_file)
+    print(f"\n💾 Plan: {args.plan_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,19 @@
 #!/usr/bin/env python3
 """
 Regenerate all wave files with fixed parse_labels.py
+
+Each step runs in-process, so parse_labels / extract_concepts / generate_csv
+(and their dependencies) are imported once instead of once per wave.
 """
 
-import subprocess
+import io
 import sys
+import argparse
+import traceback
+from contextlib import redirect_stdout
+from typing import List, Optional
+
+from instrumentation import metrics
 
 waves = [
     ("W1_labels.txt", "W1_atomic.json"),
@@ -16,8 +25,26 @@ waves = [
 ]
 
 
+def run_step(func, *args) -> bool:
+    """
+    Run one pipeline call with its output captured (as the old per-wave
+    subprocesses did) and print the traceback if it fails
+    """
+    metrics.reset()
+    output = io.StringIO()
+    try:
+        with redirect_stdout(output):
+            func(*args)
+    except Exception:
+        print(traceback.format_exc())
+        return False
+    return True
+
+
 def regenerate_atomic():
     """Step 1: Regenerate atomic JSON for all waves"""
+    from parse_labels import main as parse_labels_main
+
     print("=" * 60)
     print("STEP 1: Regenerating atomic JSON files")
     print("=" * 60)
@@ -25,15 +52,10 @@ def regenerate_atomic():
     for input_file, output_file in waves:
         print(f"\n📝 Processing {input_file}...")
 
-        # Call parse_labels.py with this wave
-        cmd = f"python3 -c \"from parse_labels import main; main('{input_file}', '{output_file}')\""
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-
-        if result.returncode == 0:
+        if run_step(parse_labels_main, input_file, output_file):
             print(f"✅ Generated {output_file}")
         else:
             print(f"❌ Failed to generate {output_file}")
-            print(result.stderr)
             return False
 
     return True
@@ -41,6 +63,8 @@ def regenerate_atomic():
 
 def regenerate_enriched():
     """Step 2: Regenerate enriched JSON with concepts"""
+    from extract_concepts import main as extract_concepts_main
+
     print("\n" + "=" * 60)
     print("STEP 2: Regenerating enriched JSON files")
     print("=" * 60)
@@ -50,14 +74,15 @@ def regenerate_enriched():
     for wave in wave_names:
         print(f"\n📝 Processing {wave}...")
 
-        cmd = f"python3 -c \"from extract_concepts import main; main('{wave}_atomic.json', '{wave}_enriched.json', '{wave}_crosswalk.json')\""
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-
-        if result.returncode == 0:
+        if run_step(
+            extract_concepts_main,
+            f"{wave}_atomic.json",
+            f"{wave}_enriched.json",
+            f"{wave}_crosswalk.json",
+        ):
             print(f"✅ Generated {wave}_enriched.json")
         else:
             print(f"❌ Failed to generate {wave}_enriched.json")
-            print(result.stderr)
             return False
 
     return True
@@ -65,6 +90,8 @@ def regenerate_enriched():
 
 def regenerate_csv():
     """Step 3: Regenerate CSV files"""
+    from generate_csv import json_to_csv
+
     print("\n" + "=" * 60)
     print("STEP 3: Regenerating CSV files")
     print("=" * 60)
@@ -74,20 +101,26 @@ def regenerate_csv():
     for wave in wave_names:
         print(f"\n📝 Processing {wave}...")
 
-        cmd = f"python3 -c \"from generate_csv import json_to_csv; json_to_csv('{wave}_enriched.json', '{wave}_concepts.csv', '{wave}_concepts_detailed.csv')\""
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-
-        if result.returncode == 0:
+        if run_step(
+            json_to_csv,
+            f"{wave}_enriched.json",
+            f"{wave}_concepts.csv",
+            f"{wave}_concepts_detailed.csv",
+        ):
             print(f"✅ Generated {wave}_concepts.csv and {wave}_concepts_detailed.csv")
         else:
             print(f"❌ Failed to generate CSV files for {wave}")
-            print(result.stderr)
             return False
 
     return True
 
 
-if __name__ == "__main__":
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Rebuild atomic, enriched (LLM calls) and CSV files for all waves"
+    )
+    parser.parse_args(argv)
+
     print("🚀 Starting regeneration of all wave files with fixed parser\n")
 
     if not regenerate_atomic():
@@ -102,3 +135,7 @@ if __name__ == "__main__":
     print("\n" + "=" * 60)
     print("✅ ALL FILES REGENERATED SUCCESSFULLY!")
     print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
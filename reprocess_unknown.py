@@ -5,21 +5,36 @@ Reprocess Unknown variables using faster llama-3.1-8b-instant model
 import os
 import json
 from typing import List, Dict
-from groq import Groq
+from llm_cassette import client_from_env
+from instrumentation import metrics
+from llm_accounting import ledger
+from extract_concepts import CONCEPT_PROMPT_TEMPLATE
 
 
 class ConceptReprocessor:
     """Reprocess Unknown variables with a different model"""
 
-    def __init__(self, model="llama-3.1-8b-instant"):
-        api_key = os.getenv("GROQ_API_KEY")
-        if not api_key:
-            raise ValueError("GROQ_API_KEY environment variable not set")
+    def __init__(
+        self, model="llama-3.1-8b-instant", client=None, wave=None, max_retries=0
+    ):
+        if client is None:
+            client = client_from_env(self._make_groq_client)
 
-        self.client = Groq(api_key=api_key)
+        self.client = client
         self.model = model
+        self.wave = wave
+        self.max_retries = max_retries
         print(f"Using model: {model}")
 
+    @staticmethod
+    def _make_groq_client():
+        from groq import Groq
+
+        api_key = os.getenv("GROQ_API_KEY")
+        if not api_key:
+            raise ValueError("GROQ_API_KEY environment variable not set")
+        return Groq(api_key=api_key)
+
     def extract_batch_concepts(self, variables: List[Dict]) -> List[Dict]:
         """Extract concepts for a batch of variables using LLM"""
 
@@ -57,12 +72,20 @@ Return ONLY valid JSON, no markdown."""
             {"role": "user", "content": prompt},
         ]
 
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            max_tokens=2048,
-            temperature=0.3,
-        )
+        metrics.incr("llm.reprocess.calls")
+        with metrics.timer("llm.reprocess", items=len(variables)):
+            response = ledger.complete(
+                self.client,
+                model=self.model,
+                messages=messages,
+                stage="reprocess_unknown",
+                wave=self.wave,
+                template=CONCEPT_PROMPT_TEMPLATE,
+                items=len(variables),
+                max_retries=self.max_retries,
+                max_tokens=2048,
+                temperature=0.3,
+            )
 
         content = response.choices[0].message.content
         # Remove markdown if present
@@ -129,6 +152,7 @@ Return ONLY valid JSON, no markdown."""
 
             except Exception as e:
                 print(f"    ✗ Error: {e}")
+                metrics.incr("llm.reprocess.errors")
                 # Keep as Unknown
                 reprocessed.extend(batch)
 
@@ -192,10 +216,16 @@ def main(enriched_file: str, base_name: str, model: str = "llama-3.1-8b-instant"
     print(f"Using model: {model}")
     print(f"{'=' * 60}")
 
-    reprocessor = ConceptReprocessor(model=model)
-    final_variables = reprocessor.reprocess_unknown(enriched_file, batch_size=10)
+    reprocessor = ConceptReprocessor(model=model, wave=base_name)
+    with metrics.timer("stage.reprocess_unknown"):
+        final_variables = reprocessor.reprocess_unknown(enriched_file, batch_size=10)
+
+    with metrics.timer("stage.regenerate_outputs", items=len(final_variables)):
+        regenerate_outputs(final_variables, base_name)
 
-    regenerate_outputs(final_variables, base_name)
+    ledger.print_report()
+    metrics.print_summary()
+    metrics.emit(f"reprocess_unknown_{base_name}")
 
 
 if __name__ == "__main__":
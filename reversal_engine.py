@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Vectorized scale reversal over the Parquet respondent data
+
+The generated R scripts (scripts/reverse_scales_W*.R) reverse each variable
+with its own mutate(), safe_reverse_Npt() and case_when(). ReversalPlan
+compiles the scale_analysis of a W*_analyzed.json into lookup tables instead
+and applies them to every reversed variable of a release at once:
+
+- reverse table: one row per variable over the code range of the wave;
+  codes 1..max hold the recoded value ((max + 1) - code, or the code itself
+  for variables the plan only cleans), everything else NaN
+- NA mask: same shape, True for the variable's standardized missing codes
+
+The respondent columns are stacked into one (rows x variables) array, offset
+into the table and gathered with a single fancy-index, so the result matches
+the R case_when exactly: 1..max are reversed (even where 7-9 are also listed
+as missing), missing codes, outliers and non-integer values become NaN.
+
+The tables are compiled from the same recode plan (recode_plan.py) the R
+scripts are emitted from, so both executors share one set of decisions.
+
+The R keyword guard is applied too: the distinctive keyword of each variable
+(same word frequencies as the R script) is matched against the variable
+label stored in the Parquet metadata, and a variable whose label does not
+match is set to NaN, like the R "Validation failed!" branch.
+
+Needs the cache from sav_to_parquet.py:
+
+    python sav_to_parquet.py
+    python reversal_engine.py --waves W1 W6_Cambodia
+    python reversal_engine.py --waves W6_Cambodia --all-releases
+    python reversal_engine.py --plan-file recode_plan.json
+"""
+
+import os
+import re
+import json
+import time
+import argparse
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from recode_plan import RecodePlan, build_plan, load_plans
+from sav_to_parquet import PARQUET_DIR, load_manifest
+
+WAVES = ["W1", "W2", "W3", "W4", "W5", "W6_Cambodia"]
+OUTPUT_DIR = os.path.join("data", "reversed")
+ID_COLUMNS = ("idnumber", "id")
+
+
+def wave_partition(wave_name: str) -> Tuple[str, Optional[str]]:
+    """Parquet partition of an analyzed wave: W6_Cambodia -> (W6, Cambodia), W1 -> (W1, None)"""
+    match = re.match(r"(W\d+)(?:_(.+))?$", wave_name)
+    if not match:
+        raise ValueError(f"Not a wave name: {wave_name}")
+    return match.group(1), match.group(2)
+
+
+class ReversalPlan:
+    """Reverse tables, NA masks and validation keywords of one wave"""
+
+    def __init__(self, wave_name: str, variables: List[Dict]):
+        self.wave_name = wave_name
+        self.variable_ids = [v["variable_id"] for v in variables]
+        self.outputs = [v["output"] for v in variables]
+        self.keywords = [v["keyword"] for v in variables]
+        self.missing_codes = [v["missing_codes"] for v in variables]
+
+        codes = [1] + [c for v in variables for c in list(v["missing_codes"]) + list(v["value_map"])]
+        low, high = min(codes), max(codes)
+        self.offset = low
+        width = high - low + 1
+
+        self.reverse_table = np.full((len(variables), width), np.nan)
+        self.na_mask = np.zeros((len(variables), width), dtype=bool)
+        for row, var in enumerate(variables):
+            for code in var["missing_codes"]:
+                self.na_mask[row, code - low] = True
+            for code, value in var["value_map"].items():
+                self.reverse_table[row, code - low] = value
+                self.na_mask[row, code - low] = False  # 1..max wins, as in case_when
+
+    @classmethod
+    def from_recode_plan(cls, plan: RecodePlan) -> "ReversalPlan":
+        return cls(
+            plan.wave,
+            [
+                {
+                    "variable_id": var.variable_id,
+                    "output": var.output,
+                    "value_map": var.value_map(),
+                    "missing_codes": var.missing_codes,
+                    "keyword": var.validation_phrase,
+                }
+                for var in plan.variables
+            ],
+        )
+
+    @classmethod
+    def from_analyzed(cls, wave_file: str, wave_name: str) -> "ReversalPlan":
+        return cls.from_recode_plan(build_plan(wave_file, wave_name))
+
+    def __len__(self) -> int:
+        return len(self.variable_ids)
+
+    def validate(self, labels: List[Optional[str]]) -> np.ndarray:
+        """grepl(keyword, label, ignore.case = TRUE) per variable; None (absent column) fails"""
+        passed = np.zeros(len(self), dtype=bool)
+        for row, (keyword, label) in enumerate(zip(self.keywords, labels)):
+            if label is None:
+                continue
+            try:
+                passed[row] = re.search(keyword, label, re.IGNORECASE) is not None
+            except re.error:
+                passed[row] = False
+        return passed
+
+    def apply(self, values: np.ndarray, passed: Optional[np.ndarray] = None) -> Tuple[np.ndarray, Dict]:
+        """
+        Reverse a (rows x variables) array in one pass. Returns the reversed
+        array and per-variable counts of reversed / missing / outlier / empty
+        """
+        values = np.asarray(values, dtype=np.float64)
+        position = values - self.offset
+        finite = np.isfinite(position)
+        safe = np.where(finite, position, -1.0)
+        in_table = finite & (safe >= 0) & (safe < self.reverse_table.shape[1]) & (safe == np.floor(safe))
+
+        index = np.where(in_table, safe, 0).astype(np.intp)
+        rows = np.arange(len(self))[np.newaxis, :]
+        reversed_values = np.where(in_table, self.reverse_table[rows, index], np.nan)
+        substantive = ~np.isnan(reversed_values)
+        missing = in_table & self.na_mask[rows, index]
+
+        if passed is not None:
+            reversed_values[:, ~passed] = np.nan
+
+        counts = {
+            "reversed": (~np.isnan(reversed_values)).sum(axis=0),
+            "missing": missing.sum(axis=0),
+            "outlier": (finite & ~substantive & ~missing).sum(axis=0),
+            "empty": (~finite).sum(axis=0),
+        }
+        return reversed_values, counts
+
+
+def reverse_release(plan: ReversalPlan, path: str):
+    """Recoded columns (plus respondent id) of one Parquet release, and its report"""
+    import pandas as pd
+    import pyarrow.parquet as pq
+
+    schema = pq.read_schema(path)
+    by_lower = {name.lower(): name for name in schema.names}
+    columns = [by_lower.get(var_id.lower()) for var_id in plan.variable_ids]
+    id_column = next((by_lower[c] for c in ID_COLUMNS if c in by_lower), None)
+
+    present = [c for c in columns if c is not None]
+    table = pq.read_table(path, columns=present + ([id_column] if id_column else []))
+    n_rows = table.num_rows
+
+    values = np.full((n_rows, len(plan)), np.nan)
+    labels: List[Optional[str]] = []
+    for position, column in enumerate(columns):
+        if column is None:
+            labels.append(None)
+            continue
+        field = schema.field(column)
+        labels.append(field.metadata.get(b"label", b"").decode("utf-8") if field.metadata else "")
+        values[:, position] = pd.to_numeric(table.column(column).to_pandas(), errors="coerce").to_numpy(
+            dtype=np.float64, na_value=np.nan
+        )
+
+    passed = plan.validate(labels)
+    reversed_values, counts = plan.apply(values, passed)
+
+    frame = pd.DataFrame(reversed_values, columns=plan.outputs)
+    if id_column:
+        frame.insert(0, id_column.lower(), table.column(id_column).to_pandas())
+
+    report = []
+    for position, var_id in enumerate(plan.variable_ids):
+        if columns[position] is None:
+            status = "missing_column"
+        elif not passed[position]:
+            status = "validation_failed"
+        else:
+            status = "ok"
+        report.append(
+            {
+                "variable_id": var_id,
+                "column": columns[position],
+                "status": status,
+                "keyword": plan.keywords[position],
+                "label": labels[position],
+                **{name: int(count[position]) for name, count in counts.items()},
+            }
+        )
+    return frame, report
+
+
+def reverse_wave(
+    plan: ReversalPlan, parquet_dir: str = PARQUET_DIR, all_releases: bool = False
+) -> Tuple["object", Dict[str, List[Dict]]]:
+    """Reverse every matching release of the plan's wave into one DataFrame"""
+    import pandas as pd
+
+    wave, country = wave_partition(plan.wave_name)
+    frames, reports = [], {}
+    for entry in load_manifest(parquet_dir).values():
+        if entry["wave"] != wave:
+            continue
+        if country and not all_releases and entry["country"].lower() != country.lower():
+            continue
+        frame, report = reverse_release(plan, os.path.join(parquet_dir, entry["output"]))
+        frame.insert(0, "release", entry["country"])
+        frame.insert(0, "survey_wave", entry["wave"])
+        frames.append(frame)
+        reports[entry["country"]] = report
+
+    if not frames:
+        raise FileNotFoundError(f"No Parquet release for {plan.wave_name} in {parquet_dir}")
+    return pd.concat(frames, ignore_index=True), reports
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Reverse scales over the Parquet respondent data")
+    parser.add_argument("--waves", nargs="+", default=WAVES)
+    parser.add_argument("--parquet-dir", default=PARQUET_DIR)
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument(
+        "--all-releases", action="store_true", help="Apply W6_Cambodia's plan to every W6 release"
+    )
+    parser.add_argument("--plan-file", help="Recode plan JSON from recode_plan.py (default: build from analyzed JSON)")
+    args = parser.parse_args(argv)
+    recode_plans = load_plans(args.plan_file) if args.plan_file else {}
+
+    print("=" * 60)
+    print("SCALE REVERSAL (vectorized, from analyzed JSON)")
+    print("=" * 60)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    summary = {}
+    for wave_name in args.waves:
+        start = time.perf_counter()
+        try:
+            if wave_name in recode_plans:
+                plan = ReversalPlan.from_recode_plan(recode_plans[wave_name])
+            else:
+                plan = ReversalPlan.from_analyzed(f"{wave_name}_analyzed.json", wave_name)
+            frame, reports = reverse_wave(plan, args.parquet_dir, args.all_releases)
+        except Exception as e:
+            print(f"\n❌ {wave_name}: {e}")
+            continue
+
+        output = os.path.join(args.output_dir, f"{wave_name}_reversed.parquet")
+        frame.to_parquet(output, index=False)
+        summary[wave_name] = reports
+
+        failed = sum(r["status"] != "ok" for report in reports.values() for r in report)
+        print(
+            f"\n📊 {wave_name}: {len(plan)} variables × {len(frame):,} rows "
+            f"from {len(reports)} release(s) in {time.perf_counter() - start:.2f}s"
+        )
+        if failed:
+            print(f"  ⚠️  {failed} variable/release pairs not reversed (missing column or failed validation)")
+        print(f"  💾 {output}")
+
+    report_file = os.path.join(args.output_dir, "reversal_report.json")
+    with open(report_file, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 Report: {report_file}")
+
+
+if __name__ == "__main__":
+    main()
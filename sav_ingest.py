@@ -0,0 +1,80 @@
+"""
+Stage 1 (alternative input): .sav metadata → variable list
+
+The W*_labels.txt inputs are text dumps of SPSS metadata that
+LabelsParser.parse() regex-parses back into structure. SavMetadataParser
+reads the variable labels and value labels straight from a .sav release
+with pyreadstat in metadata-only mode (no respondent rows are loaded) and
+produces the same variable dicts, so stem detection and atomic JSON
+generation run unchanged:
+
+    abs-llm-nlp parse data/raw/wave1/Wave1_20170906.sav W1_atomic.json
+
+Reading the metadata directly also avoids the text format's ambiguities:
+a variable without value labels (idnumber, YEAR) has no "Value Labels:"
+block, so the regex runs on into the next variable and attaches that
+variable's question and labels to the wrong ID.
+
+Like LabelsParser, only variables with value labels are returned unless
+include_unlabelled=True.
+"""
+
+from typing import Dict, List
+
+from parse_labels import LabelsParser
+
+
+class SavMetadataParser(LabelsParser):
+    """Parse variable and value labels from .sav metadata"""
+
+    def __init__(self, file_path: str, include_unlabelled: bool = False):
+        super().__init__(file_path)
+        self.include_unlabelled = include_unlabelled
+        self.metadata = None
+
+    def read_metadata(self):
+        """pyreadstat metadata of the file, without respondent rows"""
+        if self.metadata is None:
+            import pyreadstat
+
+            _, self.metadata = pyreadstat.read_sav(self.file_path, metadataonly=True)
+        return self.metadata
+
+    def parse(self) -> List[Dict]:
+        """Build the variable list from the file's metadata"""
+        meta = self.read_metadata()
+        value_labels = meta.variable_value_labels
+
+        self.variables = []
+        for var_id in meta.column_names:
+            labels = value_labels.get(var_id, {})
+            if not labels and not self.include_unlabelled:
+                continue
+
+            self.variables.append(
+                {
+                    "variable_id": var_id,
+                    "question_text": (meta.column_names_to_labels.get(var_id) or "").strip(),
+                    "value_labels": self._value_labels(labels),
+                }
+            )
+
+        return self.variables
+
+    @staticmethod
+    def _value_labels(labels: Dict) -> List[Dict]:
+        """
+        Integer-coded value labels in file order, as in labels.txt (string
+        variables coded "0", "-1" included)
+        """
+        parsed = []
+        for value, label in labels.items():
+            try:
+                code = int(value) if isinstance(value, str) else value
+            except ValueError:
+                continue
+            if isinstance(code, float) and code.is_integer():
+                code = int(code)
+            if isinstance(code, int):
+                parsed.append({"value": code, "label": str(label).strip()})
+        return parsed
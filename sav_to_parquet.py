@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Chunked .sav → partitioned Parquet cache of the respondent data
+
+Respondent-level work otherwise starts by reloading the raw .sav releases
+(or the R .rds files built from them). This converts every release under
+data/raw/wave*/ once into a Hive-partitioned Parquet dataset:
+
+    data/parquet/survey_wave=W6/release=Cambodia/data.parquet
+    data/parquet/survey_wave=W1/release=all/data.parquet
+    data/parquet/_manifest.json
+
+(the keys are not "wave"/"country" because the releases have a country
+column of their own)
+
+- rows are read with pyreadstat.read_file_in_chunks and written one row
+  group per chunk, so memory is bounded by --chunk-size rows
+- variable labels and value labels are kept as Parquet field metadata
+  ("label", "value_labels"), the file label and source as schema metadata
+- the manifest records each source's SHA-256; unchanged files are skipped
+
+Later steps read only the columns (and partitions) they need; each
+release keeps its own schema, and columns missing from a release are NaN:
+
+    df = load_columns(["q1", "q2"], wave="W6")
+    labels = load_value_labels("W6", "Cambodia")["q1"]
+
+Usage:
+    python sav_to_parquet.py
+    python sav_to_parquet.py --chunk-size 2000 --force
+"""
+
+import os
+import re
+import glob
+import json
+import time
+import hashlib
+import argparse
+from typing import Dict, List, Optional, Tuple
+
+RAW_DIR = os.path.join("data", "raw")
+PARQUET_DIR = os.path.join("data", "parquet")
+MANIFEST = "_manifest.json"
+
+_RELEASE_NAME = re.compile(r"^W\d+_(?:\d+_)?([A-Za-z]+)")
+
+
+def file_sha256(path: str, block_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def partition_for(path: str) -> Tuple[str, str]:
+    """(wave, country) of a release: data/raw/wave6/W6_11_Vietnam_... -> (W6, Vietnam)"""
+    wave_dir = re.search(r"wave(\d+)", os.path.basename(os.path.dirname(path)))
+    wave = f"W{wave_dir.group(1)}" if wave_dir else "unknown"
+    release = _RELEASE_NAME.match(os.path.basename(path))
+    return wave, release.group(1) if release else "all"
+
+
+def _code(value) -> str:
+    """Value label key as text: 1.0 -> "1", string codes unchanged"""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _arrow_schema(frame, meta, source: str, sha256: str):
+    """Schema of the first chunk, with labels attached as field/schema metadata"""
+    import pyarrow as pa
+
+    schema = pa.Schema.from_pandas(frame, preserve_index=False)
+    fields = []
+    for field in schema:
+        labels = meta.variable_value_labels.get(field.name, {})
+        fields.append(
+            field.with_metadata(
+                {
+                    "label": meta.column_names_to_labels.get(field.name) or "",
+                    "value_labels": json.dumps({_code(k): v for k, v in labels.items()}, ensure_ascii=False),
+                }
+            )
+        )
+    return pa.schema(
+        fields,
+        metadata={
+            "source": os.path.basename(source),
+            "sha256": sha256,
+            "file_label": meta.file_label or "",
+        },
+    )
+
+
+def convert_file(path: str, output_dir: str, chunk_size: int, sha256: str) -> Dict:
+    """Write one release as a single Parquet file with one row group per chunk"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    import pyreadstat
+
+    wave, country = partition_for(path)
+    partition = os.path.join(output_dir, f"survey_wave={wave}", f"release={country}")
+    os.makedirs(partition, exist_ok=True)
+    target = os.path.join(partition, "data.parquet")
+    partial = target + ".partial"
+
+    writer = None
+    rows = 0
+    chunks = 0
+    try:
+        for frame, meta in pyreadstat.read_file_in_chunks(pyreadstat.read_sav, path, chunksize=chunk_size):
+            if writer is None:
+                schema = _arrow_schema(frame, meta, path, sha256)
+                writer = pq.ParquetWriter(partial, schema, compression="zstd")
+            writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+            rows += len(frame)
+            chunks += 1
+    finally:
+        if writer is not None:
+            writer.close()
+    os.replace(partial, target)
+
+    return {
+        "sha256": sha256,
+        "output": os.path.relpath(target, output_dir),
+        "wave": wave,
+        "country": country,
+        "rows": rows,
+        "columns": len(schema),
+        "row_groups": chunks,
+        "converted": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def load_manifest(output_dir: str) -> Dict:
+    path = os.path.join(output_dir, MANIFEST)
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+
+def convert_all(
+    raw_dir: str = RAW_DIR, output_dir: str = PARQUET_DIR, chunk_size: int = 5000, force: bool = False
+) -> Dict:
+    """Convert every changed release; returns the updated manifest"""
+    manifest = load_manifest(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+
+    for path in sorted(glob.glob(os.path.join(raw_dir, "wave*", "*.sav"))):
+        key = os.path.relpath(path, raw_dir)
+        sha256 = file_sha256(path)
+        entry = manifest.get(key)
+        if (
+            not force
+            and entry
+            and entry["sha256"] == sha256
+            and os.path.exists(os.path.join(output_dir, entry["output"]))
+        ):
+            print(f"  ⏭️  {key} unchanged")
+            continue
+
+        start = time.perf_counter()
+        manifest[key] = convert_file(path, output_dir, chunk_size, sha256)
+        print(
+            f"  ✓ {key} → {manifest[key]['output']} "
+            f"({manifest[key]['rows']:,} rows, {manifest[key]['row_groups']} chunks, "
+            f"{time.perf_counter() - start:.2f}s)"
+        )
+
+        # Saved after every file so an interrupted run keeps its progress
+        with open(os.path.join(output_dir, MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+
+    return manifest
+
+
+def load_columns(
+    columns: Optional[List[str]] = None,
+    wave: Optional[str] = None,
+    country: Optional[str] = None,
+    output_dir: str = PARQUET_DIR,
+):
+    """
+    Read only the requested columns of the matching releases as one
+    DataFrame, with survey_wave and release columns added
+    """
+    import pandas as pd
+    import pyarrow.parquet as pq
+
+    frames = []
+    for entry in load_manifest(output_dir).values():
+        if (wave and entry["wave"] != wave) or (country and entry["country"] != country):
+            continue
+        path = os.path.join(output_dir, entry["output"])
+        present = None
+        if columns is not None:
+            available = set(pq.read_schema(path).names)
+            present = [c for c in columns if c in available]
+        frame = pq.read_table(path, columns=present).to_pandas()
+        frame.insert(0, "release", entry["country"])
+        frame.insert(0, "survey_wave", entry["wave"])
+        frames.append(frame)
+
+    if not frames:
+        return pd.DataFrame(columns=["survey_wave", "release"] + list(columns or []))
+    combined = pd.concat(frames, ignore_index=True)
+    if columns is not None:
+        combined = combined.reindex(columns=["survey_wave", "release"] + list(columns))
+    return combined
+
+
+def load_value_labels(wave: str, country: str = "all", output_dir: str = PARQUET_DIR) -> Dict[str, Dict]:
+    """Value labels per column of one partition, from the Parquet field metadata"""
+    import pyarrow.parquet as pq
+
+    path = os.path.join(output_dir, f"survey_wave={wave}", f"release={country}", "data.parquet")
+    schema = pq.read_schema(path)
+    return {
+        field.name: json.loads(field.metadata[b"value_labels"])
+        for field in schema
+        if field.metadata and b"value_labels" in field.metadata
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Convert .sav releases to a partitioned Parquet cache")
+    parser.add_argument("--raw-dir", default=RAW_DIR)
+    parser.add_argument("--output-dir", default=PARQUET_DIR)
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Rows read per chunk")
+    parser.add_argument("--force", action="store_true", help="Convert even unchanged files")
+    args = parser.parse_args(argv)
+
+    print("=" * 60)
+    print(f"Converting .sav releases under {args.raw_dir} → {args.output_dir}")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    manifest = convert_all(args.raw_dir, args.output_dir, args.chunk_size, args.force)
+    rows = sum(entry["rows"] for entry in manifest.values())
+    print(f"\n✅ {len(manifest)} releases, {rows:,} rows in {args.output_dir} ({time.perf_counter() - start:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
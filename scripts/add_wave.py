@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Add a new wave (or W6 country) to existing cross-wave matching results.
+
+Instead of re-running semantic_matcher_full.py over every wave, this loads
+the matcher state saved with `--save-state`, scores only the new questions
+against the existing ones, merges the new pairs into all_matches.json and
+rebuilds only the question clusters those pairs touch.
+
+Usage:
+    python scripts/semantic_matcher_full.py --save-state matching_results/state
+    python scripts/cluster_questions.py
+    python scripts/add_wave.py W6_Korea W6_Korea_crosswalk.json
+
+Existing pairs are never removed: a new question can push a pair out of an
+old question's top-k in a full run, but here that pair stays accepted.
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from instrumentation import metrics  # noqa: E402
+from semantic_matcher_full import QuestionMatcher  # noqa: E402
+from cluster_questions import QuestionClusterer, save_clusters_json, update_clusters  # noqa: E402
+
+
+def merge_matches(matcher, existing, categorized):
+    """Merge newly categorized pairs into the all_matches.json payload."""
+    # export_all_matches_json() writes the auto-accept tier first
+    auto = existing["matches"][: existing["auto_count"]]
+    manual = existing["matches"][existing["auto_count"] :]
+    auto = matcher._deduplicate_pairs(auto + categorized["auto_accept"])
+    manual = matcher._deduplicate_pairs(manual + categorized["manual_review"])
+
+    matches = auto + manual
+    return {
+        "matches": matches,
+        "count": len(matches),
+        "auto_count": len(auto),
+        "manual_count": len(manual),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally add a wave to the matching results")
+    parser.add_argument("wave", help="Wave name, e.g. W6_Korea")
+    parser.add_argument("crosswalk", help="The wave's crosswalk JSON")
+    parser.add_argument("--state-dir", default="matching_results/state")
+    parser.add_argument("--output-dir", default="matching_results")
+    parser.add_argument("--validation-phrases", default="validation_phrases_improved.json")
+    args = parser.parse_args()
+
+    output_dir = Path(args.output_dir)
+    matches_path = output_dir / "all_matches.json"
+    clusters_path = output_dir / "question_clusters.json"
+
+    print("=" * 60)
+    print(f"Adding {args.wave} to cross-wave matches")
+    print("=" * 60)
+
+    matcher, meta = QuestionMatcher.load_state(args.state_dir)
+    matcher.load_validation_phrases(args.validation_phrases)
+
+    with metrics.timer("stage.add_wave"):
+        new_matches = matcher.add_wave(args.wave, args.crosswalk, top_k=meta["top_k"])
+    categorized = matcher.categorize_matches(new_matches)
+
+    with open(matches_path, "r", encoding="utf-8") as f:
+        existing = json.load(f)
+    merged = merge_matches(matcher, existing, categorized)
+    added = merged["count"] - existing["count"]
+
+    with metrics.timer("io.write_json"):
+        with open(matches_path, "w", encoding="utf-8") as f:
+            json.dump(merged, f, indent=2)
+    matcher.save_state(args.state_dir, top_k=meta["top_k"])
+
+    print(f"\n  High confidence (≥0.85): +{len(categorized['auto_accept']):,} pairs")
+    print(f"  Manual review (0.75-0.85): +{len(categorized['manual_review']):,} pairs")
+    print(f"✓ {matches_path}: {existing['count']:,} → {merged['count']:,} matches (+{added:,})")
+
+    if clusters_path.exists():
+        with open(clusters_path, "r", encoding="utf-8") as f:
+            existing_clusters = json.load(f)["clusters"]
+
+        changed = set()
+        for match in categorized["auto_accept"] + categorized["manual_review"]:
+            changed.add(f"{match['wave1']}.{match['var1']}")
+            changed.add(f"{match['wave2']}.{match['var2']}")
+
+        clusterer = QuestionClusterer()
+        clusterer.load_matches_from_json(matches_path)
+        with metrics.timer("stage.update_clusters", items=len(changed)):
+            clusters, rebuilt = update_clusters(clusterer, existing_clusters, changed)
+
+        clusterer.export_to_csv(clusters, output_dir / "question_clusters.csv")
+        clusterer.export_to_markdown(clusters, output_dir / "question_clusters.md")
+        save_clusters_json(clusters, clusters_path)
+        print(
+            f"✓ Clusters: {len(existing_clusters):,} → {len(clusters):,} "
+            f"({len(clusters) - rebuilt:,} kept, {rebuilt:,} rebuilt)"
+        )
+    else:
+        print(f"⚠ {clusters_path} not found; run cluster_questions.py to build clusters")
+
+    metrics.print_summary()
+    metrics.emit("add_wave")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Question encoding throughput: file order vs length buckets vs worker pool.
+
+Encodes every crosswalk question (optionally repeated to simulate the
+all-countries W6 corpus) three ways and reports questions/sec:
+- file_order:  one encode() call over the texts as loaded (original path)
+- bucketed:    length-sorted batches in this process
+- parallel:    length-sorted batches over N worker processes
+
+Embeddings from every mode are checked against file_order, so the
+reordering is verified to be lossless.
+
+Usage:
+    python scripts/benchmark_encoding.py
+    python scripts/benchmark_encoding.py --encoder tfidf --repeat 10 --workers 8
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from semantic_matcher_full import QuestionMatcher  # noqa: E402
+from question_encoders import ENCODERS, ParallelEncoder, make_encoder  # noqa: E402
+
+WAVES = ["W1", "W2", "W3", "W4", "W5", "W6_Cambodia"]
+
+
+def load_texts(repeat):
+    matcher = QuestionMatcher(encoder=make_encoder("tfidf"))
+    for wave in WAVES:
+        filepath = f"{wave}_crosswalk.json"
+        if Path(filepath).exists():
+            matcher.load_crosswalk(wave, filepath)
+    return [q["question_text"] for q in matcher.questions] * repeat
+
+
+def max_difference(a, b):
+    if hasattr(a, "tocsr"):
+        return float(abs(a - b).max()) if (a - b).nnz else 0.0
+    return float(np.abs(a - b).max())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark question encoding throughput")
+    parser.add_argument("--encoder", choices=ENCODERS, default="transformer")
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes (default: all cores)")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=1, help="Repeat the corpus N times")
+    parser.add_argument("--output-dir", default="matching_results")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"Encoding throughput benchmark ({args.encoder})")
+    print("=" * 60)
+
+    texts = load_texts(args.repeat)
+    lengths = [len(t.split()) for t in texts]
+    print(f"\n{len(texts):,} texts, {min(lengths)}-{max(lengths)} words (median {int(np.median(lengths))})")
+
+    encoder = make_encoder(args.encoder)
+    if hasattr(encoder, "fit"):
+        encoder.fit(texts)  # same IDF for every mode
+
+    modes = [
+        ("file_order", encoder),
+        ("bucketed", ParallelEncoder(encoder, workers=1, batch_size=args.batch_size)),
+        ("parallel", ParallelEncoder(encoder, workers=args.workers, batch_size=args.batch_size)),
+    ]
+
+    results = []
+    baseline = None
+    for name, mode_encoder in modes:
+        start = time.perf_counter()
+        embeddings = mode_encoder.encode(texts)
+        seconds = time.perf_counter() - start
+        if baseline is None:
+            baseline = embeddings
+
+        row = {
+            "mode": name,
+            "workers": getattr(mode_encoder, "workers", 1),
+            "seconds": seconds,
+            "questions_per_s": len(texts) / seconds,
+            "speedup": results[0]["seconds"] / seconds if results else 1.0,
+            "max_abs_diff": max_difference(embeddings, baseline),
+        }
+        results.append(row)
+        print(
+            f"  {name:10s} {row['workers']:>3} workers  {seconds:7.2f}s  "
+            f"{row['questions_per_s']:>9,.0f} q/s  ({row['speedup']:.2f}x)  "
+            f"max diff {row['max_abs_diff']:.2e}"
+        )
+
+    report = {
+        "generated": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "encoder": args.encoder,
+        "texts": len(texts),
+        "batch_size": args.batch_size,
+        "results": results,
+    }
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    json_path = output_dir / f"encoding_benchmark_{args.encoder}.json"
+    md_path = output_dir / f"encoding_benchmark_{args.encoder}.md"
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    lines = [
+        f"# Encoding Throughput: {args.encoder}",
+        "",
+        f"**Generated:** {report['generated']}",
+        f"**Texts:** {len(texts):,}  **Batch size:** {args.batch_size}",
+        "",
+        "| Mode | Workers | Seconds | Questions/sec | Speedup | Max abs diff |",
+        "|------|---------|---------|---------------|---------|--------------|",
+    ]
+    for row in results:
+        lines.append(
+            f"| {row['mode']} | {row['workers']} | {row['seconds']:.2f} | "
+            f"{row['questions_per_s']:,.0f} | {row['speedup']:.2f}x | {row['max_abs_diff']:.2e} |"
+        )
+    with open(md_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+    print(f"\n✓ Report: {md_path}")
+    print(f"✓ JSON: {json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Memory / recall trade-off of quantized embedding indexes.
+
+Builds a float32, float16, int8 and PQ index over the same dense question
+embeddings and reports for each:
+- index memory (codes + codebooks) and compression vs float32
+- build and search time (every question queried for its top-k)
+- recall@k: share of the exact float32 top-k neighbours recovered
+- mean / max absolute error of the returned similarities
+- matches lost at the 0.75 manual-review threshold
+
+Usage:
+    python scripts/benchmark_quantization.py                  # encode W1-W6 with the transformer
+    python scripts/benchmark_quantization.py --embeddings matching_results/state/embeddings.npy
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from quantized_index import QUANTIZATIONS, build_quantized_index  # noqa: E402
+
+WAVES = ["W1", "W2", "W3", "W4", "W5", "W6_Cambodia"]
+MATCH_THRESHOLD = 0.75
+
+
+def encode_corpus():
+    """Transformer embeddings of every crosswalk question."""
+    from semantic_matcher_full import QuestionMatcher
+
+    matcher = QuestionMatcher()
+    for wave in WAVES:
+        filepath = f"{wave}_crosswalk.json"
+        if Path(filepath).exists():
+            matcher.load_crosswalk(wave, filepath)
+    matcher.build_embeddings()
+    return matcher.embeddings
+
+
+def search_all(index, embeddings, k, batch_size=256):
+    sims, ids = [], []
+    for start in range(0, embeddings.shape[0], batch_size):
+        batch_sims, batch_ids = index.search(embeddings[start : start + batch_size], k)
+        sims.append(batch_sims)
+        ids.append(batch_ids)
+    return np.vstack(sims), np.vstack(ids)
+
+
+def benchmark(embeddings, top_k, pq_subvectors):
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    embeddings = (embeddings / norms).astype(np.float32)
+    k = top_k + 1  # each question's own vector comes back first
+
+    results = []
+    exact_ids = None
+    exact_pairs = None
+    for quantization in QUANTIZATIONS:
+        print(f"\n  {quantization}:")
+        start = time.perf_counter()
+        index = build_quantized_index(embeddings, quantization, pq_subvectors=pq_subvectors)
+        build_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        sims, ids = search_all(index, embeddings, k)
+        search_s = time.perf_counter() - start
+
+        # Exact similarity of the neighbours this index returned
+        true_sims = np.einsum("qd,qkd->qk", embeddings, embeddings[ids])
+        errors = np.abs(sims - true_sims)
+
+        pairs = {
+            (min(q, j), max(q, j))
+            for q, row in enumerate(ids)
+            for j, sim in zip(row, true_sims[q])
+            if j != q and sim >= MATCH_THRESHOLD
+        }
+        if exact_ids is None:
+            exact_ids, exact_pairs = ids, pairs
+
+        hits = sum(len(set(a) & set(b)) for a, b in zip(ids, exact_ids))
+        row = {
+            "quantization": quantization,
+            "memory_bytes": int(index.nbytes),
+            "compression": results[0]["memory_bytes"] / index.nbytes if results else 1.0,
+            "build_s": build_s,
+            "search_s": search_s,
+            "queries_per_s": len(embeddings) / search_s if search_s else None,
+            f"recall_at_{top_k}": hits / exact_ids.size,
+            "mean_abs_error": float(errors.mean()),
+            "max_abs_error": float(errors.max()),
+            "threshold_pairs": len(pairs),
+            "threshold_pairs_lost": len(exact_pairs - pairs),
+        }
+        results.append(row)
+        print(
+            f"    {row['memory_bytes'] / 1e6:8.2f} MB  ({row['compression']:.1f}x)  "
+            f"recall@{top_k} {row[f'recall_at_{top_k}']:.3f}  "
+            f"mean |err| {row['mean_abs_error']:.4f}  search {search_s:.2f}s"
+        )
+    return results
+
+
+def write_markdown(report, output_path):
+    top_k = report["top_k"]
+    lines = [
+        "# Quantized Embedding Index Benchmark",
+        "",
+        f"**Generated:** {report['generated']}",
+        f"**Vectors:** {report['vectors']:,} x {report['dimensions']}  "
+        f"**top_k:** {top_k}  **PQ sub-vectors:** {report['pq_subvectors']}",
+        "",
+        f"Recall is against the exact float32 top-{top_k}; pairs are neighbour pairs "
+        f"with exact similarity ≥ {MATCH_THRESHOLD}.",
+        "",
+        "| Index | Memory (MB) | Compression | Build (s) | Search (s) | "
+        f"Recall@{top_k} | Mean abs err | Max abs err | Pairs lost |",
+        "|-------|-------------|-------------|-----------|------------|"
+        "----------|--------------|-------------|------------|",
+    ]
+    for row in report["results"]:
+        lines.append(
+            f"| {row['quantization']} | {row['memory_bytes'] / 1e6:.2f} | {row['compression']:.1f}x | "
+            f"{row['build_s']:.2f} | {row['search_s']:.2f} | {row[f'recall_at_{top_k}']:.3f} | "
+            f"{row['mean_abs_error']:.4f} | {row['max_abs_error']:.4f} | "
+            f"{row['threshold_pairs_lost']:,} / {report['results'][0]['threshold_pairs']:,} |"
+        )
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark quantized embedding indexes")
+    parser.add_argument("--embeddings", help="Dense embeddings .npy (default: encode the crosswalks)")
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--pq-subvectors", type=int, default=48)
+    parser.add_argument("--output-dir", default="matching_results")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Quantized embedding index benchmark")
+    print("=" * 60)
+
+    if args.embeddings:
+        embeddings = np.load(args.embeddings)
+    else:
+        embeddings = encode_corpus()
+    print(f"Embeddings: {embeddings.shape[0]:,} x {embeddings.shape[1]}")
+
+    report = {
+        "generated": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "vectors": int(embeddings.shape[0]),
+        "dimensions": int(embeddings.shape[1]),
+        "top_k": args.top_k,
+        "pq_subvectors": args.pq_subvectors,
+        "results": benchmark(embeddings, args.top_k, args.pq_subvectors),
+    }
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    json_path = output_dir / "quantization_benchmark.json"
+    md_path = output_dir / "quantization_benchmark.md"
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    write_markdown(report, md_path)
+
+    print(f"\n✓ Report: {md_path}")
+    print(f"✓ JSON: {json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Candidate generation (blocking) for cross-wave question matching.
+
+Instead of scoring every question against every other with the dense
+encoder, questions are put into blocks by cheap keys and only cross-wave
+pairs that share at least one block survive:
+
+- validation phrase words   (validation_phrases_improved.json)
+- concept words             (LLM concepts from the crosswalk)
+- question text words
+- scale signature words     (substantive value-label vocabulary, e.g.
+                             "trust"/"distrust", "agree", "done")
+
+Words are lowercased, stop-worded and prefix-stemmed. Blocks larger than
+max_block_size are skipped (a key shared by that many questions carries
+no signal), which is what keeps the candidate set small.
+
+The scale signature is used as a blocking key rather than a filter: the
+same item often changes scale between waves (6-point vs 4-point trust,
+yes/no vs frequency), so requiring equal scale points would drop real
+matches.
+"""
+
+import re
+import itertools
+from collections import defaultdict
+from typing import Dict, List, Set, Tuple
+
+
+STOP_WORDS = {
+    "the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for", "of",
+    "with", "by", "from", "is", "are", "was", "were", "be", "been", "have",
+    "has", "had", "do", "does", "did", "will", "would", "should", "could",
+    "may", "might", "must", "can", "your", "you", "how", "what", "which",
+    "when", "where", "who", "why", "that", "this", "these", "those", "about",
+    "there", "their", "they", "them", "it", "its", "not", "any", "some",
+    "very", "much", "more", "most", "question", "please", "following",
+}
+
+# Non-substantive value-label words that say nothing about the scale
+NA_LABEL_WORDS = {
+    "missing", "applicable", "know", "understand", "question", "choose",
+    "decline", "answer", "refuse", "refused",
+}
+
+QUESTION_NUMBER = re.compile(r"^\s*[a-z]*\d+\S*\s*", re.IGNORECASE)
+
+
+def block_words(text: str, min_length: int = 4, stem_length: int = 5) -> Set[str]:
+    """Lowercased, stop-worded, prefix-stemmed content words"""
+    words = re.findall(r"[a-z]+", text.lower())
+    return {w[:stem_length] for w in words if len(w) >= min_length and w not in STOP_WORDS}
+
+
+class CandidateBlocker:
+    """Generate cross-wave candidate pairs from shared blocking keys."""
+
+    def __init__(self, questions: List[Dict], validation_phrases: Dict[str, str],
+                 max_block_size: int = 100):
+        self.questions = questions
+        self.validation_phrases = validation_phrases
+        self.max_block_size = max_block_size
+        self.stats = {}
+
+    def question_keys(self, question: Dict) -> Set[str]:
+        """All blocking keys for one question, prefixed by source."""
+        keys = set()
+
+        phrase = self.validation_phrases.get(f"{question['wave']}_{question['var_id']}", "")
+        keys.update("phrase:" + w for w in block_words(QUESTION_NUMBER.sub("", phrase)))
+
+        for concept in question.get("concepts", []):
+            keys.update("concept:" + w for w in block_words(concept))
+
+        keys.update("text:" + w for w in block_words(question["question_text"]))
+
+        for label in question.get("value_labels", []):
+            if label.get("value", -1) >= 0:
+                keys.update(
+                    "scale:" + w
+                    for w in block_words(label.get("label", ""))
+                    if w not in NA_LABEL_WORDS
+                )
+        return keys
+
+    def build_blocks(self) -> Dict[str, List[int]]:
+        blocks = defaultdict(list)
+        for i, question in enumerate(self.questions):
+            for key in self.question_keys(question):
+                blocks[key].append(i)
+        return blocks
+
+    def generate(self) -> List[Tuple[int, int]]:
+        """Cross-wave pairs (i < j) that share at least one usable block."""
+        blocks = self.build_blocks()
+        waves = [q["wave"] for q in self.questions]
+
+        candidates = set()
+        oversized = 0
+        for members in blocks.values():
+            if len(members) > self.max_block_size:
+                oversized += 1
+                continue
+            for i, j in itertools.combinations(members, 2):
+                if waves[i] != waves[j]:
+                    candidates.add((i, j) if i < j else (j, i))
+
+        wave_sizes = defaultdict(int)
+        for wave in waves:
+            wave_sizes[wave] += 1
+        n = len(waves)
+        total_pairs = (n * (n - 1) - sum(s * (s - 1) for s in wave_sizes.values())) // 2
+
+        self.stats = {
+            "questions": n,
+            "cross_wave_pairs": total_pairs,
+            "blocks": len(blocks),
+            "oversized_blocks": oversized,
+            "candidates": len(candidates),
+        }
+        return sorted(candidates)
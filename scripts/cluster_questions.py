@@ -8,9 +8,14 @@ sorted by confidence for easier manual review.
 
 import json
 import csv
+import sys
+import argparse
 from pathlib import Path
 from collections import defaultdict
-from typing import Dict, List, Set, Tuple
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from instrumentation import metrics  # noqa: E402
 
 
 class QuestionClusterer:
@@ -98,13 +103,17 @@ class QuestionClusterer:
 
         return True
 
-    def find_connected_components(self) -> List[Set[str]]:
+    def find_connected_components(self, nodes: Optional[Iterable[str]] = None) -> List[Set[str]]:
         """Find connected components with strict target compatibility.
 
         Unlike simple DFS, this ensures ALL pairs in a component are target-compatible.
         This prevents transitive connections between incompatible targets.
+
+        If nodes is given, only those questions are clustered (used to rebuild
+        the clusters touched by an incremental add-wave).
         """
-        visited = set()
+        allowed = set(self.question_data) if nodes is None else set(nodes)
+        visited = set(self.question_data) - allowed
         components = []
 
         for start_node in self.question_data.keys():
@@ -170,11 +179,11 @@ class QuestionClusterer:
             )
         return (0.0, 0.0, 0)
 
-    def build_clusters(self) -> List[Dict]:
+    def build_clusters(self, nodes: Optional[Iterable[str]] = None) -> List[Dict]:
         """Build final cluster list with metadata."""
         print("\nBuilding question clusters...")
 
-        components = self.find_connected_components()
+        components = self.find_connected_components(nodes)
         clusters = []
 
         for idx, component in enumerate(components, 1):
@@ -223,6 +232,7 @@ class QuestionClusterer:
                     "question_text": rep_data["question"],
                     "concepts": sorted(all_concepts),
                     "domains": sorted(domains),
+                    "members": sorted(component),
                 }
             )
 
@@ -233,6 +243,12 @@ class QuestionClusterer:
         """Export clusters to CSV for easy Excel/spreadsheet review."""
         print(f"\nExporting to {output_path}")
 
+        # Waves added after W6_Cambodia (e.g. other W6 countries) get their own columns
+        standard = {"W1", "W2", "W3", "W4", "W5", "W6_Cambodia"}
+        extra_waves = sorted(
+            {wave for cluster in clusters for wave, _ in cluster["waves"]} - standard
+        )
+
         with open(output_path, "w", newline="", encoding="utf-8") as f:
             writer = csv.writer(f)
 
@@ -249,6 +265,7 @@ class QuestionClusterer:
                     "W4_Vars",
                     "W5_Vars",
                     "W6_Vars",
+                    *[f"{wave}_Vars" for wave in extra_waves],
                     "Question_Text",
                     "Concepts",
                     "Domains",
@@ -270,6 +287,7 @@ class QuestionClusterer:
                     ", ".join(waves_dict.get("W4", [])),
                     ", ".join(waves_dict.get("W5", [])),
                     ", ".join(waves_dict.get("W6_Cambodia", [])),
+                    *[", ".join(waves_dict.get(wave, [])) for wave in extra_waves],
                     cluster["question_text"][:200],  # Truncate long questions
                     "; ".join(cluster["concepts"][:5]),  # Top 5 concepts
                     "; ".join(cluster["domains"]),
@@ -312,6 +330,39 @@ class QuestionClusterer:
         print("  ✓ Exported markdown")
 
 
+def save_clusters_json(clusters: List[Dict], output_path):
+    """Save clusters with their member ids so add_wave.py can update them."""
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump({"clusters": clusters, "count": len(clusters)}, f, indent=2)
+
+
+def update_clusters(
+    clusterer: QuestionClusterer, existing: List[Dict], changed: Set[str]
+) -> Tuple[List[Dict], int]:
+    """
+    Rebuild only the clusters touched by new matches.
+
+    Clusters with a member in `changed` (endpoints of the added matches) are
+    dissolved and re-clustered together with the new questions; all other
+    clusters are kept as they are. Returns (clusters sorted by confidence and
+    renumbered, number of clusters rebuilt).
+    """
+    affected = set(changed)
+    kept = []
+    for cluster in existing:
+        if affected.intersection(cluster["members"]):
+            affected.update(cluster["members"])
+        else:
+            kept.append(cluster)
+
+    rebuilt = clusterer.build_clusters(nodes=affected & set(clusterer.question_data))
+    clusters = kept + rebuilt
+    clusters.sort(key=lambda x: x["avg_confidence"], reverse=True)
+    for idx, cluster in enumerate(clusters, 1):
+        cluster["cluster_id"] = idx
+    return clusters, len(rebuilt)
+
+
 def export_matches_to_json():
     """First, export the detailed markdown to JSON for easier processing."""
     print("\nStep 1: Converting detailed report to JSON...")
@@ -382,14 +433,23 @@ def export_matches_to_json():
     return output_path
 
 
-def main():
+def main(argv: Optional[List[str]] = None):
     """Main execution."""
+    parser = argparse.ArgumentParser(description="Cluster pairwise matches into question groups")
+    parser.add_argument(
+        "--matches",
+        default="matching_results/all_matches.json",
+        help="all_matches.json written by semantic_matcher_full.py",
+    )
+    parser.add_argument("--output-dir", default="matching_results")
+    args = parser.parse_args(argv)
+
     print("=" * 60)
     print("Asian Barometer Question Clustering")
     print("=" * 60)
 
     # Use the all_matches.json file generated by semantic_matcher_full.py
-    json_path = Path("matching_results/all_matches.json")
+    json_path = Path(args.matches)
 
     if not json_path.exists():
         print(f"✗ Error: {json_path} not found")
@@ -398,26 +458,31 @@ def main():
 
     # Build clusters from all matches (auto + manual)
     clusterer = QuestionClusterer()
-    clusterer.load_matches_from_json(json_path)
+    with metrics.timer("io.read_json"):
+        clusterer.load_matches_from_json(json_path)
 
-    clusters = clusterer.build_clusters()
+    with metrics.timer("stage.build_clusters"):
+        clusters = clusterer.build_clusters()
 
     # Step 3: Sort by confidence (high to low)
     clusters.sort(key=lambda x: x["avg_confidence"], reverse=True)
 
     # Step 4: Export to both formats
-    output_dir = Path("matching_results")
+    output_dir = Path(args.output_dir)
 
     csv_path = output_dir / "question_clusters.csv"
     md_path = output_dir / "question_clusters.md"
+    clusters_json_path = output_dir / "question_clusters.json"
 
     clusterer.export_to_csv(clusters, csv_path)
     clusterer.export_to_markdown(clusters, md_path)
+    save_clusters_json(clusters, clusters_json_path)
 
     print("\n" + "=" * 60)
     print("✓ COMPLETE!")
     print(f"  - CSV (for Excel): {csv_path}")
     print(f"  - Markdown: {md_path}")
+    print(f"  - JSON (with member ids): {clusters_json_path}")
     print("=" * 60)
 
     # Print summary
@@ -432,6 +497,8 @@ def main():
     for wave_count in sorted(wave_counts.keys(), reverse=True):
         print(f"    {wave_count} waves: {wave_counts[wave_count]} clusters")
 
+    metrics.emit("cluster_questions")
+
 
 if __name__ == "__main__":
     main()
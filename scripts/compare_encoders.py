@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Compare a matcher encoder against the stored transformer matches.
+
+Runs the full-corpus matcher with the given encoder (default: the offline
+hashed TF-IDF backend) and measures how many of the pairs in
+matching_results/all_matches.json - produced with all-MiniLM-L6-v2 - it
+recovers:
+- candidate recall: reference pairs present in the encoder's top-k
+  neighbour lists (what matters for a first pass)
+- recall / precision at a sweep of similarity thresholds, since TF-IDF
+  cosines are not on the same scale as the transformer's 0.85 / 0.75 tiers
+
+Usage:
+    python scripts/compare_encoders.py
+    python scripts/compare_encoders.py --encoder tfidf --top-k 20
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from semantic_matcher_full import QuestionMatcher  # noqa: E402
+from question_encoders import ENCODERS, make_encoder  # noqa: E402
+
+WAVES = ["W1", "W2", "W3", "W4", "W5", "W6_Cambodia"]
+THRESHOLDS = [0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9]
+
+
+def pair_key(wave1, var1, wave2, var2):
+    return tuple(sorted([(wave1, var1), (wave2, var2)]))
+
+
+def load_reference(path):
+    """Reference pairs from all_matches.json, split into auto / manual tiers."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    reference = {}
+    for match in data["matches"]:
+        tier = "auto" if match["similarity"] >= 0.85 else "manual"
+        key = pair_key(match["wave1"], match["var1"], match["wave2"], match["var2"])
+        reference[key] = (tier, match["similarity"])
+    return reference
+
+
+def run_encoder(encoder_name, top_k, blocking=False):
+    """Run the matcher candidate generation and return (matcher, best sim per pair, timings)."""
+    timings = {}
+    start = time.perf_counter()
+    matcher = QuestionMatcher(encoder=make_encoder(encoder_name))
+    timings["load_encoder_s"] = time.perf_counter() - start
+
+    matcher.load_validation_phrases()
+    for wave in WAVES:
+        filepath = f"{wave}_crosswalk.json"
+        if Path(filepath).exists():
+            matcher.load_crosswalk(wave, filepath)
+
+    if blocking:
+        start = time.perf_counter()
+        matches = matcher.find_matches_blocked(top_k=top_k)
+        timings["blocked_match_s"] = time.perf_counter() - start
+    else:
+        start = time.perf_counter()
+        matcher.build_embeddings()
+        timings["encode_s"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        matcher.build_faiss_index()
+        timings["index_s"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        matches = matcher.find_matches(top_k=top_k)
+        timings["search_s"] = time.perf_counter() - start
+
+    candidates = {}
+    for m in matches:
+        key = pair_key(m["wave1"], m["var1"], m["wave2"], m["var2"])
+        candidates[key] = max(candidates.get(key, 0.0), m["similarity"])
+    return matcher, candidates, timings
+
+
+def compare(reference, candidates, loaded):
+    """Recall of reference pairs overall, per tier and per threshold."""
+    # Only score reference pairs whose questions are still in the crosswalks
+    scored = {k: v for k, v in reference.items() if k[0] in loaded and k[1] in loaded}
+    tiers = {
+        tier: {k for k, (t, _) in scored.items() if t == tier} for tier in ("auto", "manual")
+    }
+
+    def recall(found, pairs):
+        return len(found & pairs) / len(pairs) if pairs else None
+
+    found = set(candidates)
+    report = {
+        "reference_pairs": len(reference),
+        "reference_pairs_scored": len(scored),
+        "candidate_pairs": len(candidates),
+        "candidate_recall": {
+            "all": recall(found, set(scored)),
+            "auto": recall(found, tiers["auto"]),
+            "manual": recall(found, tiers["manual"]),
+        },
+        "thresholds": [],
+    }
+
+    for threshold in THRESHOLDS:
+        kept = {k for k, sim in candidates.items() if sim >= threshold}
+        report["thresholds"].append(
+            {
+                "threshold": threshold,
+                "pairs": len(kept),
+                "recall_all": recall(kept, set(scored)),
+                "recall_auto": recall(kept, tiers["auto"]),
+                "recall_manual": recall(kept, tiers["manual"]),
+                "precision": len(kept & set(scored)) / len(kept) if kept else None,
+            }
+        )
+    return report
+
+
+def _pct(value):
+    return f"{value:.1%}" if value is not None else "n/a"
+
+
+def write_markdown(report, output_path):
+    lines = [
+        f"# Encoder Comparison: {report['encoder']} vs stored transformer matches",
+        "",
+        f"**Generated:** {report['generated']}",
+        f"**Reference:** {report['reference_file']} "
+        f"({report['reference_pairs']:,} pairs, {report['reference_pairs_scored']:,} scored)",
+        f"**Questions:** {report['questions']:,}  **top_k:** {report['top_k']}",
+        "",
+        "## Timing",
+        "",
+        "| Step | Seconds |",
+        "|------|---------|",
+    ]
+    for step, seconds in report["timings"].items():
+        lines.append(f"| {step} | {seconds:.2f} |")
+
+    if report["pruning"]:
+        lines += ["", "## Pair pruning", "", "| Stage | Pairs |", "|-------|-------|"]
+        for stage, count in report["pruning"].items():
+            lines.append(f"| {stage} | {count:,} |")
+
+    recall = report["candidate_recall"]
+    lines += [
+        "",
+        "## Candidate recall (reference pair in top-k neighbours)",
+        "",
+        f"- All reference pairs: {_pct(recall['all'])}",
+        f"- Auto-accept tier (≥0.85): {_pct(recall['auto'])}",
+        f"- Manual-review tier (0.75-0.85): {_pct(recall['manual'])}",
+        f"- Candidate pairs generated: {report['candidate_pairs']:,}",
+        "",
+        "## Threshold sweep",
+        "",
+        "| Threshold | Pairs | Recall (all) | Recall (auto) | Recall (manual) | Precision |",
+        "|-----------|-------|--------------|---------------|-----------------|-----------|",
+    ]
+    for row in report["thresholds"]:
+        lines.append(
+            f"| {row['threshold']:.2f} | {row['pairs']:,} | {_pct(row['recall_all'])} | "
+            f"{_pct(row['recall_auto'])} | {_pct(row['recall_manual'])} | {_pct(row['precision'])} |"
+        )
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare encoder recall against all_matches.json")
+    parser.add_argument("--encoder", choices=ENCODERS, default="tfidf")
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--reference", default="matching_results/all_matches.json")
+    parser.add_argument("--output-dir", default="matching_results")
+    parser.add_argument("--blocking", action="store_true", help="Use blocked candidate generation")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"Encoder comparison: {args.encoder} vs {args.reference}")
+    print("=" * 60)
+
+    reference = load_reference(args.reference)
+    matcher, candidates, timings = run_encoder(args.encoder, args.top_k, args.blocking)
+    loaded = {(q["wave"], q["var_id"]) for q in matcher.questions}
+
+    label = f"{args.encoder}_blocked" if args.blocking else args.encoder
+    report = {
+        "encoder": label,
+        "generated": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "reference_file": args.reference,
+        "questions": len(matcher.questions),
+        "top_k": args.top_k,
+        "timings": timings,
+        "pruning": matcher.pruning_stats,
+        **compare(reference, candidates, loaded),
+    }
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    json_path = output_dir / f"encoder_comparison_{label}.json"
+    md_path = output_dir / f"encoder_comparison_{label}.md"
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    write_markdown(report, md_path)
+
+    recall = report["candidate_recall"]
+    print(f"\n{'=' * 60}")
+    print("RESULTS")
+    print(f"{'=' * 60}")
+    print(f"  Encode + index + search: {sum(timings.values()):.2f}s")
+    print(f"  Candidate recall (all):    {_pct(recall['all'])}")
+    print(f"  Candidate recall (auto):   {_pct(recall['auto'])}")
+    print(f"  Candidate recall (manual): {_pct(recall['manual'])}")
+    print(f"\n✓ Report: {md_path}")
+    print(f"✓ JSON: {json_path}")
+
+
+if __name__ == "__main__":
+    main()
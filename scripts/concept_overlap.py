@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Sparse-matrix concept overlap for candidate question pairs.
+
+Scoring pairs one at a time builds and intersects two Python sets per
+pair. ConceptMatrix interns every lowercased concept to an integer
+id once and stores each question as a row of a binary CSR matrix, so the
+overlap of any number of pairs is a single row-wise sparse product:
+
+    intersection = sum(M[left] * M[right], axis=1)
+    overlap      = intersection / max(|left|, |right|)
+
+with the lowercased concept sets (0.0 when either list is empty).
+"""
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+class ConceptMatrix:
+    """Binary question x concept matrix with vectorised pair overlap."""
+
+    def __init__(self, questions: List[Dict]):
+        from scipy import sparse
+
+        self.concept_ids: Dict[str, int] = {}
+        self.rows: Dict[Tuple[str, str], int] = {}
+
+        indptr, indices = [0], []
+        for row, question in enumerate(questions):
+            ids = {
+                self.concept_ids.setdefault(c.lower(), len(self.concept_ids))
+                for c in question.get("concepts", [])
+            }
+            indices.extend(sorted(ids))
+            indptr.append(len(indices))
+            self.rows[(question["wave"], question["var_id"])] = row
+
+        self.matrix = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.float64), indices, indptr),
+            shape=(len(questions), max(len(self.concept_ids), 1)),
+        )
+        self.sizes = np.diff(self.matrix.indptr).astype(np.float64)
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    def _intersections(self, left, right, chunk_size=200000):
+        left, right = np.asarray(left), np.asarray(right)
+        counts = np.empty(len(left), dtype=np.float64)
+        for start in range(0, len(left), chunk_size):
+            end = start + chunk_size
+            products = self.matrix[left[start:end]].multiply(self.matrix[right[start:end]])
+            counts[start:end] = np.asarray(products.sum(axis=1)).ravel()
+        return counts, self.sizes[left], self.sizes[right]
+
+    def pair_overlap(self, left, right) -> np.ndarray:
+        """|A ∩ B| / max(|A|, |B|) for each row pair (left[i], right[i])."""
+        if len(left) == 0:
+            return np.zeros(0, dtype=np.float64)
+        inter, size_l, size_r = self._intersections(left, right)
+        denominator = np.maximum(size_l, size_r)
+        return np.divide(inter, denominator, out=np.zeros_like(inter), where=denominator > 0)
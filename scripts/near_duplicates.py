@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+MinHash / LSH near-duplicate detection for repeated items across waves.
+
+Most Asian Barometer items are repeated verbatim or nearly verbatim between
+waves. Those pairs do not need embeddings or a FAISS search: this module
+finds them in roughly linear time.
+
+1. Normalise the question text (drop question numbers, brackets, punctuation).
+2. Take word shingles and compute a MinHash signature per question.
+3. Bucket the signatures by LSH bands; questions sharing a bucket are
+   candidates.
+4. Verify candidates with the exact shingle Jaccard similarity.
+
+With 16 bands of 8 rows, pairs at Jaccard 0.8 collide with probability
+> 0.99 while pairs below ~0.5 rarely do, so only a handful of candidates per
+question reach the exact check.
+"""
+
+import re
+import zlib
+from collections import defaultdict
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+
+
+# Prime just above 2^32; multipliers stay below 2^31 so a * hash fits in uint64
+_PRIME = np.uint64(4294967311)
+
+_LEADING_NUMBER = re.compile(r"^\s*(?:[a-z]*\d+[a-z0-9_]*[.:)]?\s*)+")
+_BRACKETS = re.compile(r"[\[\](){}]")
+_NON_WORD = re.compile(r"[^a-z0-9\s]+")
+
+
+def normalize_question(text: str) -> str:
+    """Lowercase, strip leading question numbers, brackets and punctuation."""
+    text = text.lower()
+    text = _LEADING_NUMBER.sub("", text)
+    text = _BRACKETS.sub(" ", text)
+    text = _NON_WORD.sub(" ", text)
+    return " ".join(text.split())
+
+
+class NearDuplicateDetector:
+    """Find cross-group near-duplicate texts with MinHash LSH."""
+
+    def __init__(self, threshold=0.8, num_perm=128, bands=16, shingle_size=3, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2**31, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 2**32, size=num_perm, dtype=np.uint64)
+        self.stats = {}
+
+    def shingles(self, text: str) -> Set[int]:
+        """crc32 hashes of word n-gram shingles (whole text if shorter than n)."""
+        words = normalize_question(text).split()
+        if not words:
+            return set()
+        n = min(self.shingle_size, len(words))
+        return {
+            zlib.crc32(" ".join(words[i : i + n]).encode("utf-8"))
+            for i in range(len(words) - n + 1)
+        }
+
+    def signature(self, shingles: Set[int]) -> np.ndarray:
+        hashes = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % _PRIME
+        return permuted.min(axis=1)
+
+    def find_pairs(self, texts: List[str], groups: List[str]) -> List[Tuple[int, int, float]]:
+        """
+        Return (i, j, jaccard) for i < j in different groups (waves) whose
+        shingle Jaccard similarity is at least the threshold.
+        """
+        shingle_sets = [self.shingles(t) for t in texts]
+
+        buckets: Dict[Tuple[int, bytes], List[int]] = defaultdict(list)
+        for i, shingles in enumerate(shingle_sets):
+            if not shingles:
+                continue
+            sig = self.signature(shingles)
+            for band in range(self.bands):
+                chunk = sig[band * self.rows : (band + 1) * self.rows]
+                buckets[(band, chunk.tobytes())].append(i)
+
+        candidates = set()
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            for x in range(len(members)):
+                for y in range(x + 1, len(members)):
+                    i, j = members[x], members[y]
+                    if groups[i] != groups[j]:
+                        candidates.add((i, j) if i < j else (j, i))
+
+        pairs = []
+        for i, j in sorted(candidates):
+            a, b = shingle_sets[i], shingle_sets[j]
+            jaccard = len(a & b) / len(a | b)
+            if jaccard >= self.threshold:
+                pairs.append((i, j, jaccard))
+
+        self.stats = {
+            "texts": len(texts),
+            "lsh_candidates": len(candidates),
+            "near_duplicate_pairs": len(pairs),
+        }
+        return pairs
+
+
+def near_duplicate_groups(n: int, pairs: List[Tuple[int, int, float]]) -> List[List[int]]:
+    """Connected components (size > 1) of the near-duplicate graph."""
+    parent = list(range(n))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for i, j, _ in pairs:
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    components = defaultdict(list)
+    for i in range(n):
+        components[find(i)].append(i)
+    return [members for members in components.values() if len(members) > 1]
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Quantized storage and search for dense question embeddings.
+
+float32 embeddings cost 4 bytes per dimension (1.5 KB per all-MiniLM-L6-v2
+vector). For the all-countries W6 corpus the matcher can instead keep
+compressed codes and search them directly:
+
+- float16: half precision, 2 bytes/dim, near-lossless
+- int8:    per-dimension scalar quantization (min/max to 0..255), 1 byte/dim
+- pq:      product quantization - the vector is split into m sub-vectors,
+           each replaced by the id of its nearest of 256 k-means centroids,
+           so a vector costs m bytes; inner products are computed from
+           per-query lookup tables (asymmetric distance)
+
+All indexes expose the faiss `search(queries, k)` / `ntotal` interface used
+by QuestionMatcher.find_matches(), plus `add()` for add_wave and `nbytes`
+for the memory report. Vectors are expected to be L2-normalised.
+"""
+
+from typing import Dict
+
+import numpy as np
+
+
+QUANTIZATIONS = ("float32", "float16", "int8", "pq")
+
+
+def _merge_top_k(best_scores, best_ids, scores, offset, k):
+    """Merge a chunk of scores into the running per-query top-k."""
+    ids = np.arange(offset, offset + scores.shape[1])[None, :].repeat(scores.shape[0], axis=0)
+    all_scores = np.hstack([best_scores, scores])
+    all_ids = np.hstack([best_ids, ids])
+    top = np.argpartition(-all_scores, k - 1, axis=1)[:, :k]
+    return np.take_along_axis(all_scores, top, axis=1), np.take_along_axis(all_ids, top, axis=1)
+
+
+class QuantizedIndex:
+    """Exhaustive inner-product search over quantized codes."""
+
+    quantization = "base"
+    chunk_rows = 8192
+
+    def __init__(self, d: int):
+        self.d = d
+        self.codes = None
+
+    @property
+    def ntotal(self) -> int:
+        return 0 if self.codes is None else self.codes.shape[0]
+
+    def train(self, vectors):
+        return self
+
+    def encode(self, vectors):
+        raise NotImplementedError
+
+    def chunk_scores(self, queries, codes):
+        """(n_queries, n_codes) inner products between queries and a code chunk."""
+        raise NotImplementedError
+
+    def add(self, vectors):
+        codes = self.encode(np.asarray(vectors, dtype=np.float32))
+        self.codes = codes if self.codes is None else np.concatenate([self.codes, codes])
+
+    def search(self, queries, k):
+        """Return (similarities, indices), each shaped (n_queries, k), best first."""
+        queries = np.asarray(queries, dtype=np.float32)
+        k = min(k, self.ntotal)
+        best_scores = np.full((queries.shape[0], 0), -np.inf, dtype=np.float32)
+        best_ids = np.zeros((queries.shape[0], 0), dtype=np.int64)
+
+        for start in range(0, self.ntotal, self.chunk_rows):
+            scores = self.chunk_scores(queries, self.codes[start : start + self.chunk_rows])
+            best_scores, best_ids = _merge_top_k(best_scores, best_ids, scores, start, k)
+
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        return (
+            np.take_along_axis(best_scores, order, axis=1).astype(np.float32),
+            np.take_along_axis(best_ids, order, axis=1),
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by codes plus any codebook / scale parameters."""
+        return 0 if self.codes is None else self.codes.nbytes
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {"codes": self.codes}
+
+    def save(self, path):
+        np.savez(path, quantization=self.quantization, d=self.d, **self.state())
+
+    def load_state(self, data):
+        self.codes = data["codes"]
+
+
+class Float32Index(QuantizedIndex):
+    """Uncompressed baseline (same results as faiss IndexFlatIP)."""
+
+    quantization = "float32"
+
+    def encode(self, vectors):
+        return vectors.astype(np.float32)
+
+    def chunk_scores(self, queries, codes):
+        return queries @ codes.T
+
+
+class Float16Index(QuantizedIndex):
+    quantization = "float16"
+
+    def encode(self, vectors):
+        return vectors.astype(np.float16)
+
+    def chunk_scores(self, queries, codes):
+        return queries @ codes.astype(np.float32).T
+
+
+class Int8Index(QuantizedIndex):
+    """Per-dimension uniform quantization to 256 levels (faiss QT_8bit)."""
+
+    quantization = "int8"
+
+    def __init__(self, d: int):
+        super().__init__(d)
+        self.vmin = None
+        self.scale = None
+
+    def train(self, vectors):
+        self.vmin = vectors.min(axis=0).astype(np.float32)
+        span = vectors.max(axis=0) - self.vmin
+        span[span == 0] = 1
+        self.scale = (span / 255).astype(np.float32)
+        return self
+
+    def encode(self, vectors):
+        codes = np.rint((vectors - self.vmin) / self.scale)
+        return np.clip(codes, 0, 255).astype(np.uint8)
+
+    def chunk_scores(self, queries, codes):
+        # q . (vmin + scale * c) = q . vmin + (q * scale) . c
+        offset = queries @ self.vmin
+        return (queries * self.scale) @ codes.astype(np.float32).T + offset[:, None]
+
+    @property
+    def nbytes(self) -> int:
+        return super().nbytes + self.vmin.nbytes + self.scale.nbytes
+
+    def state(self):
+        return {"codes": self.codes, "vmin": self.vmin, "scale": self.scale}
+
+    def load_state(self, data):
+        super().load_state(data)
+        self.vmin, self.scale = data["vmin"], data["scale"]
+
+
+class PQIndex(QuantizedIndex):
+    """Product quantization with 8-bit codes per sub-vector."""
+
+    quantization = "pq"
+
+    def __init__(self, d: int, m: int = 48, seed: int = 1):
+        if d % m:
+            raise ValueError(f"dimension {d} is not divisible by {m} sub-vectors")
+        super().__init__(d)
+        self.m = m
+        self.dsub = d // m
+        self.seed = seed
+        self.centroids = None  # (m, n_centroids, dsub)
+
+    def train(self, vectors):
+        from scipy.cluster.vq import kmeans2
+
+        n_centroids = min(256, vectors.shape[0])
+        rng = np.random.default_rng(self.seed)
+        self.centroids = np.empty((self.m, n_centroids, self.dsub), dtype=np.float32)
+        for j in range(self.m):
+            sub = vectors[:, j * self.dsub : (j + 1) * self.dsub].astype(np.float64)
+            centroids, _ = kmeans2(sub, n_centroids, minit="++", seed=rng)
+            self.centroids[j] = centroids
+        return self
+
+    def encode(self, vectors):
+        codes = np.empty((vectors.shape[0], self.m), dtype=np.uint8)
+        for j in range(self.m):
+            sub = vectors[:, j * self.dsub : (j + 1) * self.dsub]
+            centroids = self.centroids[j]
+            # argmin ||x - c||^2 = argmax (x.c - ||c||^2 / 2)
+            scores = sub @ centroids.T - 0.5 * (centroids**2).sum(axis=1)
+            codes[:, j] = scores.argmax(axis=1)
+        return codes
+
+    def chunk_scores(self, queries, codes):
+        # Lookup table: inner product of every query sub-vector with every centroid
+        tables = np.einsum(
+            "qmd,mcd->mqc", queries.reshape(len(queries), self.m, self.dsub), self.centroids
+        )
+        scores = np.zeros((len(queries), codes.shape[0]), dtype=np.float32)
+        for j in range(self.m):
+            scores += tables[j][:, codes[:, j]]
+        return scores
+
+    @property
+    def nbytes(self) -> int:
+        return super().nbytes + self.centroids.nbytes
+
+    def state(self):
+        return {"codes": self.codes, "centroids": self.centroids, "m": self.m}
+
+    def load_state(self, data):
+        super().load_state(data)
+        self.centroids = data["centroids"]
+
+
+def build_quantized_index(embeddings, quantization: str, pq_subvectors: int = 48) -> QuantizedIndex:
+    """Train a quantized index on the embeddings and add them."""
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    d = embeddings.shape[1]
+    if quantization == "float32":
+        index = Float32Index(d)
+    elif quantization == "float16":
+        index = Float16Index(d)
+    elif quantization == "int8":
+        index = Int8Index(d)
+    elif quantization == "pq":
+        index = PQIndex(d, m=pq_subvectors)
+    else:
+        raise ValueError(
+            f"Unknown quantization '{quantization}' (expected one of {', '.join(QUANTIZATIONS)})"
+        )
+    index.train(embeddings)
+    index.add(embeddings)
+    return index
+
+
+def load_quantized_index(path) -> QuantizedIndex:
+    """Load an index written by QuantizedIndex.save()."""
+    data = np.load(path)
+    quantization, d = str(data["quantization"]), int(data["d"])
+    if quantization == "pq":
+        index = PQIndex(d, m=int(data["m"]))
+    else:
+        index = {"float32": Float32Index, "float16": Float16Index, "int8": Int8Index}[quantization](d)
+    index.load_state(data)
+    return index
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Pluggable question encoders for the semantic matcher.
+
+An encoder turns question texts into vectors and builds a search index
+over them. The index exposes the faiss `search(queries, k)` / `ntotal`
+interface, so QuestionMatcher.find_matches() works with either backend.
+
+Backends:
+- SentenceTransformerEncoder: the original all-MiniLM-L6-v2 embeddings in a
+  faiss IndexFlatIP (needs the model download, torch and faiss)
+- HashingTfidfEncoder: hashed word n-gram TF-IDF vectors with cosine
+  similarity over a scipy sparse matrix. CPU-only, no model files,
+  starts instantly. Use it as a quick first pass or in tests.
+
+ParallelEncoder wraps either backend to encode length-bucketed batches on
+a pool of CPU worker processes.
+"""
+
+import os
+import re
+import zlib
+from contextlib import contextmanager
+from typing import Dict, List
+
+import numpy as np
+
+
+ENCODERS = ("transformer", "tfidf")
+
+
+class QuestionEncoder:
+    """Base interface: encode() texts, then build_index() over the result."""
+
+    name = "base"
+
+    def encode(self, texts: List[str]):
+        raise NotImplementedError
+
+    def normalize(self, embeddings):
+        """L2-normalise rows so that inner product is cosine similarity."""
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return (embeddings / norms).astype(np.float32)
+
+    def pair_similarities(self, embeddings, left, right):
+        """Inner product of row pairs (left[i], right[i]) of normalised embeddings."""
+        return np.einsum("ij,ij->i", embeddings[left], embeddings[right])
+
+    def similarity_matrix(self, queries, embeddings):
+        """Dense (n_queries, n_embeddings) inner products of normalised rows."""
+        return queries @ embeddings.T
+
+    def build_index(self, embeddings):
+        """Exact inner-product faiss index over L2-normalised embeddings."""
+        import faiss
+
+        faiss.normalize_L2(embeddings)
+        index = faiss.IndexFlatIP(embeddings.shape[1])
+        index.add(embeddings)
+        return index
+
+    def add_to_index(self, index, embeddings, new_embeddings):
+        """Add rows to an index built by build_index(); returns the index."""
+        import faiss
+
+        faiss.normalize_L2(new_embeddings)
+        index.add(new_embeddings)
+        return index
+
+    # Persistence (used by the incremental matcher state)
+
+    def config(self) -> Dict:
+        """Constructor arguments needed to rebuild this encoder."""
+        return {"name": self.name}
+
+    def save(self, directory: str):
+        """Save fitted encoder parameters (none for pretrained models)."""
+
+    def load(self, directory: str):
+        """Load parameters written by save()."""
+        return self
+
+    def worker_state(self, texts: List[str]) -> Dict:
+        """Fitted parameters a worker process needs to encode like this encoder."""
+        return {}
+
+    def restore_worker_state(self, state: Dict):
+        return self
+
+    def save_embeddings(self, embeddings, directory: str):
+        np.save(os.path.join(directory, "embeddings.npy"), embeddings)
+
+    def load_embeddings(self, directory: str):
+        return np.load(os.path.join(directory, "embeddings.npy"))
+
+    def save_index(self, index, directory: str):
+        import faiss
+
+        faiss.write_index(index, os.path.join(directory, "index.faiss"))
+
+    def load_index(self, directory: str, embeddings):
+        import faiss
+
+        return faiss.read_index(os.path.join(directory, "index.faiss"))
+
+
+class SentenceTransformerEncoder(QuestionEncoder):
+    """Dense sentence-transformer embeddings (original matcher behaviour)."""
+
+    name = "transformer"
+
+    def __init__(self, model_name="all-MiniLM-L6-v2", batch_size=32, show_progress_bar=True):
+        print(f"Loading sentence transformer model: {model_name}")
+        from sentence_transformers import SentenceTransformer
+
+        self.model_name = model_name
+        self.model = SentenceTransformer(model_name)
+        self.batch_size = batch_size
+        self.show_progress_bar = show_progress_bar
+
+    def config(self) -> Dict:
+        return {"name": self.name, "model_name": self.model_name}
+
+    def encode(self, texts: List[str]):
+        return self.model.encode(
+            texts,
+            convert_to_numpy=True,
+            show_progress_bar=self.show_progress_bar,
+            batch_size=self.batch_size,
+        )
+
+
+class SparseCosineIndex:
+    """Exact cosine search over L2-normalised sparse rows (faiss-style API)."""
+
+    def __init__(self, matrix):
+        self.matrix = matrix.tocsr()
+        self.ntotal = self.matrix.shape[0]
+
+    def search(self, queries, k):
+        """Return (similarities, indices), each shaped (n_queries, k)."""
+        k = min(k, self.ntotal)
+        scores = (queries @ self.matrix.T).toarray()
+
+        # argpartition for the top k, then a stable sort of just those k
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        indices = np.take_along_axis(top, order, axis=1)
+        similarities = np.take_along_axis(top_scores, order, axis=1)
+        return similarities.astype(np.float32), indices
+
+
+class HashingTfidfEncoder(QuestionEncoder):
+    """
+    Hashed word n-gram TF-IDF with cosine similarity.
+
+    Tokens are hashed with crc32 (stable across runs, unlike hash()) into
+    n_features buckets, so there is no vocabulary to store. IDF is fitted on
+    the first corpus encoded (or explicitly via fit()).
+    """
+
+    name = "tfidf"
+
+    TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+    def __init__(self, n_features=2**18, ngram_range=(1, 2), sublinear_tf=True):
+        self.n_features = n_features
+        self.ngram_range = ngram_range
+        self.sublinear_tf = sublinear_tf
+        self.idf = None
+
+    def _features(self, text: str) -> List[int]:
+        tokens = self.TOKEN_PATTERN.findall(text.lower())
+        low, high = self.ngram_range
+        buckets = []
+        for n in range(low, high + 1):
+            for i in range(len(tokens) - n + 1):
+                gram = " ".join(tokens[i : i + n])
+                buckets.append(zlib.crc32(gram.encode("utf-8")) % self.n_features)
+        return buckets
+
+    def _term_counts(self, texts: List[str]):
+        from scipy import sparse
+
+        rows, cols = [], []
+        for row, text in enumerate(texts):
+            features = self._features(text)
+            rows.extend([row] * len(features))
+            cols.extend(features)
+
+        data = np.ones(len(cols), dtype=np.float32)
+        counts = sparse.csr_matrix(
+            (data, (rows, cols)), shape=(len(texts), self.n_features)
+        )
+        counts.sum_duplicates()
+        return counts
+
+    def fit(self, texts: List[str]):
+        """Fit smoothed IDF weights on a corpus."""
+        counts = self._term_counts(texts)
+        doc_freq = np.bincount(counts.indices, minlength=self.n_features)
+        self.idf = (
+            np.log((1 + len(texts)) / (1 + doc_freq)) + 1
+        ).astype(np.float32)
+        return self
+
+    def encode(self, texts: List[str]):
+        """Return an L2-normalised scipy CSR matrix, one row per text."""
+        from scipy import sparse
+
+        if self.idf is None:
+            self.fit(texts)
+
+        matrix = self._term_counts(texts)
+        if self.sublinear_tf:
+            matrix.data = 1 + np.log(matrix.data)
+        matrix = matrix @ sparse.diags(self.idf)
+
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        return sparse.diags(1 / norms) @ matrix
+
+    def normalize(self, embeddings):
+        return embeddings  # encode() already returns unit-length rows
+
+    def pair_similarities(self, embeddings, left, right):
+        products = embeddings[left].multiply(embeddings[right])
+        return np.asarray(products.sum(axis=1)).ravel()
+
+    def similarity_matrix(self, queries, embeddings):
+        return (queries @ embeddings.T).toarray()
+
+    def build_index(self, embeddings):
+        return SparseCosineIndex(embeddings)
+
+    def add_to_index(self, index, embeddings, new_embeddings):
+        from scipy import sparse
+
+        return SparseCosineIndex(sparse.vstack([embeddings, new_embeddings]))
+
+    def config(self) -> Dict:
+        return {
+            "name": self.name,
+            "n_features": self.n_features,
+            "ngram_range": list(self.ngram_range),
+            "sublinear_tf": self.sublinear_tf,
+        }
+
+    def save(self, directory: str):
+        np.save(os.path.join(directory, "idf.npy"), self.idf)
+
+    def load(self, directory: str):
+        self.idf = np.load(os.path.join(directory, "idf.npy"))
+        return self
+
+    def worker_state(self, texts: List[str]) -> Dict:
+        if self.idf is None:
+            self.fit(texts)
+        return {"idf": self.idf}
+
+    def restore_worker_state(self, state: Dict):
+        self.idf = state["idf"]
+        return self
+
+    def save_embeddings(self, embeddings, directory: str):
+        from scipy import sparse
+
+        sparse.save_npz(os.path.join(directory, "embeddings.npz"), embeddings.tocsr())
+
+    def load_embeddings(self, directory: str):
+        from scipy import sparse
+
+        return sparse.load_npz(os.path.join(directory, "embeddings.npz")).tocsr()
+
+    def save_index(self, index, directory: str):
+        pass  # rebuilt from the saved embeddings
+
+    def load_index(self, directory: str, embeddings):
+        return SparseCosineIndex(embeddings)
+
+
+def text_length(text: str) -> int:
+    """Cheap token-count proxy used to bucket texts of similar length."""
+    return len(text.split())
+
+
+def length_buckets(texts: List[str], batch_size: int):
+    """
+    Sort texts by length and cut them into batches.
+
+    Returns (batches of indices into texts, inverse permutation): stacking
+    the per-batch results and indexing with the inverse permutation
+    restores the original order.
+    """
+    order = np.argsort([text_length(t) for t in texts], kind="stable")
+    batches = [order[i : i + batch_size] for i in range(0, len(order), batch_size)]
+    inverse = np.empty_like(order)
+    inverse[order] = np.arange(len(order))
+    return batches, inverse
+
+
+def _stack(parts):
+    if parts and hasattr(parts[0], "tocsr"):
+        from scipy import sparse
+
+        return sparse.vstack(parts).tocsr()
+    return np.vstack(parts)
+
+
+_worker_encoder = None
+
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+
+@contextmanager
+def _worker_thread_env(threads: int):
+    """
+    Thread-count variables for spawned workers, restored on exit.
+
+    BLAS and torch read them when first imported, which in a spawned worker
+    happens before the pool initializer runs, so they have to be in the
+    environment the worker starts with.
+    """
+    saved = {var: os.environ.get(var) for var in THREAD_ENV_VARS}
+    os.environ.update({var: str(threads) for var in THREAD_ENV_VARS})
+    try:
+        yield
+    finally:
+        for var, value in saved.items():
+            if value is None:
+                os.environ.pop(var, None)
+            else:
+                os.environ[var] = value
+
+
+def _init_worker(config: Dict, state: Dict):
+    """Pool initializer: rebuild the encoder once per worker process."""
+    global _worker_encoder
+    _worker_encoder = encoder_from_config(config).restore_worker_state(state)
+    if hasattr(_worker_encoder, "show_progress_bar"):
+        _worker_encoder.show_progress_bar = False
+
+
+def _encode_batch(texts: List[str]):
+    return _worker_encoder.encode(texts)
+
+
+class ParallelEncoder:
+    """
+    Encode on a pool of CPU worker processes with length-bucketed batches.
+
+    Texts are sorted by length and cut into batches, so short demographic
+    items and long stem + item questions are not padded to each other;
+    batches are spread over `workers` processes and the results are put
+    back in the original order. Everything except encode() is delegated to
+    the wrapped encoder. With workers=1 the batches run in-process.
+    """
+
+    def __init__(self, encoder: QuestionEncoder, workers: int = 0, batch_size: int = 32):
+        self.encoder = encoder
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.name = encoder.name
+
+    def __getattr__(self, attr):
+        if attr == "encoder":
+            raise AttributeError(attr)
+        return getattr(self.encoder, attr)
+
+    def encode(self, texts: List[str]):
+        import multiprocessing
+
+        batches, inverse = length_buckets(texts, self.batch_size)
+        text_batches = [[texts[i] for i in batch] for batch in batches]
+        state = self.encoder.worker_state(texts)
+
+        if self.workers == 1:
+            return _stack([self.encoder.encode(batch) for batch in text_batches])[inverse]
+        threads = max(1, (os.cpu_count() or 1) // self.workers)
+
+        # spawn: forking a parent that already loaded torch can deadlock.
+        # Keep each worker's BLAS/torch threads within its share of the cores.
+        context = multiprocessing.get_context("spawn")
+        with _worker_thread_env(threads), context.Pool(
+            self.workers,
+            initializer=_init_worker,
+            initargs=(self.encoder.config(), state),
+        ) as pool:
+            parts = pool.map(_encode_batch, text_batches)
+
+        return _stack(parts)[inverse]
+
+
+def make_encoder(name: str, model_name: str = "all-MiniLM-L6-v2") -> QuestionEncoder:
+    """Build an encoder from its command-line name."""
+    if name == "transformer":
+        return SentenceTransformerEncoder(model_name)
+    if name == "tfidf":
+        return HashingTfidfEncoder()
+    raise ValueError(f"Unknown encoder '{name}' (expected one of {', '.join(ENCODERS)})")
+
+
+def encoder_from_config(config: Dict) -> QuestionEncoder:
+    """Rebuild an encoder from QuestionEncoder.config()."""
+    if "compose_stems" in config:
+        from stem_composition import StemComposingEncoder
+
+        inner = {k: v for k, v in config.items() if k not in ("compose_stems", "stem_weight")}
+        return StemComposingEncoder(
+            encoder_from_config(inner), config["compose_stems"], config["stem_weight"]
+        )
+    if config["name"] == "transformer":
+        return SentenceTransformerEncoder(config.get("model_name", "all-MiniLM-L6-v2"))
+    if config["name"] == "tfidf":
+        return HashingTfidfEncoder(
+            n_features=config["n_features"],
+            ngram_range=tuple(config["ngram_range"]),
+            sublinear_tf=config["sublinear_tf"],
+        )
+    raise ValueError(f"Unknown encoder '{config['name']}'")
@@ -6,24 +6,53 @@ Runs on complete dataset across all 6 waves.
 """
 
 import json
+import sys
 from pathlib import Path
 from collections import defaultdict
 from datetime import datetime
-from sentence_transformers import SentenceTransformer
-import faiss
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import numpy as np  # noqa: E402
+
+from instrumentation import metrics  # noqa: E402
+from text_dedup import TextDeduplicator, record_savings  # noqa: E402
+from question_encoders import (  # noqa: E402
+    ENCODERS,
+    ParallelEncoder,
+    encoder_from_config,
+    make_encoder,
+)
+from candidate_blocking import CandidateBlocker  # noqa: E402
+from concept_overlap import ConceptMatrix  # noqa: E402
+from near_duplicates import NearDuplicateDetector, near_duplicate_groups  # noqa: E402
+from stem_composition import COMPOSITIONS, StemComposingEncoder  # noqa: E402
+from quantized_index import (  # noqa: E402
+    QUANTIZATIONS,
+    QuantizedIndex,
+    build_quantized_index,
+    load_quantized_index,
+)
 
 
 class QuestionMatcher:
     """Semantic matching engine for cross-wave question comparison."""
 
-    def __init__(self, model_name="all-MiniLM-L6-v2"):
-        """Initialize with sentence transformer model."""
-        print(f"Loading sentence transformer model: {model_name}")
-        self.model = SentenceTransformer(model_name)
+    def __init__(self, model_name="all-MiniLM-L6-v2", encoder=None, quantization="float32"):
+        """
+        Initialize with a question encoder (see question_encoders.py).
+        Defaults to the sentence transformer model. quantization selects how
+        dense embeddings are stored in the search index (see quantized_index.py).
+        """
+        self.encoder = encoder or make_encoder("transformer", model_name)
+        self.quantization = quantization
         self.questions = []
         self.embeddings = None
         self.index = None
         self.validation_phrases = {}
+        self.pruning_stats = {}
+        self.neighbor_sims = None  # (n_semantic, top_k) similarities kept by find_matches()
+        self.near_dup_threshold = None
+        self.concept_matrix = None
 
     def load_validation_phrases(self, filepath="validation_phrases_improved.json"):
         """Load validation phrases for secondary verification."""
@@ -62,6 +91,7 @@ class QuestionMatcher:
                     var_id = var.get("variable_id", "")
                     question_text = var.get("question_text", "")
                     concepts = var.get("concepts", [])
+                    value_labels = var.get("value_labels", [])
 
                     if question_text:
                         self.questions.append(
@@ -71,6 +101,7 @@ class QuestionMatcher:
                                 "question_text": question_text,
                                 "concepts": concepts,
                                 "domain": domain_name,
+                                "value_labels": value_labels,
                             }
                         )
                         count += 1
@@ -81,49 +112,165 @@ class QuestionMatcher:
             print(f"  ✗ Error loading {wave_name}: {e}")
             return 0
 
+    def semantic_questions(self):
+        """Questions that go through the semantic pass (near-duplicate representatives and singletons)."""
+        return [q for q in self.questions if "near_duplicate_of" not in q]
+
+    def find_near_duplicates(self, threshold=0.8, new_from=0):
+        """
+        Auto-accept cross-wave near-duplicates found with MinHash LSH.
+
+        Every near-duplicate group keeps one representative in the semantic
+        pass; the other members are marked `near_duplicate_of` and skipped by
+        build_embeddings() / find_matches(). They stay connected to the
+        representative's semantic matches through the accepted near-duplicate
+        edges when clustering.
+
+        Pairs that target different subjects (_check_target_mismatch, e.g.
+        relatives vs neighbors) are dropped before grouping, as in the
+        semantic pass.
+
+        With new_from > 0 (add_wave), only pairs involving questions at index
+        >= new_from are kept and only those questions can be marked; earlier
+        questions keep their role from the saved state.
+        """
+        print(f"\n{'=' * 60}")
+        print(f"Finding near-duplicates (shingle Jaccard ≥ {threshold})")
+        print(f"{'=' * 60}")
+
+        self.near_dup_threshold = threshold
+        detector = NearDuplicateDetector(threshold=threshold)
+        with metrics.timer("stage.near_duplicates", items=len(self.questions)):
+            pairs = detector.find_pairs(
+                [q["question_text"] for q in self.questions],
+                [q["wave"] for q in self.questions],
+            )
+            pairs = [pair for pair in pairs if pair[1] >= new_from]
+            candidates = len(pairs)
+            pairs = [
+                (i, j, jaccard)
+                for i, j, jaccard in pairs
+                if not self._check_target_mismatch(
+                    self.questions[i]["question_text"], self.questions[j]["question_text"]
+                )
+            ]
+            groups = near_duplicate_groups(len(self.questions), pairs)
+
+        skipped = 0
+        for members in groups:
+            representative = self.questions[members[0]]
+            rep_id = representative.get(
+                "near_duplicate_of", f"{representative['wave']}.{representative['var_id']}"
+            )
+            for i in members[1:]:
+                if i >= new_from:
+                    self.questions[i]["near_duplicate_of"] = rep_id
+                    skipped += 1
+
+        matches = []
+        for i, j, jaccard in pairs:
+            match = self._make_match(self.questions[i], self.questions[j], jaccard)
+            match["match_method"] = "near_duplicate"
+            matches.append(match)
+        self._add_concept_overlap(matches)
+
+        metrics.incr("stage.near_duplicates.pairs", len(pairs))
+        metrics.incr("stage.near_duplicates.skipped_questions", skipped)
+
+        print(f"  LSH candidates: {detector.stats['lsh_candidates']:,}")
+        print(f"  Target mismatches rejected: {candidates - len(pairs):,}")
+        print(f"  ✓ {len(pairs):,} near-duplicate pairs in {len(groups):,} groups (auto-accepted)")
+        print(
+            f"  ✓ {skipped:,} of {len(self.questions):,} questions removed from the semantic pass"
+        )
+        return matches
+
     def build_embeddings(self):
         """Generate embeddings for all questions."""
         print(f"\n{'=' * 60}")
         print("Building embeddings for all questions")
         print(f"{'=' * 60}")
 
-        texts = [q["question_text"] for q in self.questions]
+        texts = [q["question_text"] for q in self.semantic_questions()]
 
-        print(f"Encoding {len(texts)} questions...")
-        self.embeddings = self.model.encode(
-            texts, convert_to_numpy=True, show_progress_bar=True, batch_size=32
-        )
+        print(f"Encoding {len(texts)} questions with {self.encoder.name} encoder...")
+        with metrics.timer("stage.encode", items=len(texts)):
+            self.embeddings = self.encode_unique(texts)
+
+        stats = getattr(self.encoder, "stats", None)
+        if stats:
+            saved = 1 - stats["words_encoded"] / stats["words_full"]
+            print(
+                f"  Stem composition: {stats['stemmed_texts']:,} texts share "
+                f"{stats['distinct_stems']:,} stems; encoded {stats['encoded_segments']:,} segments, "
+                f"{stats['words_encoded']:,} of {stats['words_full']:,} words ({saved:.1%} saved)"
+            )
+            metrics.incr("stage.encode.words_full", stats["words_full"])
+            metrics.incr("stage.encode.words_encoded", stats["words_encoded"])
 
         print(f"✓ Generated embeddings: shape {self.embeddings.shape}")
 
+    def encode_unique(self, texts):
+        """Encode each unique (canonical) text once and fan the rows back out."""
+        # Corpus statistics (TF-IDF IDF) still count every occurrence
+        if getattr(self.encoder, "idf", False) is None:
+            self.encoder.fit(texts)
+
+        dedup = TextDeduplicator(texts)
+        embeddings = self.encoder.encode(dedup.unique_texts)
+        record_savings("embeddings", dedup.total, dedup.unique)
+        return embeddings[dedup.inverse]
+
     def build_faiss_index(self):
-        """Build FAISS index for fast similarity search."""
-        print("\nBuilding FAISS index...")
+        """Build the encoder's similarity index (FAISS for dense embeddings)."""
+        print("\nBuilding similarity index...")
+
+        if self.quantization != "float32":
+            if hasattr(self.embeddings, "tocsr"):
+                raise ValueError(f"{self.quantization} quantization needs dense embeddings")
+            # Queried with the same unit-length rows the codes are built from
+            self.embeddings = self.encoder.normalize(self.embeddings)
+            with metrics.timer("stage.quantized_index", items=self.embeddings.shape[0]):
+                self.index = build_quantized_index(self.embeddings, self.quantization)
+            float32_bytes = self.embeddings.shape[0] * self.embeddings.shape[1] * 4
+            print(
+                f"✓ {self.quantization} index built with {self.index.ntotal} vectors: "
+                f"{self.index.nbytes / 1e6:.2f} MB (float32: {float32_bytes / 1e6:.2f} MB)"
+            )
+            return
 
-        faiss.normalize_L2(self.embeddings)
-        dimension = self.embeddings.shape[1]
-        self.index = faiss.IndexFlatIP(dimension)
-        self.index.add(self.embeddings)
+        with metrics.timer("stage.faiss_index", items=self.embeddings.shape[0]):
+            self.index = self.encoder.build_index(self.embeddings)
 
-        print(f"✓ FAISS index built with {self.index.ntotal} vectors")
+        print(f"✓ Index built with {self.index.ntotal} vectors")
 
-    def find_matches(self, top_k=20):
+    def find_matches(self, top_k=20, batch_size=256):
         """Find similar questions across waves."""
         print(f"\n{'=' * 60}")
         print("Finding cross-wave matches")
         print(f"{'=' * 60}")
 
+        questions = self.semantic_questions()
         matches = []
+        self.neighbor_sims = np.full((len(questions), top_k), -np.inf, dtype=np.float32)
 
-        for idx, question in enumerate(self.questions):
-            if idx % 100 == 0:
-                print(f"  Processing question {idx}/{len(self.questions)}...")
+        results = []
+        for start in range(0, len(questions), batch_size):
+            print(f"  Processing question {start}/{len(questions)}...")
+            batch_sims, batch_indices = self.index.search(
+                self.embeddings[start : start + batch_size], top_k + 1
+            )
+            results.extend(zip(batch_sims, batch_indices))
 
-            query_embedding = self.embeddings[idx : idx + 1]
-            similarities, indices = self.index.search(query_embedding, top_k + 1)
+        for idx, (question, (similarities, indices)) in enumerate(zip(questions, results)):
+            # The query itself is not always rank 0 (approximate indexes, ties)
+            not_self = indices != idx
+            similarities = similarities[not_self][:top_k]
+            indices = indices[not_self][:top_k]
+            self.neighbor_sims[idx, : len(similarities)] = similarities
 
-            for sim, match_idx in zip(similarities[0][1:], indices[0][1:]):
-                match = self.questions[match_idx]
+            for sim, match_idx in zip(similarities, indices):
+                match = questions[match_idx]
 
                 if match["wave"] != question["wave"]:
                     # Check if questions target different subjects (e.g., relatives vs neighbors)
@@ -132,38 +279,287 @@ class QuestionMatcher:
                     ):
                         continue  # Skip this match - different targets
 
-                    phrase_match = self._check_phrase_match(
-                        question["wave"],
-                        question["var_id"],
-                        match["wave"],
-                        match["var_id"],
-                    )
-
-                    concept_overlap = self._check_concept_overlap(
-                        question["concepts"], match["concepts"]
-                    )
-
-                    matches.append(
-                        {
-                            "wave1": question["wave"],
-                            "var1": question["var_id"],
-                            "question1": question["question_text"],
-                            "concepts1": question["concepts"],
-                            "domain1": question["domain"],
-                            "wave2": match["wave"],
-                            "var2": match["var_id"],
-                            "question2": match["question_text"],
-                            "concepts2": match["concepts"],
-                            "domain2": match["domain"],
-                            "similarity": float(sim),
-                            "phrase_match": phrase_match,
-                            "concept_overlap": concept_overlap,
-                        }
-                    )
+                    matches.append(self._make_match(question, match, sim))
+
+        self._add_concept_overlap(matches)
+        print(f"✓ Generated {len(matches)} potential cross-wave matches")
+        return matches
+
+    def find_matches_blocked(self, top_k=20, max_block_size=100, chunk_size=50000):
+        """
+        Find cross-wave matches scoring only blocked candidate pairs.
+
+        Pairs must share a validation phrase, concept, question text or scale
+        signature key (see candidate_blocking.py); only questions that appear
+        in a surviving pair are encoded, and dense similarity is computed for
+        those pairs alone. As with find_matches(), each question keeps at most
+        top_k cross-wave partners.
+        """
+        print(f"\n{'=' * 60}")
+        print("Finding cross-wave matches (blocked candidates)")
+        print(f"{'=' * 60}")
+
+        questions = self.semantic_questions()
+        blocker = CandidateBlocker(
+            questions, self.validation_phrases, max_block_size=max_block_size
+        )
+        with metrics.timer("stage.blocking", items=len(questions)):
+            pairs = blocker.generate()
+        stats = blocker.stats
+
+        stages = [("cross-wave pairs", stats["cross_wave_pairs"]), ("blocking", len(pairs))]
+
+        pairs = [
+            (i, j)
+            for i, j in pairs
+            if not self._check_target_mismatch(
+                questions[i]["question_text"], questions[j]["question_text"]
+            )
+        ]
+        stages.append(("target mismatch", len(pairs)))
+
+        needed = sorted({i for pair in pairs for i in pair})
+        encoded_count = len(needed)
+        position = {q: row for row, q in enumerate(needed)}
+        texts = [questions[i]["question_text"] for i in needed]
+
+        print(f"Encoding {len(texts)} of {len(questions)} questions...")
+        with metrics.timer("stage.encode", items=len(texts)):
+            embeddings = self.encoder.normalize(self.encode_unique(texts))
+
+        similarities = []
+        with metrics.timer("stage.pair_similarity", items=len(pairs)):
+            for start in range(0, len(pairs), chunk_size):
+                chunk = pairs[start : start + chunk_size]
+                left = [position[i] for i, _ in chunk]
+                right = [position[j] for _, j in chunk]
+                similarities.extend(
+                    self.encoder.pair_similarities(embeddings, left, right).tolist()
+                )
+
+        # Keep each question's top_k partners (a pair survives if either side keeps it)
+        partners = {}
+        for (i, j), sim in zip(pairs, similarities):
+            partners.setdefault(i, []).append((sim, j))
+            partners.setdefault(j, []).append((sim, i))
+        kept = set()
+        for i, scored in partners.items():
+            scored.sort(reverse=True)
+            for sim, j in scored[:top_k]:
+                kept.add((min(i, j), max(i, j)))
+        pair_sim = dict(zip(pairs, similarities))
+        stages.append((f"top {top_k} per question", len(kept)))
+
+        matches = [
+            self._make_match(questions[i], questions[j], pair_sim[(i, j)])
+            for i, j in sorted(kept)
+        ]
+        self._add_concept_overlap(matches)
+
+        print("\n  Pair pruning:")
+        previous = None
+        for name, count in stages:
+            pruned = f"  (-{previous - count:,}, {1 - count / previous:.1%} pruned)" if previous else ""
+            print(f"    {name:24s} {count:>12,}{pruned}")
+            metrics.incr(f"stage.blocking.pairs.{name.replace(' ', '_')}", count)
+            previous = count
+        print(f"    {'questions encoded':24s} {encoded_count:>12,} of {len(questions):,}")
+        print(f"    ({stats['oversized_blocks']} of {stats['blocks']} blocking keys skipped as oversized)")
+
+        self.pruning_stats = {name: count for name, count in stages}
+        self.pruning_stats["questions_encoded"] = encoded_count
+
+        print(f"✓ Generated {len(matches)} potential cross-wave matches")
+        return matches
+
+    def save_state(self, directory, top_k=20):
+        """
+        Persist what add_wave() needs to match a new wave incrementally:
+        questions (with near-duplicate marks), embeddings, the search index,
+        fitted encoder parameters and each question's kept top-k similarities.
+        """
+        if self.neighbor_sims is None:
+            raise ValueError("save_state() needs find_matches() to have run")
+
+        state_dir = Path(directory)
+        state_dir.mkdir(parents=True, exist_ok=True)
+        print(f"\nSaving matcher state to {state_dir}")
+
+        meta = {
+            "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "encoder": self.encoder.config(),
+            "top_k": top_k,
+            "near_dup_threshold": self.near_dup_threshold,
+            "quantization": self.quantization,
+            "waves": sorted({q["wave"] for q in self.questions}),
+            "questions": len(self.questions),
+            "semantic_questions": self.embeddings.shape[0],
+        }
+        with metrics.timer("io.write_state", items=len(self.questions)):
+            with open(state_dir / "meta.json", "w", encoding="utf-8") as f:
+                json.dump(meta, f, indent=2)
+            with open(state_dir / "questions.json", "w", encoding="utf-8") as f:
+                json.dump(self.questions, f)
+            np.save(state_dir / "neighbor_sims.npy", self.neighbor_sims)
+            self.encoder.save(str(state_dir))
+            self.encoder.save_embeddings(self.embeddings, str(state_dir))
+            if isinstance(self.index, QuantizedIndex):
+                self.index.save(state_dir / "index_quantized.npz")
+            else:
+                self.encoder.save_index(self.index, str(state_dir))
+
+        print(f"  ✓ Saved {len(self.questions):,} questions ({', '.join(meta['waves'])})")
+
+    @classmethod
+    def load_state(cls, directory):
+        """Rebuild a matcher from save_state() output."""
+        state_dir = Path(directory)
+        print(f"\nLoading matcher state from {state_dir}")
+
+        with metrics.timer("io.read_state"):
+            with open(state_dir / "meta.json", "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            encoder = encoder_from_config(meta["encoder"]).load(str(state_dir))
+
+            matcher = cls(encoder=encoder, quantization=meta.get("quantization", "float32"))
+            with open(state_dir / "questions.json", "r", encoding="utf-8") as f:
+                matcher.questions = json.load(f)
+            matcher.neighbor_sims = np.load(state_dir / "neighbor_sims.npy")
+            matcher.embeddings = encoder.load_embeddings(str(state_dir))
+            if matcher.quantization != "float32":
+                matcher.index = load_quantized_index(state_dir / "index_quantized.npz")
+            else:
+                matcher.index = encoder.load_index(str(state_dir), matcher.embeddings)
+            matcher.near_dup_threshold = meta.get("near_dup_threshold")
+
+        print(f"  ✓ Loaded {len(matcher.questions):,} questions ({', '.join(meta['waves'])})")
+        return matcher, meta
+
+    def add_wave(self, wave_name, filepath, top_k=20):
+        """
+        Match a new wave against the saved state without re-running old pairs.
+
+        Only new-vs-existing similarities are computed (O(new x existing)):
+        - each new question keeps its top_k neighbours, as in find_matches()
+        - an existing question gains a new neighbour only when it beats the
+          k-th similarity it kept before, so the result equals what a full
+          run would add for pairs involving the new wave
+        Existing matches between old questions are left as they are.
+        Returns the new candidate matches.
+        """
+        if any(q["wave"] == wave_name for q in self.questions):
+            raise ValueError(f"{wave_name} is already in the matcher state")
+
+        old_count = len(self.questions)
+        old_semantic = self.semantic_questions()
+        if not self.load_crosswalk(wave_name, filepath):
+            return []
+
+        matches = []
+        if self.near_dup_threshold is not None:
+            matches = self.find_near_duplicates(self.near_dup_threshold, new_from=old_count)
+
+        new_questions = [q for q in self.questions[old_count:] if "near_duplicate_of" not in q]
+        print(f"\n{'=' * 60}")
+        print(f"Matching {len(new_questions):,} new questions against {len(old_semantic):,}")
+        print(f"{'=' * 60}")
+
+        if not new_questions:
+            return matches
+
+        with metrics.timer("stage.encode", items=len(new_questions)):
+            new_embeddings = self.encoder.normalize(
+                self.encode_unique([q["question_text"] for q in new_questions])
+            )
+
+        with metrics.timer("stage.pair_similarity", items=len(new_questions) * len(old_semantic)):
+            old_sims = self.encoder.similarity_matrix(new_embeddings, self.embeddings)
+
+        candidates = []
+        # New questions: top_k over old + new (new ones share the wave, so never match)
+        new_sims = self.encoder.similarity_matrix(new_embeddings, new_embeddings)
+        np.fill_diagonal(new_sims, -np.inf)
+        combined = np.hstack([old_sims, new_sims])
+        k = min(top_k, combined.shape[1])
+        top = np.argsort(-combined, axis=1, kind="stable")[:, :k]
+        new_neighbor_sims = np.full((len(new_questions), top_k), -np.inf, dtype=np.float32)
+        new_neighbor_sims[:, :k] = np.take_along_axis(combined, top, axis=1)
+        for row, question in enumerate(new_questions):
+            for col in top[row]:
+                if col < len(old_semantic):
+                    candidates.append((question, old_semantic[col], combined[row, col]))
+
+        # Existing questions: admit new neighbours that beat the kept k-th similarity
+        updated = 0
+        for col in np.nonzero((old_sims > self.neighbor_sims[:, -1]).any(axis=0))[0]:
+            beating = np.nonzero(old_sims[:, col] > self.neighbor_sims[col, -1])[0]
+            merged = np.concatenate([self.neighbor_sims[col], old_sims[beating, col]])
+            self.neighbor_sims[col] = np.sort(merged)[::-1][:top_k]
+            for row in beating:
+                if old_sims[row, col] >= self.neighbor_sims[col, -1]:
+                    candidates.append((old_semantic[col], new_questions[row], old_sims[row, col]))
+            updated += 1
+
+        semantic_matches = [
+            self._make_match(question, match, sim)
+            for question, match, sim in candidates
+            if not self._check_target_mismatch(question["question_text"], match["question_text"])
+        ]
+        self._add_concept_overlap(semantic_matches)
+        matches.extend(semantic_matches)
+
+        if isinstance(self.index, QuantizedIndex):
+            self.index.add(new_embeddings)
+        else:
+            self.index = self.encoder.add_to_index(self.index, self.embeddings, new_embeddings)
+        if hasattr(self.embeddings, "tocsr"):
+            from scipy import sparse
+
+            self.embeddings = sparse.vstack([self.embeddings, new_embeddings]).tocsr()
+        else:
+            self.embeddings = np.vstack([self.embeddings, new_embeddings])
+        self.neighbor_sims = np.vstack([self.neighbor_sims, new_neighbor_sims])
 
+        metrics.incr("stage.add_wave.pairs_scored", len(new_questions) * len(old_semantic))
+        metrics.incr("stage.add_wave.updated_neighbor_lists", updated)
+        print(f"  ✓ {len(new_questions) * len(old_semantic):,} new-vs-existing pairs scored")
+        print(f"  ✓ {updated:,} existing questions gained new neighbours")
         print(f"✓ Generated {len(matches)} potential cross-wave matches")
         return matches
 
+    def _make_match(self, question, match, sim):
+        """Build the match record for a candidate pair (concept_overlap is filled by _add_concept_overlap)."""
+        return {
+            "wave1": question["wave"],
+            "var1": question["var_id"],
+            "question1": question["question_text"],
+            "concepts1": question["concepts"],
+            "domain1": question["domain"],
+            "wave2": match["wave"],
+            "var2": match["var_id"],
+            "question2": match["question_text"],
+            "concepts2": match["concepts"],
+            "domain2": match["domain"],
+            "similarity": float(sim),
+            "phrase_match": self._check_phrase_match(
+                question["wave"], question["var_id"], match["wave"], match["var_id"]
+            ),
+            "concept_overlap": 0.0,
+        }
+
+    def _add_concept_overlap(self, matches):
+        """Fill concept_overlap for all matches with one sparse matrix product."""
+        if self.concept_matrix is None or len(self.concept_matrix) != len(self.questions):
+            self.concept_matrix = ConceptMatrix(self.questions)
+
+        rows = self.concept_matrix.rows
+        left = [rows[(m["wave1"], m["var1"])] for m in matches]
+        right = [rows[(m["wave2"], m["var2"])] for m in matches]
+        with metrics.timer("stage.concept_overlap", items=len(matches)):
+            overlaps = self.concept_matrix.pair_overlap(left, right)
+        for match, overlap in zip(matches, overlaps.tolist()):
+            match["concept_overlap"] = overlap
+
     def _check_phrase_match(self, wave1, var1, wave2, var2):
         """Check if validation phrases match."""
         key1 = f"{wave1}_{var1}"
@@ -181,20 +577,6 @@ class QuestionMatcher:
 
         return False
 
-    def _check_concept_overlap(self, concepts1, concepts2):
-        """Check overlap between concept lists."""
-        if not concepts1 or not concepts2:
-            return 0.0
-
-        set1 = {c.lower() for c in concepts1}
-        set2 = {c.lower() for c in concepts2}
-
-        if not set1 or not set2:
-            return 0.0
-
-        overlap = len(set1 & set2) / max(len(set1), len(set2))
-        return overlap
-
     def _check_target_mismatch(self, text1, text2):
         """Check if questions target different subjects (e.g., relatives vs neighbors).
 
@@ -269,7 +651,7 @@ class QuestionMatcher:
 
         for match in matches:
             sim = match["similarity"]
-            if sim >= 0.85:
+            if match.get("match_method") == "near_duplicate" or sim >= 0.85:
                 auto_accept.append(match)
             elif sim >= 0.75:
                 manual_review.append(match)
@@ -534,11 +916,73 @@ def export_all_matches_json(categorized, output_path):
 
 def main():
     """Main execution for full corpus."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Cross-wave semantic question matching")
+    parser.add_argument(
+        "--encoder",
+        choices=ENCODERS,
+        default="transformer",
+        help="transformer (all-MiniLM-L6-v2) or tfidf (offline hashed TF-IDF)",
+    )
+    parser.add_argument("--output-dir", default="matching_results")
+    parser.add_argument(
+        "--near-duplicates",
+        action="store_true",
+        help="Auto-accept MinHash/LSH near-duplicates and skip them in the semantic pass",
+    )
+    parser.add_argument("--near-dup-threshold", type=float, default=0.8)
+    parser.add_argument(
+        "--blocking",
+        action="store_true",
+        help="Score only candidate pairs that share a phrase/concept/text/scale key",
+    )
+    parser.add_argument(
+        "--parallel-encode",
+        action="store_true",
+        help="Encode length-bucketed batches on a pool of CPU worker processes",
+    )
+    parser.add_argument(
+        "--encode-workers", type=int, default=0, help="Worker processes (default: all cores)"
+    )
+    parser.add_argument("--encode-batch-size", type=int, default=32)
+    parser.add_argument(
+        "--compose-stems",
+        choices=COMPOSITIONS,
+        help="Encode shared battery stems and items once and compose item embeddings",
+    )
+    parser.add_argument(
+        "--stem-weight", type=float, default=0.5, help="Stem weight for --compose-stems weighted"
+    )
+    parser.add_argument(
+        "--quantization",
+        choices=QUANTIZATIONS,
+        default="float32",
+        help="Store dense embeddings in the index as float16, int8 or PQ codes",
+    )
+    parser.add_argument(
+        "--save-state",
+        metavar="DIR",
+        help="Persist embeddings/index/neighbour lists so add_wave.py can add waves incrementally",
+    )
+    args = parser.parse_args()
+
+    if args.save_state and args.blocking:
+        parser.error("--save-state needs the full index search (drop --blocking)")
+    if args.quantization != "float32" and args.encoder == "tfidf":
+        parser.error("--quantization applies to dense (transformer) embeddings only")
+
     print("\n" + "=" * 60)
     print("Asian Barometer Semantic Question Matcher - FULL CORPUS")
     print("=" * 60)
 
-    matcher = QuestionMatcher()
+    encoder = make_encoder(args.encoder)
+    if args.parallel_encode:
+        encoder = ParallelEncoder(encoder, args.encode_workers, args.encode_batch_size)
+        print(f"Parallel encoding: {encoder.workers} workers, batch size {encoder.batch_size}")
+    if args.compose_stems:
+        encoder = StemComposingEncoder(encoder, args.compose_stems, args.stem_weight)
+    matcher = QuestionMatcher(encoder=encoder, quantization=args.quantization)
     matcher.load_validation_phrases()
 
     waves = ["W1", "W2", "W3", "W4", "W5", "W6_Cambodia"]
@@ -557,11 +1001,26 @@ def main():
         print("✗ No questions loaded. Exiting.")
         return
 
-    matcher.build_embeddings()
-    matcher.build_faiss_index()
-
-    all_matches = matcher.find_matches(top_k=20)
-    categorized = matcher.categorize_matches(all_matches)
+    near_duplicate_matches = []
+    if args.near_duplicates:
+        near_duplicate_matches = matcher.find_near_duplicates(args.near_dup_threshold)
+
+    semantic_count = len(matcher.semantic_questions())
+    if args.blocking:
+        with metrics.timer("stage.find_matches", items=semantic_count):
+            all_matches = matcher.find_matches_blocked(top_k=20)
+    else:
+        matcher.build_embeddings()
+        matcher.build_faiss_index()
+
+        with metrics.timer("stage.find_matches", items=semantic_count):
+            all_matches = matcher.find_matches(top_k=20)
+    all_matches = near_duplicate_matches + all_matches
+    if args.save_state:
+        matcher.save_state(args.save_state, top_k=20)
+    metrics.incr("stage.find_matches.matches", len(all_matches))
+    with metrics.timer("stage.categorize_matches", items=len(all_matches)):
+        categorized = matcher.categorize_matches(all_matches)
 
     print(f"\n{'=' * 60}")
     print("FULL CORPUS Results")
@@ -570,8 +1029,8 @@ def main():
     print(f"  Manual review (0.75-0.85): {len(categorized['manual_review']):,} pairs")
     print(f"  Low confidence (<0.75): {len(categorized['low_confidence']):,} pairs")
 
-    output_dir = Path("matching_results")
-    output_dir.mkdir(exist_ok=True)
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
 
     detailed_path = output_dir / "question_matches_detailed.md"
     summary_path = output_dir / "question_matches_summary.md"
@@ -581,7 +1040,8 @@ def main():
 
     # Export all matches to JSON for clustering
     json_path = output_dir / "all_matches.json"
-    export_all_matches_json(categorized, json_path)
+    with metrics.timer("io.write_json"):
+        export_all_matches_json(categorized, json_path)
 
     print(f"\n{'=' * 60}")
     print("✓ COMPLETE! Full corpus analysis finished:")
@@ -590,6 +1050,9 @@ def main():
     print(f"  - JSON (all matches): {json_path}")
     print(f"{'=' * 60}\n")
 
+    metrics.print_summary()
+    metrics.emit("semantic_matcher")
+
 
 if __name__ == "__main__":
     main()
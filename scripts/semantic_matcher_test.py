@@ -8,8 +8,6 @@ Runs on small subset for validation before full corpus processing.
 import json
 from pathlib import Path
 from datetime import datetime
-from sentence_transformers import SentenceTransformer
-import faiss
 
 
 class QuestionMatcher:
@@ -18,6 +16,8 @@ class QuestionMatcher:
     def __init__(self, model_name="all-MiniLM-L6-v2", test_mode=True, test_limit=20):
         """Initialize with sentence transformer model."""
         print(f"Loading sentence transformer model: {model_name}")
+        from sentence_transformers import SentenceTransformer
+
         self.model = SentenceTransformer(model_name)
         self.questions = []
         self.embeddings = None
@@ -109,6 +109,8 @@ class QuestionMatcher:
 
     def build_faiss_index(self):
         """Build FAISS index for fast similarity search."""
+        import faiss
+
         print("\nBuilding FAISS index...")
 
         # Normalize embeddings for cosine similarity
@@ -15,8 +15,6 @@ import json
 from pathlib import Path
 from collections import defaultdict
 from datetime import datetime
-from sentence_transformers import SentenceTransformer
-import faiss
 
 
 class QuestionMatcher:
@@ -25,6 +23,8 @@ class QuestionMatcher:
     def __init__(self, model_name="all-MiniLM-L6-v2"):
         """Initialize with sentence transformer model."""
         print(f"Loading sentence transformer model: {model_name}")
+        from sentence_transformers import SentenceTransformer
+
         self.model = SentenceTransformer(model_name)
         self.questions = []  # List of (wave, var_id, question_text, concepts)
         self.embeddings = None
@@ -95,6 +95,8 @@ class QuestionMatcher:
 
     def build_faiss_index(self):
         """Build FAISS index for fast similarity search."""
+        import faiss
+
         print("\nBuilding FAISS index...")
 
         # Normalize embeddings for cosine similarity
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Stem-aware embedding composition.
+
+AtomicJSONGenerator.generate_for_group() rebuilds battery items as
+"<stem> <item>", so a 20-item battery repeats the same long stem 20 times
+and the encoder re-processes it for every item. StemComposingEncoder
+detects shared stems, encodes each distinct stem and each distinct item
+once, and composes the item embedding from the two vectors:
+
+- length:   weights proportional to the word counts of stem and item. With
+            mean pooling (all-MiniLM-L6-v2) the pooled vector of the full
+            text is the length-weighted mean of the segment token vectors,
+            so this is the closest approximation to encoding the full text
+- weighted: fixed stem weight (e.g. 0.3 to favour the item wording)
+
+The composed vector is re-normalised. Texts without a shared stem are
+encoded whole, as before.
+"""
+
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+COMPOSITIONS = ("length", "weighted")
+
+# A stem ends at a sentence boundary: "?" / "." / ":" followed by whitespace
+_BOUNDARY = re.compile(r"[?.:](?=\s)")
+
+
+def _prefixes(text: str) -> List[Tuple[str, str]]:
+    """(prefix, remainder) split at every sentence boundary of the text."""
+    splits = []
+    for match in _BOUNDARY.finditer(text):
+        prefix, rest = text[: match.end()].strip(), text[match.end() :].strip()
+        if prefix and rest:
+            splits.append((prefix, rest))
+    return splits
+
+
+def find_shared_stems(
+    texts: List[str], min_items: int = 3, min_words: int = 5
+) -> List[Optional[Tuple[str, str]]]:
+    """
+    Split texts into (stem, item) where the stem is a sentence prefix shared
+    by at least min_items texts. Returns None for texts without one; for
+    texts with several shared prefixes the longest is used.
+    """
+    counts = Counter(
+        prefix
+        for text in set(texts)
+        for prefix, _ in _prefixes(text)
+        if len(prefix.split()) >= min_words
+    )
+
+    splits = []
+    for text in texts:
+        best = None
+        for prefix, rest in _prefixes(text):
+            if counts.get(prefix, 0) >= min_items and (best is None or len(prefix) > len(best[0])):
+                best = (prefix, rest)
+        splits.append(best)
+    return splits
+
+
+class StemComposingEncoder:
+    """Encode shared stems and items once and compose item embeddings."""
+
+    def __init__(self, encoder, composition: str = "length", stem_weight: float = 0.5,
+                 min_items: int = 3):
+        if composition not in COMPOSITIONS:
+            raise ValueError(
+                f"Unknown composition '{composition}' (expected one of {', '.join(COMPOSITIONS)})"
+            )
+        self.encoder = encoder
+        self.composition = composition
+        self.stem_weight = stem_weight
+        self.min_items = min_items
+        self.name = encoder.name
+        self.stats: Dict[str, int] = {}
+
+    def __getattr__(self, attr):
+        if attr == "encoder":
+            raise AttributeError(attr)
+        return getattr(self.encoder, attr)
+
+    def config(self) -> Dict:
+        return {
+            **self.encoder.config(),
+            "compose_stems": self.composition,
+            "stem_weight": self.stem_weight,
+        }
+
+    def load(self, directory: str):
+        self.encoder.load(directory)
+        return self
+
+    def _weights(self, stem: str, item: str) -> Tuple[float, float]:
+        if self.composition == "length":
+            stem_words, item_words = len(stem.split()), len(item.split())
+            total = stem_words + item_words
+            return stem_words / total, item_words / total
+        return self.stem_weight, 1 - self.stem_weight
+
+    def encode(self, texts: List[str]):
+        splits = find_shared_stems(texts, min_items=self.min_items)
+
+        # Every distinct segment (stem, item or whole text) is encoded once
+        segments = {}
+        for text, split in zip(texts, splits):
+            for segment in split if split else (text,):
+                segments.setdefault(segment, len(segments))
+        segment_list = list(segments)
+        segment_embeddings = self.encoder.normalize(self.encoder.encode(segment_list))
+
+        stem_weights = np.ones(len(texts), dtype=np.float32)
+        item_weights = np.zeros(len(texts), dtype=np.float32)
+        stem_rows = np.empty(len(texts), dtype=np.int64)
+        item_rows = np.empty(len(texts), dtype=np.int64)
+        for i, (text, split) in enumerate(zip(texts, splits)):
+            if split:
+                stem, item = split
+                stem_rows[i], item_rows[i] = segments[stem], segments[item]
+                stem_weights[i], item_weights[i] = self._weights(stem, item)
+            else:
+                stem_rows[i] = item_rows[i] = segments[text]
+
+        composed = self._combine(segment_embeddings, stem_rows, item_rows, stem_weights, item_weights)
+
+        full_words = sum(len(t.split()) for t in texts)
+        encoded_words = sum(len(s.split()) for s in segment_list)
+        self.stats = {
+            "texts": len(texts),
+            "stemmed_texts": sum(1 for s in splits if s),
+            "distinct_stems": len({s[0] for s in splits if s}),
+            "encoded_segments": len(segment_list),
+            "words_full": full_words,
+            "words_encoded": encoded_words,
+        }
+        return composed
+
+    def _combine(self, embeddings, stem_rows, item_rows, stem_weights, item_weights):
+        if hasattr(embeddings, "tocsr"):
+            from scipy import sparse
+
+            combined = (
+                sparse.diags(stem_weights) @ embeddings[stem_rows]
+                + sparse.diags(item_weights) @ embeddings[item_rows]
+            )
+            norms = np.sqrt(np.asarray(combined.multiply(combined).sum(axis=1)).ravel())
+            norms[norms == 0] = 1
+            return (sparse.diags(1 / norms) @ combined).tocsr()
+
+        combined = (
+            stem_weights[:, None] * embeddings[stem_rows]
+            + item_weights[:, None] * embeddings[item_rows]
+        )
+        return self.encoder.normalize(combined)
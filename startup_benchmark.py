@@ -0,0 +1,163 @@
+"""
+Startup-time benchmark for the abs-llm-nlp subcommands
+
+For each subcommand, runs a fresh interpreter under `python -X importtime`
+that imports the CLI and the subcommand's module (exactly what happens
+before the stage starts doing work) and reports:
+- wall time of the interpreter run (median of --repeat runs)
+- total import time and the heaviest top-level imports
+- which heavy optional dependencies got imported
+
+Usage:
+    abs-llm-nlp startup-bench
+    python startup_benchmark.py --repeat 5 --top 3
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from datetime import datetime
+from typing import Dict, List
+
+from cli import COMMANDS, SCRIPTS_DIR
+
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_FILE = os.path.join("benchmark_results", "startup_latest.json")
+
+HEAVY_MODULES = (
+    "groq",
+    "huggingface_hub",
+    "sentence_transformers",
+    "torch",
+    "faiss",
+    "pandas",
+    "numpy",
+)
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """Parse `-X importtime` output into top-level import entries"""
+    entries = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        entries.append(
+            {
+                "module": name,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+                "top_level": len(indent) <= 1,
+            }
+        )
+    return entries
+
+
+def measure(code: str, repeat: int) -> Dict:
+    """Run `python -X importtime -c code` repeat times; keep the last profile"""
+    walls = []
+    stderr = ""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=ROOT_DIR,
+            capture_output=True,
+            text=True,
+        )
+        walls.append(time.perf_counter() - start)
+        stderr = result.stderr
+        if result.returncode != 0:
+            error = stderr.strip().splitlines()[-1] if stderr.strip() else "failed"
+            return {"ok": False, "error": error, "wall_s": statistics.median(walls)}
+
+    entries = parse_importtime(stderr)
+    top_level = [e for e in entries if e["top_level"]]
+    imported = {e["module"].split(".")[0] for e in entries}
+    return {
+        "ok": True,
+        "wall_s": statistics.median(walls),
+        "import_ms": sum(e["cumulative_ms"] for e in top_level),
+        "heaviest": sorted(top_level, key=lambda e: e["cumulative_ms"], reverse=True),
+        "heavy_modules": [m for m in HEAVY_MODULES if m in imported],
+    }
+
+
+def subcommand_code(module: str) -> str:
+    return (
+        f"import sys; sys.path[:0] = [{ROOT_DIR!r}, {SCRIPTS_DIR!r}]; "
+        f"import cli; cli.load_module({module!r})"
+    )
+
+
+def run_startup_benchmark(repeat: int = 3, top: int = 3) -> Dict:
+    results = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "interpreter": measure("pass", repeat),
+        "cli": measure(f"import sys; sys.path.insert(0, {ROOT_DIR!r}); import cli", repeat),
+        "commands": {},
+    }
+
+    baseline_s = results["interpreter"]["wall_s"]
+    print(f"  {'bare interpreter':18s} {baseline_s * 1000:8.1f} ms")
+    print(f"  {'cli (no command)':18s} {results['cli']['wall_s'] * 1000:8.1f} ms")
+    print()
+
+    for command, (module, _) in COMMANDS.items():
+        result = measure(subcommand_code(module), repeat)
+        results["commands"][command] = result
+
+        if not result["ok"]:
+            print(f"  {command:18s} ❌ {result['error']}")
+            continue
+
+        heaviest = ", ".join(
+            f"{e['module']} {e['cumulative_ms']:.0f}ms" for e in result["heaviest"][:top]
+        )
+        heavy = f"  [heavy: {', '.join(result['heavy_modules'])}]" if result["heavy_modules"] else ""
+        print(
+            f"  {command:18s} {result['wall_s'] * 1000:8.1f} ms"
+            f"  (imports {result['import_ms']:.0f} ms: {heaviest}){heavy}"
+        )
+
+    for result in results["commands"].values():
+        if result["ok"]:
+            result["heaviest"] = result["heaviest"][:top]
+    for key in ("interpreter", "cli"):
+        results[key].pop("heaviest", None)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure subcommand startup time")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=3, help="Heaviest imports to show")
+    parser.add_argument("--output", default=RESULTS_FILE)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("SUBCOMMAND STARTUP TIME (python -X importtime)")
+    print("=" * 60)
+
+    results = run_startup_benchmark(args.repeat, args.top)
+
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""
+Synthetic Asian Barometer codebook generator
+
+Emits labels.txt files in the same format as W*_labels.txt so that every
+pipeline stage (parsing, scale guessing, validation phrases, matching,
+clustering) can be stress-tested at 1x, 10x and 100x the size of a real wave.
+
+Generated codebooks contain:
+- Stem questions followed by short item batteries (shared value labels)
+- Standalone questions with Likert (3-6 point), 10-point, binary,
+  ordinal and categorical scales, including reversed (positive-first) scales
+- Asian Barometer NA codes: -1, 7/8/9 for short scales, 97/98/99 for long ones
+- Interviewer (ir*) and socio-economic (se*) blocks
+
+Usage:
+    python synthetic_codebook.py                      # 1x, 10x, 100x into synthetic/
+    python synthetic_codebook.py --scale 10 --seed 3  # single 10x file
+"""
+
+import os
+import random
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+
+# Approximate size of one real wave (W5: ~300 variables, ~6,700 lines)
+BASE_VARIABLES = 300
+
+NA_SHORT = [(-1, "Missing"), (7, "Do not understand the question"), (8, "Can't choose"), (9, "Decline to answer")]
+NA_LONG = [(-1, "Missing"), (97, "Do not understand the question"), (98, "Can't choose"), (99, "Decline to answer")]
+NA_MISSING_ONLY = [(-1, "Missing")]
+
+# name -> (substantive labels in value order, NA codes)
+SCALES: Dict[str, Tuple[List[str], List[Tuple[int, str]]]] = {
+    "agree_4": (["Strongly agree", "Somewhat agree", "Somewhat disagree", "Strongly disagree"], NA_SHORT),
+    "disagree_4": (["Strongly disagree", "Somewhat disagree", "Somewhat agree", "Strongly agree"], NA_SHORT),
+    "trust_4": (["A great deal of trust", "Quite a lot of trust", "Not very much trust", "None at all"], NA_SHORT),
+    "trust_6": (["Trust fully", "Trust a lot", "Trust somewhat", "Distrust somewhat", "Distrust a lot", "Distrust fully"], NA_LONG),
+    "satisfied_4": (["Very satisfied", "Fairly satisfied", "Not very satisfied", "Not at all satisfied"], NA_SHORT),
+    "good_5": (["Very good", "Good", "So so (not good nor bad)", "Bad", "Very bad"], NA_SHORT),
+    "easy_4": (["Very difficult", "Difficult", "Easy", "Very easy"], NA_SHORT),
+    "often_3": (["Often", "Occasionally", "Never"], NA_SHORT),
+    "interest_4": (["Very interested", "Somewhat interested", "Not very interested", "Not at all interested"], NA_SHORT),
+    "yes_no": (["Yes", "No"], NA_SHORT),
+    "scale_10": ([f"{i}" for i in range(1, 11)], NA_LONG),
+}
+
+BATTERY_SCALES = ["trust_6", "trust_4", "agree_4", "disagree_4", "satisfied_4", "easy_4", "often_3"]
+STANDALONE_SCALES = ["agree_4", "disagree_4", "good_5", "satisfied_4", "interest_4", "yes_no", "scale_10", "often_3"]
+
+INSTITUTIONS = [
+    "The courts", "The national government", "Political parties", "Parliament",
+    "Civil service", "The military", "The police", "Local government",
+    "Newspapers", "Television", "The election commission", "Non-governmental organizations",
+    "The president", "The prime minister", "Religious leaders", "Labor unions",
+    "Private companies", "Universities", "Hospitals", "Public schools",
+]
+SERVICES = [
+    "An identity document (such as a birth certificate or passport)",
+    "A place in a public primary school for a child",
+    "Medical treatment at a nearby clinic",
+    "Help from the police when you need it",
+    "A building permit for your house",
+    "Access to clean drinking water",
+    "A business license from the local office",
+    "Unemployment or welfare benefits",
+]
+ACTIVITIES = [
+    "Contacted a government official", "Attended a campaign meeting or rally",
+    "Signed a petition", "Joined a demonstration or protest march",
+    "Used the internet to express political opinions", "Donated money to a charity",
+    "Contacted a traditional or religious leader", "Worked with others to solve a local problem",
+]
+TOPICS = [
+    "the economic condition of our country", "your family's economic situation",
+    "the level of corruption in the national government", "the quality of democracy",
+    "freedom of speech", "the fairness of the last national election",
+    "income inequality", "the influence of China on our country",
+    "the influence of the United States on our country", "public safety in your neighborhood",
+    "the quality of public health care", "the education system",
+    "environmental protection", "the treatment of ethnic minorities",
+    "access to information on the internet", "the independence of the courts",
+]
+FRAMES = [
+    "How would you rate {topic} today?",
+    "How satisfied are you with {topic}?",
+    "Compared with five years ago, how would you describe {topic}?",
+    "What do you think will be the state of {topic} in five years' time?",
+    "In your opinion, how important is {topic} for the future of our country?",
+    "How much attention do you pay to news about {topic}?",
+]
+STATEMENTS = [
+    "Government leaders are like the head of a family; we should all follow their decisions",
+    "The government should decide whether certain ideas should be allowed to be discussed in society",
+    "Harmony of the community will be disrupted if people organize lots of groups",
+    "When judges decide important cases, they should accept the view of the executive branch",
+    "If the government is constantly checked by the legislature, it cannot possibly accomplish great things",
+    "Women should not be involved in politics as much as men",
+    "People with little or no education should have as much say in politics as highly-educated people",
+    "Democracy may have its problems, but it is still the best form of government",
+    "Our political system should be made more democratic",
+    "Most people are generally honest and can be trusted",
+]
+STEMS = {
+    "trust_6": "I'm going to name a number of institutions. For each one, please tell me how much trust do you have in them?",
+    "trust_4": "How much trust do you have in each of the following types of people or institutions?",
+    "agree_4": "Please tell me how much you agree or disagree with each of the following statements?",
+    "disagree_4": "Do you agree or disagree with the following statements about politics and society?",
+    "satisfied_4": "How satisfied or dissatisfied are you with each of the following aspects of your life?",
+    "easy_4": "Based on your experience, how easy or difficult is it to obtain the following services? Or have you never tried to get these services from government?",
+    "often_3": "Here is a list of actions that people sometimes take as citizens. For each of these, please tell me whether you, personally, have done any of these things during the past three years?",
+}
+BATTERY_ITEMS = {
+    "trust_6": INSTITUTIONS,
+    "trust_4": INSTITUTIONS,
+    "agree_4": STATEMENTS,
+    "disagree_4": STATEMENTS,
+    "satisfied_4": ["Your housing", "Your friendships", "Your marriage", "Your standard of living",
+                    "Your household income", "Your health", "Your education", "Your job",
+                    "Your neighbors", "Public safety", "The condition of the environment",
+                    "The social welfare system", "The democratic system", "Your family life"],
+    "easy_4": SERVICES,
+    "often_3": ACTIVITIES,
+}
+QUALIFIERS = ["", " in your local area", " in the capital city", " at the national level",
+              " in rural areas", " among young people", " in your province"]
+
+CATEGORICAL = {
+    "Country code": ["Japan", "Hong Kong", "Korea", "Mainland China", "Mongolia", "Philippines",
+                     "Taiwan", "Thailand", "Indonesia", "Singapore", "Vietnam", "Cambodia",
+                     "Malaysia", "Myanmar", "Australia", "India"],
+    "Religion": ["Roman Catholic", "Protestant", "Islam", "Buddhism", "Hinduism", "Taoism",
+                 "Confucianism", "Ancestor worship", "Animism", "Atheist", "Other"],
+    "Main occupation": ["Farmer", "Fisherman", "Professional", "Manager", "Clerk",
+                        "Sales worker", "Service worker", "Skilled manual worker",
+                        "Unskilled worker", "Armed forces", "Student", "Homemaker",
+                        "Retired", "Unemployed"],
+    "Ethnicity": ["Majority group", "Chinese", "Malay", "Indian", "Khmer", "Vietnamese",
+                  "Thai", "Lao", "Hmong", "Other"],
+}
+ORDINAL = {
+    "Education level": ["No formal education", "Incomplete primary", "Complete primary",
+                        "Incomplete secondary", "Complete secondary", "Some university",
+                        "University degree", "Post-graduate degree"],
+    "Household income quintile": ["Lowest", "Second", "Middle", "Fourth", "Highest"],
+    "Age group": ["18-24", "25-34", "35-44", "45-54", "55-64", "65 and over"],
+}
+INTERVIEWER = [
+    ("Was the interview conducted with the assistance of an interpreter?", "yes_no"),
+    ("Was anyone else present during the interview?", "yes_no"),
+    ("Did the respondent appear to understand the questions?", "often_3"),
+    ("Tell us whether the interviewee's residence has electricity", "yes_no"),
+    ("Tell us whether the interviewee's residence has public water supply", "yes_no"),
+]
+
+
+class SyntheticCodebookGenerator:
+    """Generate Asian Barometer-style labels files at a configurable scale"""
+
+    def __init__(self, scale: float = 1.0, seed: int = 0, wave_name: str = "SYN"):
+        self.scale = scale
+        self.rng = random.Random(seed)
+        self.wave_name = wave_name
+        self.target_variables = max(1, int(round(BASE_VARIABLES * scale)))
+        self.blocks: List[str] = []
+        self.q_counter = 0
+
+    def _value_labels(self, scale_name: str) -> List[Tuple[int, str]]:
+        labels, na_codes = SCALES[scale_name]
+        values = [(i + 1, label) for i, label in enumerate(labels)]
+        # Some releases drop -1 or use only a subset of NA codes
+        na = [code for code in na_codes if self.rng.random() > 0.15] or na_codes[:1]
+        return sorted(na[:1] + values + na[1:], key=lambda x: x[0])
+
+    def _labels_for(self, categories: List[str], long_na: bool) -> List[Tuple[int, str]]:
+        na = NA_LONG if long_na else NA_MISSING_ONLY
+        values = [(i + 1, c) for i, c in enumerate(categories)]
+        return sorted(values + na, key=lambda x: x[0])
+
+    def _next_qid(self) -> Tuple[str, str]:
+        """Return (variable_id, question number prefix) in one of the real styles"""
+        self.q_counter += 1
+        n = self.q_counter
+        prefix = f"q{n}. " if self.rng.random() < 0.6 else f"{n} "
+        return f"q{n}", prefix
+
+    def _add(self, var_id: str, question: str, labels: List[Tuple[int, str]]):
+        lines = [f"Variable: {var_id} ", f"  Question: {question} ", "  Value Labels:"]
+        lines.extend(f"     {value} = {label} " for value, label in labels)
+        lines.append("")
+        self.blocks.append("\n".join(lines))
+
+    def _qualified(self, text: str, round_no: int) -> str:
+        """Vary text on later passes so scaled codebooks are not pure repeats"""
+        if round_no == 0:
+            return text
+        qualifier = QUALIFIERS[round_no % len(QUALIFIERS)]
+        if round_no >= len(QUALIFIERS) or not qualifier:
+            qualifier += f" (version {round_no // len(QUALIFIERS) + 1})"
+        if text.endswith("?"):
+            return text[:-1] + qualifier + "?"
+        return text + qualifier
+
+    def _add_battery(self, scale_name: str, round_no: int):
+        items = BATTERY_ITEMS[scale_name]
+        count = self.rng.randint(3, min(len(items), 10))
+        chosen = self.rng.sample(items, count)
+        labels = self._value_labels(scale_name)
+        stem = self._qualified(STEMS[scale_name], round_no)
+
+        for i, item in enumerate(chosen):
+            var_id, prefix = self._next_qid()
+            text = f"{prefix}{stem}  {item}" if i == 0 else f"{prefix}{item}"
+            self._add(var_id, text, labels)
+
+    def _add_standalone(self, round_no: int):
+        scale_name = self.rng.choice(STANDALONE_SCALES)
+        if scale_name in ("agree_4", "disagree_4"):
+            text = self.rng.choice(STATEMENTS)
+        else:
+            text = self.rng.choice(FRAMES).format(topic=self.rng.choice(TOPICS))
+        var_id, prefix = self._next_qid()
+        self._add(var_id, prefix + self._qualified(text, round_no), self._value_labels(scale_name))
+
+    def _add_background(self, round_no: int):
+        suffix = "" if round_no == 0 else f"_{round_no}"
+        for i, (text, scale_name) in enumerate(INTERVIEWER, 1):
+            self._add(f"ir{i:03d}{suffix}", self._qualified(text, round_no), self._value_labels(scale_name))
+        for i, (text, categories) in enumerate(list(CATEGORICAL.items()) + list(ORDINAL.items()), 1):
+            self._add(f"se{i:03d}{suffix}", self._qualified(text, round_no), self._labels_for(categories, long_na=i % 2 == 0))
+
+    def generate(self) -> str:
+        """Generate the full labels.txt content"""
+        self.blocks = []
+        self.q_counter = 0
+        round_no = 0
+
+        while len(self.blocks) < self.target_variables:
+            # Each round mimics one questionnaire: background block, then a
+            # mix of batteries and standalone items
+            self._add_background(round_no)
+            round_target = min(self.target_variables, len(self.blocks) + BASE_VARIABLES)
+            while len(self.blocks) < round_target:
+                if self.rng.random() < 0.45:
+                    self._add_battery(self.rng.choice(BATTERY_SCALES), round_no)
+                else:
+                    self._add_standalone(round_no)
+            round_no += 1
+
+        self.blocks = self.blocks[: self.target_variables]
+
+        header = [
+            "===================================================",
+            f"Variable Labels and Value Labels for {self.wave_name} ",
+            f"Generated: {datetime.now()} ",
+            "===================================================",
+            "",
+            "",
+        ]
+        return "\n".join(header) + "\n" + "\n".join(self.blocks) + "\n"
+
+    def write(self, output_file: str) -> int:
+        """Write the codebook and return the number of variables"""
+        content = self.generate()
+        directory = os.path.dirname(output_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(output_file, "w", encoding="utf-8") as f:
+            f.write(content)
+        return len(self.blocks)
+
+
+def synthetic_labels_path(scale: float, output_dir: str = "synthetic") -> str:
+    """Conventional file name for a synthetic codebook at a given scale"""
+    scale_str = f"{scale:g}".replace(".", "_")
+    return os.path.join(output_dir, f"SYN_x{scale_str}_labels.txt")
+
+
+def generate_scaled_codebooks(
+    scales: Optional[List[float]] = None, output_dir: str = "synthetic", seed: int = 0
+) -> List[str]:
+    """Generate one codebook per scale factor, returning file paths"""
+    scales = scales or [1, 10, 100]
+    paths = []
+    for scale in scales:
+        path = synthetic_labels_path(scale, output_dir)
+        generator = SyntheticCodebookGenerator(scale=scale, seed=seed, wave_name=f"SYN_x{scale:g}")
+        count = generator.write(path)
+        print(f"✅ {path}: {count} variables")
+        paths.append(path)
+    return paths
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate synthetic Asian Barometer labels files")
+    parser.add_argument("--scale", type=float, nargs="+", default=[1, 10, 100],
+                        help="Scale factors relative to one real wave (default: 1 10 100)")
+    parser.add_argument("--output-dir", default="synthetic")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    generate_scaled_codebooks(args.scale, args.output_dir, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Near-duplicate (MinHash/LSH) pairs must pass the target mismatch check"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+
+from semantic_matcher_full import QuestionMatcher  # noqa: E402
+from question_encoders import make_encoder  # noqa: E402
+
+STEM = "How much trust do you have in each of the following types of people?"
+
+
+def question(wave, var_id, text):
+    return {
+        "wave": wave,
+        "var_id": var_id,
+        "question_text": text,
+        "concepts": [],
+        "domain": "Social Capital",
+        "value_labels": [],
+    }
+
+
+def test_neighbors_not_duplicate_of_relatives():
+    # W3 q26 vs W5/W6_Cambodia q24: shingle Jaccard 0.867, different targets
+    matcher = QuestionMatcher(encoder=make_encoder("tfidf"))
+    matcher.questions = [
+        question("W3", "q25", f"{STEM} Your relatives"),
+        question("W3", "q26", f"{STEM} Your neighbors"),
+        question("W5", "q24", f"24 {STEM} Your relatives"),
+        question("W6_Cambodia", "q24", f"24 {STEM} Your relatives"),
+    ]
+
+    matches = matcher.find_near_duplicates(0.8)
+    pairs = {
+        frozenset([(m["wave1"], m["var1"]), (m["wave2"], m["var2"])]) for m in matches
+    }
+
+    assert frozenset([("W3", "q25"), ("W5", "q24")]) in pairs
+    assert not any(("W3", "q26") in pair for pair in pairs)
+    assert "near_duplicate_of" not in matcher.questions[1]
+
+
+if __name__ == "__main__":
+    test_neighbors_not_duplicate_of_relatives()
+    print("✓ neighbors/relatives pair rejected")
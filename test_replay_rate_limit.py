@@ -0,0 +1,42 @@
+"""Simulated rate limits in virtual time must drain like a real rpm window"""
+
+import os
+import tempfile
+
+import pytest
+
+from llm_cassette import Cassette, ReplayClient, SimulatedRateLimitError
+
+MODEL = "llama-3.1-8b-instant"
+MESSAGES = [{"role": "user", "content": "Classify: trust in parliament"}]
+
+
+def replay_client(**options):
+    cassette = Cassette(os.path.join(tempfile.mkdtemp(), "cassette.json"))
+    cassette.record(
+        "chat.completions.create", MODEL, MESSAGES, {}, "Trust", {"total_tokens": 10}, 0.5
+    )
+    return ReplayClient(cassette, realtime=False, **options)
+
+
+@pytest.mark.parametrize("latency", ["recorded", None])
+def test_throughput_converges_to_rpm(latency):
+    client = replay_client(latency=latency, requests_per_minute=2)
+
+    succeeded = 0
+    for _ in range(300):
+        try:
+            client.chat.completions.create(model=MODEL, messages=MESSAGES)
+            succeeded += 1
+        except SimulatedRateLimitError:
+            pass
+
+    minutes = client.virtual_time_s / 60
+    assert succeeded > 100
+    assert succeeded / minutes == pytest.approx(2, rel=0.05)
+
+
+if __name__ == "__main__":
+    test_throughput_converges_to_rpm("recorded")
+    test_throughput_converges_to_rpm(None)
+    print("✓ simulated rate limit drains in virtual time")
@@ -0,0 +1,97 @@
+"""
+Text-hash deduplication for expensive per-question work
+
+Identical question texts recur within and across waves (demographics,
+interviewer items such as ir002, repeated batteries). Stages that pay per
+question - LLM concept extraction, embedding, validation phrase search -
+run once per unique canonical text and fan the result back out:
+
+    dedup = TextDeduplicator(texts)
+    unique_results = expensive(dedup.unique_texts)
+    results = dedup.fan_out(unique_results)
+    record_savings("embeddings", dedup.total, dedup.unique)
+
+Texts are canonicalized (lowercase, collapsed whitespace) before hashing.
+Every consumer already ignores case and spacing: the validation phrase
+search works on normalize_text(), and both matcher encoders are uncased.
+
+HashCache persists results by text hash across runs, so a later wave
+reuses the LLM concepts of items that an earlier wave already sent.
+"""
+
+import os
+import json
+import hashlib
+from typing import Any, Dict, List, Optional
+
+from instrumentation import metrics
+
+
+def canonicalize(text: str) -> str:
+    """Lowercase and collapse whitespace"""
+    return " ".join(text.lower().split())
+
+
+def text_hash(text: str) -> str:
+    """Stable 16-hex-digit hash of the canonical text"""
+    return hashlib.sha1(canonicalize(text).encode("utf-8")).hexdigest()[:16]
+
+
+class TextDeduplicator:
+    """Map texts to unique canonical texts and fan results back out"""
+
+    def __init__(self, texts: List[str]):
+        self.hashes = [text_hash(t) for t in texts]
+        self.first_index: List[int] = []  # position of each unique text's first occurrence
+        self.inverse: List[int] = []  # unique position of every input text
+        positions: Dict[str, int] = {}
+        for i, key in enumerate(self.hashes):
+            if key not in positions:
+                positions[key] = len(self.first_index)
+                self.first_index.append(i)
+            self.inverse.append(positions[key])
+        self.unique_texts = [texts[i] for i in self.first_index]
+
+    @property
+    def total(self) -> int:
+        return len(self.inverse)
+
+    @property
+    def unique(self) -> int:
+        return len(self.first_index)
+
+    def fan_out(self, unique_results: List[Any]) -> List[Any]:
+        """Per-input results from per-unique-text results"""
+        return [unique_results[u] for u in self.inverse]
+
+
+def record_savings(stage: str, total: int, processed: int):
+    """Print and record how much per-question work dedup (and caching) saved in a stage"""
+    saved = total - processed
+    metrics.incr(f"dedup.{stage}.texts", total)
+    metrics.incr(f"dedup.{stage}.processed", processed)
+    pct = saved / total * 100 if total else 0.0
+    print(f"  Dedup [{stage}]: {total} texts → {processed} processed ({saved} saved, {pct:.1f}%)")
+
+
+class HashCache:
+    """JSON file of results keyed by text_hash()"""
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.entries: Dict[str, Any] = {}
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def get(self, text: str):
+        return self.entries.get(text_hash(text))
+
+    def put(self, text: str, value: Any):
+        self.entries[text_hash(text)] = value
+
+    def save(self):
+        if not self.path:
+            return
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=2, ensure_ascii=False)
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Verify the R validation guards against the actual variable labels
+
+The generated R recoders guard every reversal with
+
+    grepl("<pattern>", question_text["<var_id>"], ignore.case = TRUE)
+
+so a pattern that does not match its own variable label silently turns the
+recode into NA, and a pattern that matches many labels would not catch a
+swapped variable. This script runs the same test in Python for every
+validation_phrase in validation_phrases_improved.json and every
+distinctive_keyword in ALL_WAVES_reversal_guide.csv:
+
+- labels come from the .sav metadata in data/raw/wave*/ when a file for the
+  wave exists (metadata only, no respondent rows), else from {wave}_labels.txt
+- all labels of a wave are joined into one newline-separated string; each
+  distinct pattern is compiled once (MULTILINE, so ^ and $ anchor at every
+  label) and scanned over that string in a single regex pass, and match
+  offsets are mapped back to variables with np.searchsorted. Patterns that
+  could see across a label boundary (empty or crossing matches, \A, \Z,
+  lookarounds) fall back to a per-label search
+
+Statuses:
+- ok:               matches its own label and no other
+- multi_match:      matches its own label and other labels of the wave
+- zero_match:       does not match its own label (the R guard returns FALSE)
+- missing_variable: variable not in the wave's labels
+- invalid_pattern:  empty or not a valid regular expression
+
+Usage:
+    python verify_validation_phrases.py
+    python verify_validation_phrases.py --source labels --waves W1 W2
+"""
+
+import os
+import re
+import csv
+import json
+import glob
+import time
+import argparse
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+WAVES = ["W1", "W2", "W3", "W4", "W5", "W6_Cambodia"]
+RAW_DIR = os.path.join("data", "raw")
+PHRASES_FILE = "validation_phrases_improved.json"
+GUIDE_FILE = "ALL_WAVES_reversal_guide.csv"
+
+
+def find_sav_file(wave: str, raw_dir: str = RAW_DIR) -> Optional[str]:
+    """
+    .sav release for a wave name: W1 -> data/raw/wave1/*.sav,
+    W6_Cambodia -> data/raw/wave6/*Cambodia*.sav
+    """
+    match = re.match(r"W(\d+)(?:_(.+))?$", wave)
+    if not match:
+        return None
+    number, country = match.groups()
+    files = sorted(glob.glob(os.path.join(raw_dir, f"wave{number}", "*.sav")))
+    if country:
+        files = [f for f in files if country.lower() in os.path.basename(f).lower()]
+    return files[0] if len(files) == 1 else None
+
+
+def load_sav_labels(path: str) -> Dict[str, str]:
+    """Variable labels from .sav metadata (respondent rows are not read)"""
+    import pyreadstat
+
+    _, meta = pyreadstat.read_sav(path, metadataonly=True)
+    return {name: label or "" for name, label in meta.column_names_to_labels.items()}
+
+
+def load_text_labels(path: str) -> Dict[str, str]:
+    """Variable labels from a labels.txt dump ("N/A" marks a missing label)"""
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+
+    labels = {}
+    for block in content.split("\nVariable: ")[1:]:
+        match = re.match(r"(\S+)\s*\n\s*Question: (.*?)\s*(?:\n\s*Value Labels:|\Z)", block, re.DOTALL)
+        if match:
+            question = match.group(2)
+            labels[match.group(1)] = "" if question == "N/A" else question
+    return labels
+
+
+def load_wave_labels(wave: str, source: str = "auto", raw_dir: str = RAW_DIR) -> Tuple[Dict[str, str], str]:
+    """(labels, path) for a wave from the .sav release or the labels file"""
+    if source in ("auto", "sav"):
+        sav_file = find_sav_file(wave, raw_dir)
+        if sav_file:
+            return load_sav_labels(sav_file), sav_file
+        if source == "sav":
+            raise FileNotFoundError(f"No .sav file for {wave} under {raw_dir}")
+    labels_file = f"{wave}_labels.txt"
+    return load_text_labels(labels_file), labels_file
+
+
+# Constructs that behave differently in the joined string than per label
+_PER_LABEL = re.compile(r"\\[AZ]|\(\?<?[=!]")
+
+
+class LabelMatcher:
+    """All variable labels of a wave in one string, searched per pattern"""
+
+    def __init__(self, labels: Dict[str, str]):
+        self.names = list(labels)
+        self.rows = {name: row for row, name in enumerate(self.names)}
+        self.texts = [labels[name].replace("\n", " ") for name in self.names]
+        self.text = "\n".join(self.texts)
+
+        lengths = np.array([len(t) for t in self.texts], dtype=np.int64)
+        self.starts = np.concatenate(([0], np.cumsum(lengths + 1)[:-1])).astype(np.int64)
+        self.ends = self.starts + lengths
+
+    def matching_rows(self, pattern: str) -> np.ndarray:
+        """Rows whose label matches, like grepl(pattern, labels, ignore.case = TRUE)"""
+        regex = re.compile(pattern, re.IGNORECASE)
+        if not _PER_LABEL.search(pattern):
+            joined = re.compile(pattern, re.IGNORECASE | re.MULTILINE)
+            spans = np.array([m.span() for m in joined.finditer(self.text)], dtype=np.int64).reshape(-1, 2)
+            if len(spans) == 0:
+                return np.zeros(0, dtype=np.int64)
+
+            rows = np.searchsorted(self.starts, spans[:, 0], side="right") - 1
+            inside = (spans[:, 1] > spans[:, 0]) & (spans[:, 1] <= self.ends[rows])
+            if inside.all():
+                return np.unique(rows)
+
+        # Test every label on its own
+        return np.array([row for row, t in enumerate(self.texts) if regex.search(t)], dtype=np.int64)
+
+
+def load_checks(phrases_file: str, guide_file: str, waves: List[str]) -> List[Dict]:
+    """Every (wave, variable, pattern) guard to verify"""
+    checks = []
+    if phrases_file and os.path.exists(phrases_file):
+        with open(phrases_file, "r") as f:
+            phrases = json.load(f)
+        for wave in waves:
+            for var_id, info in phrases.get(wave, {}).get("questions", {}).items():
+                checks.append(
+                    {
+                        "wave": wave,
+                        "variable_id": var_id,
+                        "kind": "validation_phrase",
+                        "pattern": info.get("validation_phrase", ""),
+                    }
+                )
+
+    if guide_file and os.path.exists(guide_file):
+        with open(guide_file, "r", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                if row["wave"] in waves:
+                    checks.append(
+                        {
+                            "wave": row["wave"],
+                            "variable_id": row["variable_id"],
+                            "kind": "distinctive_keyword",
+                            "pattern": row.get("distinctive_keyword", ""),
+                        }
+                    )
+    return checks
+
+
+def verify(checks: List[Dict], matchers: Dict[str, LabelMatcher], max_examples: int = 5) -> List[Dict]:
+    """Annotate every check with its status; each distinct pattern is searched once per wave"""
+    matches: Dict[Tuple[str, str], Optional[np.ndarray]] = {}
+    for check in checks:
+        key = (check["wave"], check["pattern"])
+        if key in matches or check["wave"] not in matchers:
+            continue
+        try:
+            rows = matchers[check["wave"]].matching_rows(check["pattern"]) if check["pattern"] else None
+        except re.error:
+            rows = None
+        matches[key] = rows
+
+    results = []
+    for check in checks:
+        matcher = matchers.get(check["wave"])
+        rows = matches.get((check["wave"], check["pattern"]))
+        own_row = matcher.rows.get(check["variable_id"]) if matcher else None
+
+        if matcher is None or own_row is None:
+            status = "missing_variable"
+        elif rows is None:
+            status = "invalid_pattern"
+        elif own_row not in rows:
+            status = "zero_match"
+        elif len(rows) > 1:
+            status = "multi_match"
+        else:
+            status = "ok"
+
+        other = [matcher.names[r] for r in rows if r != own_row] if rows is not None and matcher else []
+        results.append(
+            {
+                **check,
+                "status": status,
+                "label": matcher.texts[own_row] if own_row is not None else None,
+                "match_count": 0 if rows is None else int(len(rows)),
+                "other_matches": other[:max_examples],
+            }
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify R grepl validation guards against variable labels")
+    parser.add_argument("--phrases", default=PHRASES_FILE)
+    parser.add_argument("--guide", default=GUIDE_FILE)
+    parser.add_argument("--waves", nargs="+", default=WAVES)
+    parser.add_argument("--source", choices=["auto", "sav", "labels"], default="auto")
+    parser.add_argument("--raw-dir", default=RAW_DIR)
+    parser.add_argument("--output", default="validation_verification.json")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("VALIDATION GUARD VERIFICATION (grepl against variable labels)")
+    print("=" * 80)
+
+    start = time.perf_counter()
+    matchers = {}
+    sources = {}
+    for wave in args.waves:
+        try:
+            labels, path = load_wave_labels(wave, args.source, args.raw_dir)
+        except Exception as e:
+            print(f"❌ {wave}: {e}")
+            continue
+        matchers[wave] = LabelMatcher(labels)
+        sources[wave] = path
+        print(f"  {wave}: {len(labels)} labels from {path}")
+    load_seconds = time.perf_counter() - start
+
+    checks = load_checks(args.phrases, args.guide, args.waves)
+    start = time.perf_counter()
+    results = verify(checks, matchers)
+    verify_seconds = time.perf_counter() - start
+
+    counts = defaultdict(Counter)
+    for r in results:
+        counts[(r["wave"], r["kind"])][r["status"]] += 1
+
+    statuses = ["ok", "multi_match", "zero_match", "missing_variable", "invalid_pattern"]
+    print(f"\n{'Wave':<14} {'Kind':<20} " + " ".join(f"{s:>16}" for s in statuses))
+    for (wave, kind), counter in sorted(counts.items()):
+        print(f"{wave:<14} {kind:<20} " + " ".join(f"{counter[s]:>16}" for s in statuses))
+
+    for status in ("zero_match", "multi_match"):
+        problems = [r for r in results if r["status"] == status]
+        if not problems:
+            continue
+        print(f"\n⚠️  {status}: {len(problems)}")
+        for r in problems[:10]:
+            extra = f" (also: {', '.join(r['other_matches'])})" if r["other_matches"] else ""
+            print(f'  • {r["wave"]} {r["variable_id"]} [{r["kind"]}] "{r["pattern"]}"{extra}')
+            print(f"    Label: {(r['label'] or '')[:70]}")
+        if len(problems) > 10:
+            print(f"  ... and {len(problems) - 10} more")
+
+    total = Counter(r["status"] for r in results)
+    report = {
+        "generated": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "sources": sources,
+        "checks": len(results),
+        "summary": {s: total[s] for s in statuses},
+        "issues": [r for r in results if r["status"] != "ok"],
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print(f"\n{len(results)} guards verified in {verify_seconds:.2f}s (labels loaded in {load_seconds:.2f}s)")
+    print(f"💾 Issues exported to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()